@@ -0,0 +1,177 @@
+"""
+Local fake of the offers service for load tests.
+
+It serves the auth, product registration and product offers endpoints the microservice calls,
+with a configurable latency, failure rate and distribution of the number of offers per product.
+The offers of a product are derived from its ID, so they are stable across calls; on every call
+they change with a probability of ``change_rate``. Offer lists are returned with an ETag and
+``If-None-Match`` is answered with 304 when they did not change.
+
+Usage:
+    python -m benchmarks.fake_offers_service --port 8200 --latency-ms 20 --failure-rate 0.01
+
+Then point OFFER_HOST to http://127.0.0.1:8200, AUTH_ENDPOINT to /api/v1/auth and
+PRODUCTS_REGISTER_ENDPOINT to /api/v1/products/register.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import uuid
+from dataclasses import dataclass
+
+import uvicorn
+from fastapi import FastAPI, Header, Request, Response
+
+AUTH_ENDPOINT = "/api/v1/auth"
+PRODUCTS_REGISTER_ENDPOINT = "/api/v1/products/register"
+
+DISTRIBUTIONS = ("fixed", "uniform", "exponential")
+
+
+@dataclass
+class FakeOffersConfig:
+    latency_ms: float = 20.0
+    jitter_ms: float = 5.0
+    failure_rate: float = 0.0
+    offers_distribution: str = "uniform"
+    offers_mean: int = 10
+    offers_max: int = 100
+    change_rate: float = 0.1
+
+
+def offer_count(product_id: str, config: FakeOffersConfig) -> int:
+    """
+    Get the number of offers of a product, drawn from the configured distribution.
+
+    Args:
+        product_id (str): ID of the product, seeding the draw.
+        config (FakeOffersConfig): The fake service configuration.
+
+    Returns:
+        int: The number of offers, at most ``offers_max``.
+    """
+    draw = random.Random(product_id)
+    if config.offers_distribution == "fixed":
+        count = config.offers_mean
+    elif config.offers_distribution == "uniform":
+        count = draw.randint(0, 2 * config.offers_mean)
+    else:
+        count = int(draw.expovariate(1 / config.offers_mean)) if config.offers_mean else 0
+    return min(count, config.offers_max)
+
+
+def product_offers(product_id: str, version: int, config: FakeOffersConfig) -> list:
+    """
+    Build the offers of a product in a given version.
+
+    Args:
+        product_id (str): ID of the product.
+        version (int): Version of the offers, bumped when they change.
+        config (FakeOffersConfig): The fake service configuration.
+
+    Returns:
+        list[dict]: The offers, with IDs stable across versions.
+    """
+    draw = random.Random(f"{product_id}:{version}")
+    return [
+        {
+            "id": str(uuid.uuid5(uuid.NAMESPACE_URL, f"{product_id}/{index}")),
+            "price": draw.randint(100, 100000),
+            "items_in_stock": draw.randint(0, 50),
+        }
+        for index in range(offer_count(product_id, config))
+    ]
+
+
+def create_app(config: FakeOffersConfig) -> FastAPI:
+    """
+    Create the fake offers service.
+
+    Args:
+        config (FakeOffersConfig): Latency, failures and offers of the fake service.
+
+    Returns:
+        FastAPI: The application.
+    """
+    app = FastAPI()
+    versions = {}
+    stats = {"auth": 0, "register": 0, "offers": 0, "not_modified": 0, "failures": 0}
+
+    async def simulate():
+        delay = max(config.latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms), 0) / 1000
+        await asyncio.sleep(delay)
+        if random.random() < config.failure_rate:
+            stats["failures"] += 1
+            return Response(status_code=503)
+        return None
+
+    @app.post(AUTH_ENDPOINT, status_code=201)
+    async def auth():
+        failure = await simulate()
+        if failure:
+            return failure
+        stats["auth"] += 1
+        return {"access_token": uuid.uuid4().hex}
+
+    @app.post(PRODUCTS_REGISTER_ENDPOINT, status_code=201)
+    async def register_product(request: Request):
+        failure = await simulate()
+        if failure:
+            return failure
+        product = await request.json()
+        versions.setdefault(str(product["id"]), 0)
+        stats["register"] += 1
+        return {"id": product["id"]}
+
+    @app.get("/api/v1/products/{product_id}/offers")
+    async def get_offers(product_id: str, if_none_match: str = Header(None)):
+        failure = await simulate()
+        if failure:
+            return failure
+        stats["offers"] += 1
+        version = versions.get(product_id, 0)
+        if random.random() < config.change_rate:
+            version += 1
+        versions[product_id] = version
+        body = json.dumps(product_offers(product_id, version, config), separators=(",", ":")).encode("utf-8")
+        etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        if if_none_match == etag:
+            stats["not_modified"] += 1
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(body, media_type="application/json", headers={"ETag": etag})
+
+    @app.get("/stats")
+    def get_stats():
+        return stats
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8200)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--offers-distribution", choices=DISTRIBUTIONS, default="uniform")
+    parser.add_argument("--offers-mean", type=int, default=10)
+    parser.add_argument("--offers-max", type=int, default=100)
+    parser.add_argument("--change-rate", type=float, default=0.1)
+    args = parser.parse_args()
+
+    config = FakeOffersConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        failure_rate=args.failure_rate,
+        offers_distribution=args.offers_distribution,
+        offers_mean=args.offers_mean,
+        offers_max=args.offers_max,
+        change_rate=args.change_rate,
+    )
+    uvicorn.run(create_app(config), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
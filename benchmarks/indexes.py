@@ -0,0 +1,132 @@
+"""
+Compare query plans and latencies of the per-product offer queries with and without the
+(product_id, timestamp) and (product_id, price) indexes.
+
+A synthetic catalog is seeded into a separate schema of the database configured in the
+environment, which is dropped afterwards. The queries are explained and timed before and
+after the indexes are created, and the results are printed as JSON.
+
+Usage:
+    python -m benchmarks.indexes --products 20000 --offers-per-product 50 --runs 200
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from benchmarks.stats import summarize
+from microservice.database.database_setup import engine
+from microservice.models.models import Offer, Product
+
+SCHEMA = "benchmark_indexes"
+
+INDEXES = {
+    "ix_offers_product_id_timestamp": "CREATE INDEX ix_offers_product_id_timestamp ON offers (product_id, timestamp)",
+    "ix_offers_product_id_price": "CREATE INDEX ix_offers_product_id_price ON offers (product_id, price)",
+}
+
+QUERIES = {
+    "cheapest_offers": "SELECT id, price FROM offers WHERE product_id = :product_id ORDER BY price LIMIT 5",
+    "recent_offers": (
+        "SELECT id, price, timestamp FROM offers "
+        "WHERE product_id = :product_id AND timestamp >= :since ORDER BY timestamp DESC"
+    ),
+    "price_range": (
+        "SELECT min(price), max(price) FROM offers WHERE product_id = :product_id AND price BETWEEN 100 AND 500"
+    ),
+}
+
+
+def seed(connection, products: int, offers_per_product: int):
+    connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    connection.execute(text(f"SET search_path TO {SCHEMA}"))
+    Product.__table__.create(connection)
+    Offer.__table__.create(connection)
+    for name in INDEXES:
+        connection.execute(text(f"DROP INDEX {name}"))
+
+    connection.execute(text(
+        "INSERT INTO products (id, name, description) "
+        "SELECT md5(n::text)::uuid, 'product ' || n, '' FROM generate_series(1, :products) n"
+    ), {"products": products})
+    connection.execute(text(
+        "INSERT INTO offers (id, price, items_in_stock, timestamp, product_id) "
+        "SELECT gen_random_uuid(), (random() * 1000)::int, (random() * 20)::int, "
+        "now() - random() * interval '30 days', md5(p::text)::uuid "
+        "FROM generate_series(1, :products) p, generate_series(1, :offers) o"
+    ), {"products": products, "offers": offers_per_product})
+    connection.execute(text("ANALYZE products, offers"))
+
+
+def plan_summary(plan: dict) -> list:
+    """
+    Flatten an EXPLAIN (FORMAT JSON) plan into its node types and the indexes they use.
+    """
+    nodes = [plan["Node Type"] + (f" using {plan['Index Name']}" if "Index Name" in plan else "")]
+    for child in plan.get("Plans", []):
+        nodes.extend(plan_summary(child))
+    return nodes
+
+
+def measure(connection, product_ids: list, runs: int) -> dict:
+    since = datetime.utcnow() - timedelta(days=1)
+    results = {}
+    for name, query in QUERIES.items():
+        parameters = {"product_id": random.choice(product_ids), "since": since}
+        explained = connection.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {query}"), parameters).scalar()
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(runs):
+            parameters["product_id"] = random.choice(product_ids)
+            query_started = time.perf_counter()
+            connection.execute(text(query), parameters).all()
+            latencies.append(time.perf_counter() - query_started)
+        results[name] = {
+            "plan": plan_summary(explained[0]["Plan"]),
+            **summarize(latencies, time.perf_counter() - started),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=20000)
+    parser.add_argument("--offers-per-product", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--keep", action="store_true", help=f"Keep the {SCHEMA} schema afterwards")
+    args = parser.parse_args()
+
+    with engine.connect() as connection:
+        try:
+            seed(connection, args.products, args.offers_per_product)
+            connection.commit()
+            product_ids = [
+                str(product_id) for (product_id,) in connection.execute(text("SELECT id FROM products LIMIT 1000"))
+            ]
+
+            before = measure(connection, product_ids, args.runs)
+            for statement in INDEXES.values():
+                connection.execute(text(statement))
+            connection.execute(text("ANALYZE offers"))
+            connection.commit()
+            after = measure(connection, product_ids, args.runs)
+        finally:
+            connection.rollback()
+            if not args.keep:
+                connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+                connection.commit()
+
+    print(json.dumps({
+        "products": args.products,
+        "offers": args.products * args.offers_per_product,
+        "before": before,
+        "after": after,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""
+Load test the microservice against a local fake of the offers service.
+
+The run goes through these steps, against the database configured in the environment:
+
+1. The fake offers service (benchmarks.fake_offers_service) is started with the given latency,
+   failure rate and offers per product, and OFFER_HOST is pointed to it.
+2. ``--products`` products named ``load-test ...`` are seeded.
+3. The offer refresh of BackgroundService is run in this process for ``--cycles`` cycles,
+   every product being due in every cycle. The first cycle loads all the offers, the next
+   ones mostly revalidate them. The duration, refreshed products and DB queries of every
+   cycle are recorded.
+4. The service is started with uvicorn, its own refresh disabled, and driven with
+   ``--requests`` concurrent requests, a ``--create-ratio`` share of them creating products
+   and the others reading products and offers. Requests/sec, p50/p95/p99 latencies overall
+   and per endpoint, and the DB queries per request (from /metrics) are recorded.
+5. The seeded and created products are deleted, unless ``--keep`` is given.
+
+The results are printed as JSON, and written to ``--output`` to compare versions.
+
+Usage:
+    python -m benchmarks.load_test --products 1000 --requests 5000 --concurrency 50 --output results.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+from prometheus_client.parser import text_string_to_metric_families
+
+from benchmarks.fake_offers_service import AUTH_ENDPOINT, DISTRIBUTIONS, PRODUCTS_REGISTER_ENDPOINT
+from benchmarks.stats import percentile, summarize
+
+PRODUCT_PREFIX = "load-test"
+
+
+def wait_until_up(process: subprocess.Popen, url: str):
+    for _ in range(200):
+        try:
+            httpx.get(url)
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"{url} did not start.")
+
+
+def start_fake_service(args) -> subprocess.Popen:
+    process = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.fake_offers_service",
+        "--port", str(args.fake_port),
+        "--latency-ms", str(args.latency_ms),
+        "--jitter-ms", str(args.jitter_ms),
+        "--failure-rate", str(args.failure_rate),
+        "--offers-distribution", args.offers_distribution,
+        "--offers-mean", str(args.offers_mean),
+        "--offers-max", str(args.offers_max),
+        "--change-rate", str(args.change_rate),
+    ])
+    wait_until_up(process, f"http://127.0.0.1:{args.fake_port}/stats")
+    return process
+
+
+def start_service(port: int) -> subprocess.Popen:
+    # The refresh is measured separately, so the service does not refresh the offers itself.
+    env = dict(os.environ, REFRESH_RATE_PER_SECOND="0", REFRESH_BURST="0", LOG_LEVEL="WARNING")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "microservice.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    wait_until_up(process, f"http://127.0.0.1:{port}/status/pool")
+    return process
+
+
+def seed_products(count: int):
+    from sqlalchemy import text
+
+    from microservice.database.database_setup import engine
+    from microservice.database.migrations import upgrade_database
+
+    upgrade_database()
+    with engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO products (id, name, description) "
+            "SELECT gen_random_uuid(), :prefix || ' product ' || n, 'Seeded by the load test' "
+            "FROM generate_series(1, :count) n"
+        ), {"prefix": PRODUCT_PREFIX, "count": count})
+
+
+def delete_products():
+    from sqlalchemy import delete, select
+
+    from microservice.database.database_setup import engine
+    from microservice.models.models import (Offer, OfferPriceHistory, OfferSummary, Product, ProductReadCount,
+                                            ProductRegistration)
+
+    product_ids = select(Product.id).where(Product.name.like(f"{PRODUCT_PREFIX} %")).scalar_subquery()
+    with engine.begin() as connection:
+        for model in (OfferPriceHistory, OfferSummary, Offer, ProductRegistration, ProductReadCount):
+            connection.execute(delete(model).where(model.product_id.in_(product_ids)))
+        connection.execute(delete(Product).where(Product.name.like(f"{PRODUCT_PREFIX} %")))
+
+
+def run_refresh_cycles(cycles: int, products: int) -> dict:
+    """
+    Run offer refresh cycles in this process, with every product due in every cycle.
+
+    Args:
+        cycles (int): Number of refresh cycles.
+        products (int): Number of products refreshed per cycle, at most.
+
+    Returns:
+        dict: Duration, refreshed products and DB queries of every cycle.
+    """
+    from prometheus_client import REGISTRY
+    from sqlalchemy import event
+
+    from microservice.background_service.background_service import BackgroundService
+    from microservice.background_service.scheduler import RefreshScheduler, TokenBucket
+    from microservice.config.settings import Settings
+    from microservice.database.database_setup import engine
+
+    queries = 0
+
+    def count_query(*args):
+        nonlocal queries
+        queries += 1
+
+    def refreshed(outcome: str) -> float:
+        return REGISTRY.get_sample_value("offer_refresh_products_total", {"outcome": outcome}) or 0.0
+
+    service = BackgroundService()
+    results = []
+    event.listen(engine, "before_cursor_execute", count_query)
+    try:
+        for _ in range(cycles):
+            service.scheduler = RefreshScheduler(
+                Settings.REFRESH_MIN_STALENESS_SECONDS,
+                Settings.REFRESH_MAX_STALENESS_SECONDS,
+                Settings.REFRESH_INITIAL_INTERVAL_SECONDS,
+            )
+            service.rate_limiter = TokenBucket(products, products)
+            service.products_synced_at = 0
+            before = {outcome: refreshed(outcome) for outcome in ("written", "skipped", "failed")}
+            queries = 0
+            started = time.perf_counter()
+            service.update_offers_data()
+            duration = time.perf_counter() - started
+            results.append({
+                "duration_s": round(duration, 3),
+                "db_queries": queries,
+                **{outcome: int(refreshed(outcome) - before[outcome]) for outcome in before},
+            })
+    finally:
+        event.remove(engine, "before_cursor_execute", count_query)
+    return {"cycles": results}
+
+
+def db_query_count(base_url: str) -> float:
+    metrics = httpx.get(f"{base_url}/metrics").text
+    return sum(
+        sample.value
+        for family in text_string_to_metric_families(metrics)
+        if family.name == "db_query_duration_seconds"
+        for sample in family.samples
+        if sample.name == "db_query_duration_seconds_count"
+    )
+
+
+async def drive(base_url: str, product_ids: list, requests: int, concurrency: int, create_ratio: float,
+                token: str) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = {}
+    errors = {}
+    reads = (
+        ("list_products", lambda: "/products/"),
+        ("list_offers", lambda: "/offers/"),
+        ("get_product", lambda: f"/products/{random.choice(product_ids)}"),
+        ("product_offers", lambda: f"/offers/products/{random.choice(product_ids)}"),
+    )
+
+    async with httpx.AsyncClient(base_url=base_url, limits=httpx.Limits(max_connections=concurrency),
+                                 timeout=30) as client:
+        async def request(index: int):
+            async with semaphore:
+                started = time.perf_counter()
+                if random.random() < create_ratio:
+                    name = "create_product"
+                    response = await client.post(
+                        "/products/",
+                        json={"name": f"{PRODUCT_PREFIX} created {index}", "description": "Created by the load test"},
+                        headers={"Authorization": f"Bearer {token}"},
+                    )
+                else:
+                    name, path = random.choice(reads)
+                    response = await client.get(path())
+                if response.status_code < 400:
+                    latencies.setdefault(name, []).append(time.perf_counter() - started)
+                else:
+                    errors[name] = errors.get(name, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(request(index) for index in range(requests)))
+        duration = time.perf_counter() - started
+
+    endpoints = {
+        name: summarize(latencies.get(name, []), duration, errors.get(name, 0))
+        for name in sorted(latencies.keys() | errors.keys())
+    }
+    all_latencies = [latency for values in latencies.values() for latency in values]
+    return {"overall": summarize(all_latencies, duration, sum(errors.values())), "endpoints": endpoints}
+
+
+def run_http(port: int, requests: int, concurrency: int, create_ratio: float) -> dict:
+    from microservice.auth.jwt_handler import sign_jwt
+
+    base_url = f"http://127.0.0.1:{port}"
+    token = sign_jwt(PRODUCT_PREFIX)["access_token"]
+    process = start_service(port)
+    try:
+        product_ids = [product["id"] for product in httpx.get(f"{base_url}/products/", params={"limit": 100}).json()]
+        # Warm up the connection pools before measuring.
+        asyncio.run(drive(base_url, product_ids, min(requests, 100), concurrency, 0, token))
+        queries_before = db_query_count(base_url)
+        results = asyncio.run(drive(base_url, product_ids, requests, concurrency, create_ratio, token))
+        queries = db_query_count(base_url) - queries_before
+    finally:
+        process.terminate()
+        process.wait()
+    # Includes the queries of the registration worker processing the created products.
+    results["db_queries"] = int(queries)
+    results["db_queries_per_request"] = round(queries / requests, 2) if requests else 0.0
+    return results
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--cycles", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--create-ratio", type=float, default=0.05)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--fake-port", type=int, default=8200)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--offers-distribution", choices=DISTRIBUTIONS, default="uniform")
+    parser.add_argument("--offers-mean", type=int, default=10)
+    parser.add_argument("--offers-max", type=int, default=100)
+    parser.add_argument("--change-rate", type=float, default=0.1)
+    parser.add_argument("--output", help="Also write the results to this file.")
+    parser.add_argument("--keep", action="store_true", help="Keep the load test products.")
+    args = parser.parse_args()
+
+    # The settings are read when the microservice modules are first imported, so the service
+    # modules are imported only once the environment points to the fake offers service.
+    os.environ.update(
+        OFFER_HOST=f"http://127.0.0.1:{args.fake_port}",
+        AUTH_ENDPOINT=AUTH_ENDPOINT,
+        PRODUCTS_REGISTER_ENDPOINT=PRODUCTS_REGISTER_ENDPOINT,
+        LOG_LEVEL=os.environ.get("LOG_LEVEL", "WARNING"),
+    )
+    fake_service = start_fake_service(args)
+    try:
+        seed_products(args.products)
+        try:
+            refresh = run_refresh_cycles(args.cycles, args.products)
+            http = run_http(args.port, args.requests, args.concurrency, args.create_ratio)
+        finally:
+            if not args.keep:
+                delete_products()
+        fake_stats = httpx.get(f"http://127.0.0.1:{args.fake_port}/stats").json()
+    finally:
+        fake_service.terminate()
+        fake_service.wait()
+
+    durations = [cycle["duration_s"] for cycle in refresh["cycles"]]
+    refresh["p50_cycle_s"] = percentile(durations, 50)
+    refresh["max_cycle_s"] = max(durations, default=0.0)
+    results = {
+        "revision": git_revision(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "config": vars(args),
+        "refresh": refresh,
+        "http": http,
+        "fake_offers_service": fake_stats,
+    }
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
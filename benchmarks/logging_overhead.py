@@ -0,0 +1,114 @@
+"""
+Compare the logging cost paid by a request handler.
+
+Each simulated request logs the lines an offer list request logs, from several threads at once:
+
+- ``sync_debug``: DEBUG level, f-string messages and a StreamHandler writing text to a file on
+  the handler's thread, as the "api" logger did before;
+- ``queue_json``: INFO level, lazy %-formatted messages and a QueueHandler, the JSON
+  formatting and the writes left to a QueueListener thread, as configured now.
+
+The handler-side time per request of both setups is printed as JSON, as well as the time to
+drain the queue after the run.
+
+Usage:
+    python -m benchmarks.logging_overhead --requests 20000 --threads 8
+"""
+import argparse
+import json
+import logging
+import queue
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueListener
+
+from benchmarks.stats import percentile
+from microservice.utils.logging_configure import (DeferredQueueHandler, JsonFormatter, RequestIdFilter,
+                                                  request_id_var)
+
+
+def f_string_request(logger: logging.Logger, product_id: uuid.UUID, offers: list):
+    logger.debug(f"Getting offers of product {product_id}, limit {len(offers)}")
+    logger.debug(f"Fetched offers {offers}")
+    logger.info(f"Retrieved {len(offers)} offers of product {product_id} successfully.")
+
+
+def lazy_request(logger: logging.Logger, product_id: uuid.UUID, offers: list):
+    logger.debug("Getting offers of product %s, limit %d", product_id, len(offers))
+    logger.debug("Fetched offers %s", offers)
+    logger.info("Retrieved %d offers of product %s successfully.", len(offers), product_id)
+
+
+def sync_debug(stream) -> tuple:
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter("%(levelname)s | %(asctime)s | %(message)s"))
+    logger = logging.getLogger("benchmark.sync_debug")
+    logger.setLevel(logging.DEBUG)
+    return logger, handler, None, f_string_request
+
+
+def queue_json(stream) -> tuple:
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter())
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+    logger = logging.getLogger("benchmark.queue_json")
+    logger.setLevel(logging.INFO)
+    return logger, queue_handler, QueueListener(log_queue, handler), lazy_request
+
+
+SETUPS = {"sync_debug": sync_debug, "queue_json": queue_json}
+
+
+def run(setup, requests: int, threads: int) -> dict:
+    with tempfile.TemporaryFile("w") as stream:
+        logger, handler, listener, log_request = setup(stream)
+        logger.propagate = False
+        logger.addHandler(handler)
+        if listener:
+            listener.start()
+
+        product_id = uuid.uuid4()
+        offers = [{"id": index, "price": index * 10, "items_in_stock": index} for index in range(20)]
+
+        def request(_):
+            request_id_var.set(uuid.uuid4().hex)
+            started = time.perf_counter()
+            log_request(logger, product_id, offers)
+            return time.perf_counter() - started
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            durations = list(executor.map(request, range(requests)))
+
+        drain_started = time.perf_counter()
+        if listener:
+            listener.stop()
+        drain = time.perf_counter() - drain_started
+        logger.removeHandler(handler)
+
+    return {
+        "p50_us_per_request": round(percentile(durations, 50) * 1e6, 2),
+        "p95_us_per_request": round(percentile(durations, 95) * 1e6, 2),
+        "mean_us_per_request": round(sum(durations) / len(durations) * 1e6, 2),
+        "drain_ms": round(drain * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    results = {name: run(setup, args.requests, args.threads) for name, setup in SETUPS.items()}
+    baseline = results["sync_debug"]["mean_us_per_request"]
+    for result in results.values():
+        result["speedup"] = round(baseline / result["mean_us_per_request"], 2)
+    print(json.dumps({"requests": args.requests, "threads": args.threads, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Compare requests/sec and latency of the sync and async read endpoints.
+
+The service is started twice with uvicorn, with DB_ASYNC_READS disabled and enabled,
+against the database configured in the environment, and the read endpoints are driven
+with concurrent requests. The results are printed as JSON.
+
+Usage:
+    python -m benchmarks.read_endpoints --requests 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.stats import summarize
+
+
+def start_service(port: int, async_reads: bool) -> subprocess.Popen:
+    env = dict(os.environ, DB_ASYNC_READS=str(async_reads))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "microservice.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            httpx.get(f"{base_url}/status/pool")
+            return process
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("The service did not start.")
+
+
+async def drive(base_url: str, paths: list, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async with httpx.AsyncClient(base_url=base_url, limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def request(index: int):
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(paths[index % len(paths)])
+                if response.status_code == 200:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(request(index) for index in range(requests)))
+        duration = time.perf_counter() - started
+
+    return summarize(latencies, duration, errors)
+
+
+def read_paths(base_url: str) -> list:
+    products = httpx.get(f"{base_url}/products/", params={"limit": 20}).json()
+    paths = ["/products/", "/offers/"]
+    for product in products:
+        paths.append(f"/products/{product['id']}")
+        paths.append(f"/offers/products/{product['id']}")
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    results = {}
+    for mode, async_reads in (("sync", False), ("async", True)):
+        process = start_service(args.port, async_reads)
+        try:
+            base_url = f"http://127.0.0.1:{args.port}"
+            paths = read_paths(base_url)
+            # Warm up the connection pools before measuring.
+            asyncio.run(drive(base_url, paths, min(args.requests, 100), args.concurrency))
+            results[mode] = asyncio.run(drive(base_url, paths, args.requests, args.concurrency))
+        finally:
+            process.terminate()
+            process.wait()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
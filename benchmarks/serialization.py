@@ -0,0 +1,87 @@
+"""
+Compare the cost of serializing offer list responses.
+
+Each run serializes the same synthetic rows with:
+
+- ``response_model``: dicts built by hand and validated against OfferResponse, then encoded
+  by the standard JSON encoder, as FastAPI did for the list endpoints before;
+- ``type_adapter``: the rows validated and encoded by a pre-built pydantic TypeAdapter;
+- ``orjson``: the selected tuples converted to dicts and encoded with orjson, as the list
+  endpoints do now.
+
+The time per 10k rows of every method is printed as JSON.
+
+Usage:
+    python -m benchmarks.serialization --rows 10000 --runs 50
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from benchmarks.stats import percentile
+from microservice.routes.offer_routes import OfferResponse, offer_rows
+from microservice.utils.serialization import FastJSONResponse
+
+OFFERS_ADAPTER = TypeAdapter(list[OfferResponse])
+
+
+def response_model(rows: list) -> bytes:
+    offers = [
+        {"id": offer_id, "price": price, "items_in_stock": items_in_stock, "product_id": str(product_id)}
+        for offer_id, price, items_in_stock, product_id in rows
+    ]
+    validated = OFFERS_ADAPTER.validate_python(offers)
+    return json.dumps(jsonable_encoder(validated), separators=(",", ":")).encode("utf-8")
+
+
+def type_adapter(rows: list) -> bytes:
+    return OFFERS_ADAPTER.dump_json(OFFERS_ADAPTER.validate_python(offer_rows(rows)))
+
+
+def fast_json(rows: list) -> bytes:
+    return FastJSONResponse(offer_rows(rows)).body
+
+
+METHODS = {"response_model": response_model, "type_adapter": type_adapter, "orjson": fast_json}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    product_ids = [uuid.uuid4() for _ in range(100)]
+    rows = [
+        (uuid.uuid4(), random.randint(1, 1000), random.randint(0, 20), random.choice(product_ids))
+        for _ in range(args.rows)
+    ]
+
+    results = {}
+    for name, method in METHODS.items():
+        method(rows)
+        durations = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            method(rows)
+            durations.append(time.perf_counter() - started)
+        per_10k = [duration * 10000 / args.rows for duration in durations]
+        results[name] = {
+            "p50_ms_per_10k_rows": round(percentile(per_10k, 50) * 1000, 3),
+            "p95_ms_per_10k_rows": round(percentile(per_10k, 95) * 1000, 3),
+            "bytes": len(method(rows)),
+        }
+
+    baseline = results["response_model"]["p50_ms_per_10k_rows"]
+    for result in results.values():
+        result["speedup"] = round(baseline / result["p50_ms_per_10k_rows"], 2)
+    print(json.dumps({"rows": args.rows, "runs": args.runs, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+def percentile(values: list, percent: float) -> float:
+    """
+    Get a percentile of the values using the nearest-rank method.
+
+    Args:
+        values (list[float]): The measured values.
+        percent (float): The percentile to return, between 0 and 100.
+
+    Returns:
+        float: The percentile, or 0.0 for no values.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(round(percent / 100 * len(ordered))) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def summarize(latencies: list, duration: float, errors: int = 0) -> dict:
+    """
+    Summarize request latencies of a benchmark run.
+
+    Args:
+        latencies (list[float]): Latencies of the successful requests in seconds.
+        duration (float): Wall-clock duration of the run in seconds.
+        errors (int): Number of failed requests.
+
+    Returns:
+        dict: Request count, errors, requests/sec and p50/p95/p99 latencies in milliseconds.
+    """
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "requests_per_second": round((len(latencies) + errors) / duration, 2) if duration else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
@@ -40,7 +40,7 @@ class JwtBearer(HTTPBearer):
             else:
                 raise HTTPException(status_code=401, detail="Invalid or Expired Token")
         except Exception as e:
-            logger_api.error(f"Authentication error: {e}")
+            logger_api.error("Authentication error: %s", e)
             if self.auto_error:
                 raise HTTPException(status_code=401, detail="Authentication Error")
 
@@ -61,5 +61,5 @@ class JwtBearer(HTTPBearer):
                 is_token_valid = True
             return is_token_valid
         except Exception as e:
-            logger_api.error(f"JWT verification error: {e}")
+            logger_api.error("JWT verification error: %s", e)
             return False
@@ -2,10 +2,18 @@ import threading
 import time
 from microservice.utils.logging_configure import get_logger
 
-from microservice.services.offers import get_product_offer_data
+from microservice.background_service.leader_election import leader_elector
+from microservice.background_service.refresh_engine import OfferRefreshEngine
+from microservice.background_service.scheduler import RefreshScheduler, TokenBucket
+from microservice.config.settings import Settings
+from microservice.services.cache import price_trend_cache
+from microservice.services.offer_sync import offer_sync_writer
+from microservice.services.price_history import ensure_price_history_partitions
+from microservice.services.read_tracker import read_tracker
 from microservice.services.token_manager import token_manager
-from microservice.database.database_setup import session
-from microservice.models.models import Offer, Product
+from microservice.database.database_setup import engine, session_scope
+from microservice.models.models import Product
+from microservice.utils.metrics import REFRESH_CYCLE_DURATION, REFRESHED_PRODUCTS
 
 logger_background = get_logger()
 
@@ -22,16 +30,48 @@ class BackgroundService:
         self.access_token: str = None
         self.token_timestamp: float = 0
         self.running = True
+        self.refresh_engine = OfferRefreshEngine()
+        self.leader_elector = leader_elector
+        self.scheduler = RefreshScheduler(
+            Settings.REFRESH_MIN_STALENESS_SECONDS,
+            Settings.REFRESH_MAX_STALENESS_SECONDS,
+            Settings.REFRESH_INITIAL_INTERVAL_SECONDS,
+        )
+        self.rate_limiter = TokenBucket(Settings.REFRESH_RATE_PER_SECOND, Settings.REFRESH_BURST)
+        self.products_synced_at: float = 0
+
+    def sync_products(self, session):
+        """
+        Keep the scheduler's products in line with the database.
+
+        New products are due immediately and deleted ones are dropped. Runs at most every
+        ``REFRESH_PRODUCT_SYNC_SECONDS``.
+
+        Args:
+            session (Session): The database session to query the products with.
+        """
+        if time.time() - self.products_synced_at < Settings.REFRESH_PRODUCT_SYNC_SECONDS:
+            return
+        with engine.begin() as connection:
+            ensure_price_history_partitions(connection)
+        product_ids = [product_id for (product_id,) in session.query(Product.id).all()]
+        self.scheduler.sync_products(product_ids)
+        self.refresh_engine.retain(product_ids)
+        self.products_synced_at = time.time()
 
     def update_offers_data(self):
         """
         Update offers data from the offers microservice.
 
-        This method retrieves access tokens, queries product data, and updates offers in the database.
+        This method retrieves access tokens, fetches the offers of the products due for a refresh
+        concurrently and writes the changed offers in batched transactions. The number of fetched
+        products is limited by the token bucket, most overdue products first. Each refreshed product
+        is rescheduled by the scheduler according to whether its offers changed; products whose fetch
+        failed keep their offers and are retried soon. Products whose offers are unchanged since their
+        last write are skipped without parsing or writing them.
         """
         if time.time() - self.token_timestamp >= 300:
             self.access_token = None
-        logger_background.info("The process of updating the proposals has begun.")
         if not self.access_token:
             try:
                 self.access_token = token_manager.get_access_token()
@@ -39,50 +79,86 @@ class BackgroundService:
             except Exception as exc:
                 logger_background.exception("No token provided, retrying...")
                 return
-        products = session.query(Product).all()
 
-        for product in products:
+        with session_scope() as session:
+            self.sync_products(session)
+            self.scheduler.record_reads(read_tracker.consume(session))
+            product_ids = self.scheduler.pop_due(self.rate_limiter.take(self.scheduler.due_count()))
+            if not product_ids:
+                return
+            # The popped products are back in the queue only once rescheduled; those left over
+            # by an error are retried like failed refreshes.
+            pending = set(product_ids)
             try:
-                offer_data = get_product_offer_data(
-                    self.access_token, product.id
-                )
-
-                session.query(Offer).filter(Offer.product_id == product.id).delete()
-                session.commit()
-
-                for offer in offer_data:
-                    offer_db = Offer(
-                        id=offer["id"],
-                        price=offer["price"],
-                        items_in_stock=offer["items_in_stock"],
-                        product_id=product.id,
-                    )
-                    session.add(offer_db)
-                    session.commit()
-            except Exception as exc:
-                logger_background.exception(
-                    "Error processing product id %s", product.id,
-                )
+                self.refresh_products(session, product_ids, pending)
+            finally:
+                for product_id in pending:
+                    self.scheduler.reschedule(product_id, changed=False, failed=True)
+
+    def refresh_products(self, session, product_ids: list, pending: set):
+        """
+        Refresh the offers of the popped products and reschedule them.
 
-            logger_background.info("Updated offers for the product ID: %s", product.id)
-        logger_background.info("The process of updating the proposals has ended.")
+        Args:
+            session (Session): The database session to write the offers with.
+            product_ids (list[UUID]): IDs of the products to refresh.
+            pending (set[UUID]): IDs of the products not rescheduled yet, updated as they are.
+        """
+        started = time.perf_counter()
+        # Release the connection while the offers are fetched.
+        session.rollback()
+        logger_background.info("Refreshing the offers of %d due products.", len(product_ids))
+        offers_by_product = self.refresh_engine.refresh(self.access_token, product_ids)
+
+        result = offer_sync_writer.sync(session, offers_by_product)
+
+        written_ids = offers_by_product.keys() - result.failed_product_ids
+        self.refresh_engine.confirm(written_ids)
+        skipped_ids = self.refresh_engine.last_skipped
+        failures = len(product_ids) - len(written_ids) - len(skipped_ids)
+        REFRESH_CYCLE_DURATION.observe(time.perf_counter() - started)
+        REFRESHED_PRODUCTS.labels("written").inc(len(written_ids))
+        REFRESHED_PRODUCTS.labels("skipped").inc(len(skipped_ids))
+        REFRESHED_PRODUCTS.labels("failed").inc(failures)
+        logger_background.info(
+            "Refreshed %d products: %d written, %d skipped as unchanged, %d failed.",
+            len(product_ids), len(written_ids), len(skipped_ids), failures,
+        )
+        for product_id in product_ids:
+            self.scheduler.reschedule(
+                product_id,
+                changed=product_id in result.changed_product_ids,
+                failed=product_id not in written_ids and product_id not in skipped_ids,
+            )
+            pending.discard(product_id)
+        if result.price_changes:
+            price_trend_cache.clear()
 
     def run_periodically(self):
         """
         Run periodically the update_offers_data method.
 
-        This method starts the background service and schedules the update_offers_data method to run every 3 minutes.
+        This method starts the background service and runs the update_offers_data method every
+        ``REFRESH_TICK_SECONDS``; each run refreshes only the products that are due.
+        Only the worker holding the refresh leadership updates the offers; the others stay passive
+        and take over when the leader goes away. Every worker flushes the reads it served,
+        so the leader can prioritize frequently read products.
         """
         logger_background.info("Background service started.")
-        interval_minutes = 1
 
         def periodic_task():
             while self.running:
                 try:
-                    self.update_offers_data()
-                    time.sleep(interval_minutes * 60)
+                    with session_scope() as session:
+                        read_tracker.flush(session)
+                    if self.leader_elector.try_acquire():
+                        self.update_offers_data()
+                    else:
+                        # Start from scratch when the leadership is regained.
+                        self.products_synced_at = 0
                 except Exception as exc:
                     logger_background.exception("An error occurred:")
+                time.sleep(Settings.REFRESH_TICK_SECONDS)
 
         periodic_thread = threading.Thread(target=periodic_task)
         periodic_thread.daemon = True
@@ -90,3 +166,4 @@ class BackgroundService:
 
     def stop(self):
         self.running = False
+        self.leader_elector.release()
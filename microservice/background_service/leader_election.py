@@ -0,0 +1,151 @@
+import os
+import socket
+import threading
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from microservice.config.settings import Settings
+from microservice.database.database_setup import engine
+from microservice.utils.logging_configure import get_logger
+
+logger_background = get_logger()
+
+APPLICATION_NAME_PREFIX = "product-aggregator"
+
+
+class LeaderElector:
+    """
+    Elect a single worker process to run the offer refresh.
+
+    The leader holds a session-level Postgres advisory lock on a dedicated connection.
+    When the leader process dies its connection is closed, Postgres releases the lock
+    and the next worker calling try_acquire takes over. The holder is identified through
+    the ``application_name`` of the lock connection.
+    """
+
+    def __init__(self, engine: Engine = engine, lock_key: int = Settings.REFRESH_LEADER_LOCK_KEY,
+                 worker_id: Optional[str] = None):
+        """
+        Initialize the LeaderElector instance.
+
+        Args:
+            engine (Engine): The engine to open the lock connection with.
+            lock_key (int): Key of the advisory lock, shared by all workers.
+            worker_id (str, optional): Identifier of this worker. Defaults to ``hostname:pid``.
+        """
+        self.engine = engine
+        self.lock_key = lock_key
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.connection: Optional[Connection] = None
+        self.lock = threading.Lock()
+
+    @property
+    def is_leader(self) -> bool:
+        return self.connection is not None
+
+    def try_acquire(self) -> bool:
+        """
+        Become the leader if no other worker is, or confirm that this worker still is.
+
+        Returns:
+            bool: True if this worker holds the lock.
+        """
+        with self.lock:
+            if self.connection is not None:
+                if self._connection_alive():
+                    return True
+                logger_background.warning("Worker %s lost the refresh leadership.", self.worker_id)
+                self._discard_connection()
+
+            connection = None
+            try:
+                connection = self.engine.connect()
+                acquired = connection.execute(
+                    text("SELECT pg_try_advisory_lock(:key)"), {"key": self.lock_key}
+                ).scalar()
+                if acquired:
+                    connection.execute(
+                        text("SELECT set_config('application_name', :name, false)"),
+                        {"name": f"{APPLICATION_NAME_PREFIX}:{self.worker_id}"},
+                    )
+                connection.commit()
+            except Exception as exc:
+                logger_background.exception("Error acquiring the refresh leadership:")
+                if connection is not None:
+                    connection.invalidate()
+                    connection.close()
+                return False
+
+            if not acquired:
+                connection.close()
+                return False
+
+            self.connection = connection
+            logger_background.info("Worker %s is now the refresh leader.", self.worker_id)
+            return True
+
+    def release(self):
+        """
+        Give up the leadership, so another worker can take over immediately.
+        """
+        with self.lock:
+            if self.connection is None:
+                return
+            try:
+                self.connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.lock_key})
+                self.connection.commit()
+                logger_background.info("Worker %s released the refresh leadership.", self.worker_id)
+            except Exception as exc:
+                logger_background.exception("Error releasing the refresh leadership:")
+            self._discard_connection()
+
+    def status(self, session) -> dict:
+        """
+        Report which worker holds the refresh leadership.
+
+        Args:
+            session (Session): The database session to query the lock holder with.
+
+        Returns:
+            dict: This worker's ID, whether it is the leader and the current leader, if any.
+        """
+        holder = session.execute(
+            text(
+                "SELECT a.application_name, a.pid, a.client_addr, a.backend_start "
+                "FROM pg_locks l JOIN pg_stat_activity a ON a.pid = l.pid "
+                "WHERE l.locktype = 'advisory' AND l.granted "
+                "AND l.classid = :classid AND l.objid = :objid"
+            ),
+            {"classid": self.lock_key >> 32, "objid": self.lock_key & 0xFFFFFFFF},
+        ).first()
+
+        leader = None
+        if holder:
+            leader = {
+                "worker_id": holder.application_name.removeprefix(f"{APPLICATION_NAME_PREFIX}:"),
+                "backend_pid": holder.pid,
+                "client_addr": str(holder.client_addr) if holder.client_addr else None,
+                "connected_since": holder.backend_start,
+            }
+        return {"worker_id": self.worker_id, "is_leader": self.is_leader, "leader": leader}
+
+    def _connection_alive(self) -> bool:
+        try:
+            self.connection.execute(text("SELECT 1"))
+            self.connection.commit()
+            return True
+        except Exception as exc:
+            return False
+
+    def _discard_connection(self):
+        connection, self.connection = self.connection, None
+        try:
+            connection.invalidate()
+            connection.close()
+        except Exception as exc:
+            logger_background.exception("Error closing the leader connection:")
+
+
+leader_elector = LeaderElector()
@@ -0,0 +1,179 @@
+import asyncio
+import hashlib
+import json
+import time
+from typing import Iterable, Optional
+from uuid import UUID
+
+import httpx
+from pydantic import BaseModel, computed_field
+
+from microservice.config.settings import Settings
+from microservice.services.offers import fetch_product_offer_data
+from microservice.utils.logging_configure import get_logger
+
+logger_background = get_logger()
+
+
+class RefreshStats(BaseModel):
+    """
+    Statistics of a single refresh cycle.
+
+    Attributes:
+        products (int): Number of products the cycle tried to refresh.
+        failures (int): Number of products whose offers could not be fetched.
+        skipped (int): Number of products whose offers were unchanged and need no write.
+        duration (float): Wall-clock duration of the cycle in seconds.
+    """
+
+    products: int = 0
+    failures: int = 0
+    skipped: int = 0
+    duration: float = 0.0
+
+    @computed_field
+    @property
+    def products_per_second(self) -> float:
+        if not self.duration:
+            return 0.0
+        return self.products / self.duration
+
+
+class OfferRefreshEngine:
+    """
+    Fetch offers for many products concurrently from the offers microservice.
+
+    Requests are issued from a single pooled ``httpx.AsyncClient`` (connections are
+    kept alive per host for the whole cycle) and the number of in-flight requests
+    is bounded by ``concurrency``.
+
+    Products whose offers did not change since they were last written are skipped: the
+    ETag of the last written offers is sent as If-None-Match, and when the service does
+    not support it the hash of the raw body is compared instead. The ETag and hash of
+    fetched offers only become the reference once ``confirm`` reports them written.
+    """
+
+    def __init__(
+            self,
+            concurrency: int = Settings.REFRESH_CONCURRENCY,
+            max_connections: int = Settings.REFRESH_MAX_CONNECTIONS,
+            timeout: float = Settings.REFRESH_TIMEOUT_SECONDS,
+            transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Initialize the OfferRefreshEngine instance.
+
+        Args:
+            concurrency (int): Maximum number of concurrent requests to the offers service.
+            max_connections (int): Size of the connection pool.
+            timeout (float): Timeout in seconds for a single request.
+            transport (httpx.AsyncBaseTransport, optional): Custom transport, used in tests.
+        """
+        self.concurrency = concurrency
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+        self.timeout = httpx.Timeout(timeout, connect=Settings.UPSTREAM_CONNECT_TIMEOUT_SECONDS)
+        self.transport = transport
+        self.last_stats: Optional[RefreshStats] = None
+        self.last_skipped: set = set()
+        self.validators = {}
+        self.pending_validators = {}
+
+    def refresh(self, access_token: str, product_ids: Iterable[UUID]) -> dict:
+        """
+        Fetch offers for the given products and report the cycle statistics.
+
+        Args:
+            access_token (str): The access token for the offers microservice.
+            product_ids (Iterable[UUID]): IDs of the products to refresh.
+
+        Returns:
+            dict: Offer data keyed by product ID. Products whose fetch failed or whose offers are
+            unchanged (see ``last_skipped``) are omitted.
+        """
+        offers_by_product, stats = asyncio.run(self._refresh(access_token, list(product_ids)))
+        self.last_stats = stats
+        logger_background.info(
+            "Refresh cycle finished: %d products in %.2fs (%.1f products/s), %d unchanged, %d failures.",
+            stats.products, stats.duration, stats.products_per_second, stats.skipped, stats.failures,
+        )
+        return offers_by_product
+
+    def confirm(self, product_ids: Iterable[UUID]):
+        """
+        Remember the ETag and body hash of offers that were written, to skip them while unchanged.
+
+        Args:
+            product_ids (Iterable[UUID]): IDs of the products whose fetched offers were written.
+        """
+        for product_id in product_ids:
+            if product_id in self.pending_validators:
+                self.validators[product_id] = self.pending_validators.pop(product_id)
+
+    def retain(self, product_ids: Iterable[UUID]):
+        """
+        Forget the ETags and body hashes of products that no longer exist.
+
+        Args:
+            product_ids (Iterable[UUID]): IDs of all existing products.
+        """
+        product_ids = set(product_ids)
+        self.validators = {
+            product_id: validator for product_id, validator in self.validators.items() if product_id in product_ids
+        }
+
+    async def _refresh(self, access_token: str, product_ids: list):
+        """
+        Run the fetches for all products on the event loop.
+
+        Args:
+            access_token (str): The access token for the offers microservice.
+            product_ids (list): IDs of the products to refresh.
+
+        Returns:
+            tuple[dict, RefreshStats]: Offer data keyed by product ID and the cycle statistics.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        started = time.perf_counter()
+        self.pending_validators = {}
+
+        async with httpx.AsyncClient(
+                limits=self.limits, timeout=self.timeout, transport=self.transport
+        ) as client:
+            async def fetch(product_id):
+                etag, _ = self.validators.get(product_id, (None, None))
+                async with semaphore:
+                    return product_id, await fetch_product_offer_data(client, access_token, product_id, etag)
+
+            fetched = await asyncio.gather(*(fetch(product_id) for product_id in product_ids))
+
+        offers_by_product = {}
+        skipped = set()
+        for product_id, payload in fetched:
+            if payload is False:
+                continue
+            if payload.not_modified:
+                skipped.add(product_id)
+                continue
+            body_hash = hashlib.blake2b(payload.body, digest_size=16).hexdigest()
+            if self.validators.get(product_id, (None, None))[1] == body_hash:
+                self.validators[product_id] = (payload.etag, body_hash)
+                skipped.add(product_id)
+                continue
+            try:
+                offers_by_product[product_id] = json.loads(payload.body)
+            except ValueError:
+                logger_background.error("Invalid offers JSON for product %s.", product_id)
+                continue
+            self.pending_validators[product_id] = (payload.etag, body_hash)
+
+        self.last_skipped = skipped
+        stats = RefreshStats(
+            products=len(product_ids),
+            failures=len(product_ids) - len(offers_by_product) - len(skipped),
+            skipped=len(skipped),
+            duration=time.perf_counter() - started,
+        )
+        return offers_by_product, stats
@@ -0,0 +1,193 @@
+import heapq
+import math
+import threading
+import time
+from typing import Iterable
+
+
+class TokenBucket:
+    """
+    Token bucket limiting the rate of outbound calls to the offers service.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock=time.monotonic):
+        """
+        Initialize the TokenBucket instance.
+
+        Args:
+            rate (float): Tokens added per second.
+            capacity (float): Maximum number of tokens the bucket holds.
+            clock (callable): Monotonic clock returning seconds, replaceable in tests.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated_at = clock()
+
+    def take(self, wanted: int) -> int:
+        """
+        Take up to ``wanted`` whole tokens.
+
+        Args:
+            wanted (int): Number of tokens the caller would like to use.
+
+        Returns:
+            int: Number of tokens taken.
+        """
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        taken = min(wanted, int(self.tokens))
+        self.tokens -= taken
+        return taken
+
+
+class RefreshScheduler:
+    """
+    Priority queue of products keyed by the time their offers are next due for a refresh.
+
+    Every product has its own refresh interval, kept between the minimum and maximum staleness.
+    The interval shrinks when a refresh observes changed offers or the product is read, and
+    grows while its offers stay the same.
+    """
+
+    def __init__(self, min_staleness: float, max_staleness: float, initial_interval: float,
+                 clock=time.time):
+        """
+        Initialize the RefreshScheduler instance.
+
+        Args:
+            min_staleness (float): Shortest interval between two refreshes of a product, in seconds.
+            max_staleness (float): Longest interval between two refreshes of a product, in seconds.
+            initial_interval (float): Interval of products without refresh history, in seconds.
+            clock (callable): Clock returning seconds, replaceable in tests.
+        """
+        self.min_staleness = min_staleness
+        self.max_staleness = max_staleness
+        self.initial_interval = initial_interval
+        self.clock = clock
+        self.queue = []
+        self.due_at = {}
+        self.intervals = {}
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.due_at)
+
+    def sync_products(self, product_ids: Iterable):
+        """
+        Track new products, due immediately, and forget deleted ones.
+
+        Args:
+            product_ids (Iterable[UUID]): IDs of all existing products.
+        """
+        product_ids = set(product_ids)
+        now = self.clock()
+        with self.lock:
+            for product_id in list(self.due_at):
+                if product_id not in product_ids:
+                    del self.due_at[product_id]
+                    del self.intervals[product_id]
+            for product_id in product_ids - self.due_at.keys():
+                self.intervals[product_id] = self.initial_interval
+                self._schedule(product_id, now)
+
+    def record_reads(self, reads: dict):
+        """
+        Shorten the interval of read products and bring their next refresh forward.
+
+        Args:
+            reads (dict): Number of reads keyed by product ID since the last call.
+        """
+        now = self.clock()
+        with self.lock:
+            for product_id, count in reads.items():
+                if product_id not in self.due_at or count <= 0:
+                    continue
+                last_refresh = self.due_at[product_id] - self.intervals[product_id]
+                interval = self._bounded(self.intervals[product_id] / (1 + math.log1p(count)))
+                self.intervals[product_id] = interval
+                due_at = max(last_refresh + interval, now)
+                if due_at < self.due_at[product_id]:
+                    self._schedule(product_id, due_at)
+
+    def due_count(self) -> int:
+        """
+        Get the number of products whose refresh is due.
+
+        Returns:
+            int: Number of due products.
+        """
+        now = self.clock()
+        with self.lock:
+            return sum(1 for due_at in self.due_at.values() if due_at <= now)
+
+    def pop_due(self, limit: int) -> list:
+        """
+        Take the most overdue products out of the queue.
+
+        Args:
+            limit (int): Maximum number of products to return.
+
+        Returns:
+            list[UUID]: IDs of the products to refresh now, most overdue first.
+        """
+        now = self.clock()
+        product_ids = []
+        with self.lock:
+            while self.queue and len(product_ids) < limit:
+                due_at, product_id = self.queue[0]
+                if due_at > now:
+                    break
+                heapq.heappop(self.queue)
+                if self.due_at.get(product_id) != due_at:
+                    # Stale entry of a rescheduled or deleted product.
+                    continue
+                product_ids.append(product_id)
+        return product_ids
+
+    def reschedule(self, product_id, changed: bool, failed: bool = False):
+        """
+        Schedule the next refresh of a product after it was refreshed.
+
+        Args:
+            product_id (UUID): ID of the refreshed product.
+            changed (bool): Whether the refresh changed the product's offers.
+            failed (bool): Whether the refresh failed; the product is then retried after the minimum staleness.
+        """
+        now = self.clock()
+        with self.lock:
+            if product_id not in self.due_at:
+                return
+            if failed:
+                self._schedule(product_id, now + self.min_staleness)
+                return
+            interval = self.intervals[product_id]
+            interval = interval / 2 if changed else interval * 1.5
+            self.intervals[product_id] = self._bounded(interval)
+            self._schedule(product_id, now + self.intervals[product_id])
+
+    def seconds_until_due(self) -> float:
+        """
+        Get the time until the next product is due.
+
+        Returns:
+            float: Seconds until the next refresh, 0 if one is due, or the maximum staleness when empty.
+        """
+        now = self.clock()
+        with self.lock:
+            if not self.due_at:
+                return self.max_staleness
+            return max(min(self.due_at.values()) - now, 0.0)
+
+    def _schedule(self, product_id, due_at: float):
+        self.due_at[product_id] = due_at
+        heapq.heappush(self.queue, (due_at, product_id))
+        if len(self.queue) > 2 * len(self.due_at) + 64:
+            # Drop stale entries once they outnumber the live ones.
+            self.queue = [(due, key) for key, due in self.due_at.items()]
+            heapq.heapify(self.queue)
+
+    def _bounded(self, interval: float) -> float:
+        return min(max(interval, self.min_staleness), self.max_staleness)
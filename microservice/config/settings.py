@@ -13,6 +13,73 @@ class Settings:
     DB_HOST = config("DB_HOST")
     DB_NAME = config("DB_NAME")
 
+    DB_POOL_SIZE = config("DB_POOL_SIZE", default=10, cast=int)
+    DB_MAX_OVERFLOW = config("DB_MAX_OVERFLOW", default=20, cast=int)
+    DB_POOL_TIMEOUT = config("DB_POOL_TIMEOUT", default=30, cast=float)
+    DB_POOL_RECYCLE = config("DB_POOL_RECYCLE", default=1800, cast=int)
+    DB_POOL_PRE_PING = config("DB_POOL_PRE_PING", default=True, cast=bool)
+    DB_ASYNC_READS = config("DB_ASYNC_READS", default=False, cast=bool)
+    DB_MIGRATE_ON_STARTUP = config("DB_MIGRATE_ON_STARTUP", default=True, cast=bool)
+    DB_MIGRATIONS_LOCK_KEY = config("DB_MIGRATIONS_LOCK_KEY", default=72700402, cast=int)
+
     REFRESH_TOKEN = config("REFRESH_TOKEN")
 
+    METRICS_ENABLED = config("METRICS_ENABLED", default=True, cast=bool)
+
+    LOG_LEVEL = config("LOG_LEVEL", default="INFO")
+    LOG_FORMAT = config("LOG_FORMAT", default="json")
+    LOG_QUEUE = config("LOG_QUEUE", default=True, cast=bool)
+
+    QUERY_PROFILER_ENABLED = config("QUERY_PROFILER_ENABLED", default=False, cast=bool)
+    QUERY_PROFILER_ALLOW_HEADER = config("QUERY_PROFILER_ALLOW_HEADER", default=False, cast=bool)
+    QUERY_PROFILER_REPEAT_THRESHOLD = config("QUERY_PROFILER_REPEAT_THRESHOLD", default=2, cast=int)
+
+    UPSTREAM_POOL_SIZE = config("UPSTREAM_POOL_SIZE", default=20, cast=int)
+    UPSTREAM_CONNECT_TIMEOUT_SECONDS = config("UPSTREAM_CONNECT_TIMEOUT_SECONDS", default=3.05, cast=float)
+    UPSTREAM_READ_TIMEOUT_SECONDS = config("UPSTREAM_READ_TIMEOUT_SECONDS", default=10, cast=float)
+    UPSTREAM_MAX_RETRIES = config("UPSTREAM_MAX_RETRIES", default=3, cast=int)
+    UPSTREAM_BACKOFF_SECONDS = config("UPSTREAM_BACKOFF_SECONDS", default=0.5, cast=float)
+    UPSTREAM_MAX_BACKOFF_SECONDS = config("UPSTREAM_MAX_BACKOFF_SECONDS", default=8, cast=float)
+    UPSTREAM_BREAKER_FAILURES = config("UPSTREAM_BREAKER_FAILURES", default=5, cast=int)
+    UPSTREAM_BREAKER_RESET_SECONDS = config("UPSTREAM_BREAKER_RESET_SECONDS", default=30, cast=float)
+
+    REFRESH_CONCURRENCY = config("REFRESH_CONCURRENCY", default=20, cast=int)
+    REFRESH_MAX_CONNECTIONS = config("REFRESH_MAX_CONNECTIONS", default=20, cast=int)
+    REFRESH_TIMEOUT_SECONDS = config("REFRESH_TIMEOUT_SECONDS", default=10, cast=float)
+
+    REFRESH_TICK_SECONDS = config("REFRESH_TICK_SECONDS", default=5, cast=float)
+    REFRESH_RATE_PER_SECOND = config("REFRESH_RATE_PER_SECOND", default=10, cast=float)
+    REFRESH_BURST = config("REFRESH_BURST", default=50, cast=int)
+    REFRESH_MIN_STALENESS_SECONDS = config("REFRESH_MIN_STALENESS_SECONDS", default=30, cast=float)
+    REFRESH_MAX_STALENESS_SECONDS = config("REFRESH_MAX_STALENESS_SECONDS", default=900, cast=float)
+    REFRESH_INITIAL_INTERVAL_SECONDS = config("REFRESH_INITIAL_INTERVAL_SECONDS", default=60, cast=float)
+    REFRESH_PRODUCT_SYNC_SECONDS = config("REFRESH_PRODUCT_SYNC_SECONDS", default=60, cast=float)
+
+    REFRESH_LEADER_LOCK_KEY = config("REFRESH_LEADER_LOCK_KEY", default=72700401, cast=int)
+
+    REGISTRATION_POLL_SECONDS = config("REGISTRATION_POLL_SECONDS", default=2, cast=float)
+    REGISTRATION_BATCH_SIZE = config("REGISTRATION_BATCH_SIZE", default=20, cast=int)
+    REGISTRATION_CONCURRENCY = config("REGISTRATION_CONCURRENCY", default=4, cast=int)
+    REGISTRATION_MAX_ATTEMPTS = config("REGISTRATION_MAX_ATTEMPTS", default=8, cast=int)
+    REGISTRATION_BACKOFF_SECONDS = config("REGISTRATION_BACKOFF_SECONDS", default=5, cast=float)
+    REGISTRATION_MAX_BACKOFF_SECONDS = config("REGISTRATION_MAX_BACKOFF_SECONDS", default=600, cast=float)
+    REGISTRATION_LEASE_SECONDS = config("REGISTRATION_LEASE_SECONDS", default=120, cast=float)
+
+    PRODUCT_IMPORT_BATCH_SIZE = config("PRODUCT_IMPORT_BATCH_SIZE", default=1000, cast=int)
+    PRODUCT_IMPORT_MAX_ERRORS = config("PRODUCT_IMPORT_MAX_ERRORS", default=100, cast=int)
+    PRODUCT_IMPORT_MAX_LINE_BYTES = config("PRODUCT_IMPORT_MAX_LINE_BYTES", default=1048576, cast=int)
+    PRODUCT_BULK_DELETE_MAX_IDS = config("PRODUCT_BULK_DELETE_MAX_IDS", default=1000, cast=int)
+
+    OFFER_SYNC_BATCH_SIZE = config("OFFER_SYNC_BATCH_SIZE", default=100, cast=int)
+
+    CACHE_TTL_SECONDS = config("CACHE_TTL_SECONDS", default=60, cast=float)
+    CACHE_MAX_ENTRIES = config("CACHE_MAX_ENTRIES", default=10000, cast=int)
+    CACHE_BACKEND = config("CACHE_BACKEND", default="local")
+    CACHE_LOCAL_TTL_SECONDS = config("CACHE_LOCAL_TTL_SECONDS", default=5, cast=float)
+    CACHE_KEY_PREFIX = config("CACHE_KEY_PREFIX", default="product-aggregator")
+    REDIS_URL = config("REDIS_URL", default="redis://localhost:6379/0")
 
+    PRICE_HISTORY_PARTITIONS_AHEAD = config("PRICE_HISTORY_PARTITIONS_AHEAD", default=2, cast=int)
+    PAGE_MAX_LIMIT = config("PAGE_MAX_LIMIT", default=1000, cast=int)
+    EXPORT_BATCH_SIZE = config("EXPORT_BATCH_SIZE", default=5000, cast=int)
+    PRICE_TREND_BATCH_MAX_PRODUCTS = config("PRICE_TREND_BATCH_MAX_PRODUCTS", default=500, cast=int)
@@ -1,11 +1,106 @@
+from contextlib import contextmanager
+
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from microservice.config.settings import Settings
+from microservice.utils.metrics import instrument_engine
+from microservice.utils.query_profiler import profile_engine
+
+
+DATABASE_URL = f"{Settings.DB_USERNAME}:{Settings.DB_PASSWORD}@{Settings.DB_HOST}/{Settings.DB_NAME}"
 
+POOL_OPTIONS = {
+    "pool_size": Settings.DB_POOL_SIZE,
+    "max_overflow": Settings.DB_MAX_OVERFLOW,
+    "pool_timeout": Settings.DB_POOL_TIMEOUT,
+    "pool_recycle": Settings.DB_POOL_RECYCLE,
+    "pool_pre_ping": Settings.DB_POOL_PRE_PING,
+}
 
-engine = create_engine(
-    f"postgresql://{Settings.DB_USERNAME}:{Settings.DB_PASSWORD}@{Settings.DB_HOST}/{Settings.DB_NAME}"
-)
+engine = create_engine(f"postgresql://{DATABASE_URL}", **POOL_OPTIONS)
 
 Session = sessionmaker(bind=engine)
-session = Session()
+
+# The async engine serves the read endpoints when DB_ASYNC_READS is enabled.
+async_engine = None
+AsyncSession = None
+if Settings.DB_ASYNC_READS:
+    async_engine = create_async_engine(f"postgresql+asyncpg://{DATABASE_URL}", **POOL_OPTIONS)
+    AsyncSession = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+if Settings.METRICS_ENABLED:
+    instrument_engine(engine)
+    if async_engine is not None:
+        instrument_engine(async_engine.sync_engine)
+
+if Settings.QUERY_PROFILER_ENABLED or Settings.QUERY_PROFILER_ALLOW_HEADER:
+    profile_engine(engine)
+    if async_engine is not None:
+        profile_engine(async_engine.sync_engine)
+
+
+def get_session():
+    """
+    Provide a database session for a single request.
+
+    The session is rolled back if the request fails and is always returned to the pool.
+
+    Yields:
+        Session: A new database session.
+    """
+    with session_scope() as session:
+        yield session
+
+
+@contextmanager
+def session_scope():
+    """
+    Provide a database session outside of a request, e.g. in background threads.
+
+    Yields:
+        Session: A new database session, rolled back on error and closed on exit.
+    """
+    session = Session()
+    try:
+        yield session
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+async def get_async_session():
+    """
+    Provide an async database session for a single request.
+
+    Yields:
+        AsyncSession: A new async database session.
+    """
+    async with AsyncSession() as session:
+        yield session
+
+
+def pool_status():
+    """
+    Get the current state of the connection pools.
+
+    Returns:
+        dict: Pool size, checked-in, checked-out and overflow connection counts,
+        with the async pool reported under ``async`` when it is enabled.
+    """
+    status = _pool_status(engine.pool)
+    if async_engine is not None:
+        status["async"] = _pool_status(async_engine.pool)
+    return status
+
+
+def _pool_status(pool):
+    return {
+        "pool_size": pool.size(),
+        "max_overflow": Settings.DB_MAX_OVERFLOW,
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+    }
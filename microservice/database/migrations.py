@@ -0,0 +1,46 @@
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+
+from microservice.config.settings import Settings
+from microservice.database.database_setup import engine
+from microservice.models.models import OfferPriceHistory
+from microservice.utils.logging_configure import get_logger
+
+logger_api = get_logger()
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """
+    Leave out of autogenerate the monthly price history partitions, managed by
+    ensure_price_history_partitions, and the ``unique`` flags of primary key columns,
+    which are never created since the primary key is unique already.
+    """
+    table = object if type_ == "table" else getattr(object, "table", None)
+    if table is not None and table.name.startswith(f"{OfferPriceHistory.__tablename__}_"):
+        return False
+    if type_ == "unique_constraint" and not reflected:
+        return set(object.columns) != set(object.table.primary_key.columns)
+    return True
+
+
+def upgrade_database(revision: str = "head"):
+    """
+    Apply the Alembic migrations up to a revision.
+
+    The migrations run in one transaction holding an advisory lock, so workers starting
+    at the same time apply them once.
+
+    Args:
+        revision (str): The revision to upgrade to.
+    """
+    config = Config(str(ALEMBIC_INI))
+    with engine.begin() as connection:
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": Settings.DB_MIGRATIONS_LOCK_KEY})
+        config.attributes["connection"] = connection
+        command.upgrade(config, revision)
+    logger_api.info("Database schema is up to date.")
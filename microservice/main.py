@@ -1,33 +1,53 @@
-from logging.config import dictConfig
 from threading import Thread
 
 from fastapi import FastAPI
 
 from microservice.background_service.background_service import \
     BackgroundService
+from microservice.config.settings import Settings
 from microservice.database.database_setup import engine
-from microservice.models.base_model import Base
-from microservice.models.auth_model import User
-from microservice.models.models import Offer, Product
+from microservice.database.migrations import upgrade_database
 from microservice.routes.api import api_router
-from microservice.utils.logging_configure import LogConfig
+from microservice.services.cache import start_cache_invalidation_listener
+from microservice.services.offer_summary import backfill_offer_summaries
+from microservice.services.price_history import ensure_price_history_partitions
+from microservice.services.registration_outbox import registration_worker
+from microservice.utils.logging_configure import RequestIdMiddleware, configure_logging
+from microservice.utils.metrics import MetricsMiddleware
+from microservice.utils.query_profiler import QueryProfilerMiddleware
 
 app = FastAPI()
 app.include_router(api_router)
+if Settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+if Settings.QUERY_PROFILER_ENABLED or Settings.QUERY_PROFILER_ALLOW_HEADER:
+    app.add_middleware(QueryProfilerMiddleware)
+app.add_middleware(RequestIdMiddleware)
 
-dictConfig(LogConfig().model_dump())
+configure_logging()
 
 bg_service = BackgroundService()
+cache_listener = None
 
-Base.metadata.create_all(engine)
+if Settings.DB_MIGRATE_ON_STARTUP:
+    upgrade_database()
+with engine.begin() as connection:
+    ensure_price_history_partitions(connection)
+    backfill_offer_summaries(connection)
 
 
 @app.on_event("startup")
 def startup():
+    global cache_listener
+    cache_listener = start_cache_invalidation_listener()
+    registration_worker.start()
     thread = Thread(target=bg_service.run_periodically)
     thread.start()
 
 
 @app.on_event("shutdown")
 def shutdown():
-    bg_service.stop()
\ No newline at end of file
+    bg_service.stop()
+    registration_worker.stop()
+    if cache_listener:
+        cache_listener.stop()
\ No newline at end of file
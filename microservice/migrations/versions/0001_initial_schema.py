@@ -0,0 +1,102 @@
+"""Initial schema with composite offer indexes
+
+Creates the tables that databases set up with ``Base.metadata.create_all`` already have,
+skipping existing ones, and adds the (product_id, timestamp) and (product_id, price)
+indexes of the offers table.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _offline() -> bool:
+    return op.get_context().as_sql
+
+
+def _create_table(name: str, *columns, **kwargs):
+    if _offline() or not sa.inspect(op.get_bind()).has_table(name):
+        op.create_table(name, *columns, **kwargs)
+
+
+def _create_index(name: str, table: str, columns: list, **kwargs):
+    if _offline() or name not in {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)}:
+        op.create_index(name, table, columns, **kwargs)
+
+
+def upgrade():
+    _create_table(
+        "users",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("username", sa.String()),
+        sa.Column("email", sa.String()),
+        sa.Column("hashed_password", sa.String()),
+    )
+    _create_index("ix_users_email", "users", ["email"], unique=True)
+
+    _create_table(
+        "products",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("name", sa.String()),
+        sa.Column("description", sa.String()),
+    )
+
+    _create_table(
+        "offers",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("price", sa.Integer()),
+        sa.Column("items_in_stock", sa.Integer()),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+        sa.Column("product_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("products.id")),
+    )
+    _create_index("ix_offers_product_id_id", "offers", ["product_id", "id"])
+    _create_index("ix_offers_price", "offers", ["price"])
+    _create_index("ix_offers_in_stock_id", "offers", ["id"], postgresql_where=sa.text("items_in_stock > 0"))
+    _create_index("ix_offers_product_id_timestamp", "offers", ["product_id", "timestamp"])
+    _create_index("ix_offers_product_id_price", "offers", ["product_id", "price"])
+
+    _create_table(
+        "offer_price_history",
+        sa.Column("id", sa.BigInteger(), autoincrement=True),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+        sa.Column("offer_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("price", sa.Integer()),
+        sa.Column("items_in_stock", sa.Integer()),
+        sa.Column("product_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("products.id"), nullable=False),
+        sa.PrimaryKeyConstraint("id", "timestamp"),
+    )
+    _create_index(
+        "ix_offer_price_history_product_id_timestamp", "offer_price_history", ["product_id", "timestamp"]
+    )
+
+    _create_table(
+        "offer_summaries",
+        sa.Column("product_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("products.id"), primary_key=True),
+        sa.Column("offer_count", sa.Integer(), nullable=False),
+        sa.Column("min_price", sa.Integer()),
+        sa.Column("avg_price", sa.Float()),
+        sa.Column("max_price", sa.Integer()),
+        sa.Column("total_stock", sa.Integer()),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    _create_index("ix_offer_summaries_min_price", "offer_summaries", ["min_price", "product_id"])
+    _create_index("ix_offer_summaries_total_stock", "offer_summaries", ["total_stock", "product_id"])
+
+    _create_table(
+        "product_read_counts",
+        sa.Column("product_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("reads", sa.Integer(), nullable=False),
+    )
+
+
+def downgrade():
+    for table in ("product_read_counts", "offer_summaries", "offer_price_history", "offers", "products", "users"):
+        op.drop_table(table)
@@ -0,0 +1,41 @@
+"""Product import jobs
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "product_import_jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("format", sa.String(), nullable=False),
+        sa.Column("imported", sa.Integer(), nullable=False),
+        sa.Column("rejected", sa.Integer(), nullable=False),
+        sa.Column("errors", postgresql.JSONB(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("finished_at", sa.DateTime()),
+    )
+    op.add_column(
+        "product_registration_outbox",
+        sa.Column("import_job_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("product_import_jobs.id")),
+    )
+    op.create_index(
+        "ix_product_registration_outbox_import_job_id", "product_registration_outbox", ["import_job_id", "status"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_product_registration_outbox_import_job_id", "product_registration_outbox")
+    op.drop_column("product_registration_outbox", "import_job_id")
+    op.drop_table("product_import_jobs")
@@ -0,0 +1,28 @@
+"""Cascade product deletes
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00
+"""
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+PRODUCT_REFERENCES = ("offers", "offer_price_history", "offer_summaries", "product_registration_outbox")
+
+
+def upgrade():
+    for table in PRODUCT_REFERENCES:
+        op.drop_constraint(f"{table}_product_id_fkey", table, type_="foreignkey")
+        op.create_foreign_key(
+            f"{table}_product_id_fkey", table, "products", ["product_id"], ["id"], ondelete="CASCADE"
+        )
+
+
+def downgrade():
+    for table in PRODUCT_REFERENCES:
+        op.drop_constraint(f"{table}_product_id_fkey", table, type_="foreignkey")
+        op.create_foreign_key(f"{table}_product_id_fkey", table, "products", ["product_id"], ["id"])
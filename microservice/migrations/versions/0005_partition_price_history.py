@@ -0,0 +1,96 @@
+"""Partition the price history by month
+
+Rebuilds the plain offer_price_history table created by 0001 as a table range partitioned
+by month on timestamp. Monthly partitions are created for the existing rows and the coming
+months, so the default partition starts empty. Tables that are partitioned already are left as is.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from microservice.config.settings import Settings
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+TABLE = "offer_price_history"
+COLUMNS = "id, timestamp, offer_id, price, items_in_stock, product_id"
+
+
+def _offline() -> bool:
+    return op.get_context().as_sql
+
+
+def _is_partitioned() -> bool:
+    return op.get_bind().scalar(
+        sa.text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:table)"), {"table": TABLE}
+    )
+
+
+def _month_start(year: int, month: int) -> date:
+    return date(year + (month - 1) // 12, (month - 1) % 12 + 1, 1)
+
+
+def _partition_months() -> list:
+    today = date.today()
+    first = last = today
+    if not _offline():
+        bounds = op.get_bind().execute(sa.text(f"SELECT min(timestamp), max(timestamp) FROM {TABLE}_old")).one()
+        if bounds[0] is not None:
+            first, last = min(bounds[0].date(), today), max(bounds[1].date(), today)
+    months = (last.year - first.year) * 12 + last.month - first.month + Settings.PRICE_HISTORY_PARTITIONS_AHEAD
+    return [_month_start(first.year, first.month + offset) for offset in range(months + 1)]
+
+
+def _rebuild(partitioned: bool):
+    # The old table keeps its rows until they are copied; its names are freed for the new one.
+    op.rename_table(TABLE, f"{TABLE}_old")
+    op.execute(f"ALTER SEQUENCE {TABLE}_id_seq RENAME TO {TABLE}_old_id_seq")
+    op.execute(f"ALTER INDEX {TABLE}_pkey RENAME TO {TABLE}_old_pkey")
+    op.execute(f"ALTER INDEX ix_{TABLE}_product_id_timestamp RENAME TO ix_{TABLE}_old_product_id_timestamp")
+
+    op.create_table(
+        TABLE,
+        sa.Column("id", sa.BigInteger(), autoincrement=True),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+        sa.Column("offer_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("price", sa.Integer()),
+        sa.Column("items_in_stock", sa.Integer()),
+        sa.Column(
+            "product_id", postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("products.id", ondelete="CASCADE"), nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id", "timestamp"),
+        **({"postgresql_partition_by": "RANGE (timestamp)"} if partitioned else {}),
+    )
+    op.create_index(f"ix_{TABLE}_product_id_timestamp", TABLE, ["product_id", "timestamp"])
+    if partitioned:
+        for start in _partition_months():
+            end = _month_start(start.year, start.month + 1)
+            op.execute(
+                f"CREATE TABLE {TABLE}_y{start:%Y}m{start:%m} PARTITION OF {TABLE} "
+                f"FOR VALUES FROM ('{start}') TO ('{end}')"
+            )
+        op.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT")
+
+    op.execute(f"INSERT INTO {TABLE} ({COLUMNS}) SELECT {COLUMNS} FROM {TABLE}_old")
+    op.execute(f"SELECT setval('{TABLE}_id_seq', COALESCE((SELECT max(id) FROM {TABLE}), 0) + 1, false)")
+    op.execute(f"DROP TABLE {TABLE}_old")
+
+
+def upgrade():
+    if _offline() or not _is_partitioned():
+        _rebuild(partitioned=True)
+
+
+def downgrade():
+    if _offline() or _is_partitioned():
+        _rebuild(partitioned=False)
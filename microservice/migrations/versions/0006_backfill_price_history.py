@@ -0,0 +1,32 @@
+"""Backfill the price history with the current offers
+
+History rows are only written when an offer is inserted or changes, so offers stored
+before the history existed get a row with their current price, stock and timestamp.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 00:00:00
+"""
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        """
+        INSERT INTO offer_price_history (timestamp, offer_id, price, items_in_stock, product_id)
+        SELECT offers.timestamp, offers.id, offers.price, offers.items_in_stock, offers.product_id
+        FROM offers
+        WHERE offers.product_id IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM offer_price_history WHERE offer_price_history.offer_id = offers.id)
+        """
+    )
+
+
+def downgrade():
+    # The backfilled rows cannot be told apart from recorded changes, so they are kept.
+    pass
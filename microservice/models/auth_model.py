@@ -45,7 +45,7 @@ class User(Base):
         try:
             self.hashed_password = bcrypt_sha256.hash(password)
         except Exception as e:
-            logger_api.error(f"Error hashing password: {e}")
+            logger_api.error("Error hashing password: %s", e)
 
     def check_password(self, password: str):
         """
@@ -60,7 +60,7 @@ class User(Base):
         try:
             return bcrypt_sha256.verify(password, self.hashed_password)
         except Exception as e:
-            logger_api.error(f"Error verifying password: {e}")
+            logger_api.error("Error verifying password: %s", e)
             return False
 
 
@@ -78,5 +78,5 @@ def is_valid_password(password: str):
     try:
         return re.match(regex_pattern, password) is not None
     except Exception as e:
-        logger_api.error(f"Error checking password complexity: {e}")
+        logger_api.error("Error checking password complexity: %s", e)
         return False
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, ForeignKey, Integer, String, DateTime
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import BigInteger, Column, Float, ForeignKey, Index, Integer, String, DateTime, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
 
 from microservice.models.base_model import Base
@@ -29,7 +29,7 @@ class Product(Base):
     name = Column(String)
     description = Column(String)
 
-    offers = relationship("Offer", back_populates="product")
+    offers = relationship("Offer", back_populates="product", passive_deletes=True)
 
 
 class Offer(Base):
@@ -44,14 +44,166 @@ class Offer(Base):
     """
 
     __tablename__ = "offers"
+    __table_args__ = (
+        Index("ix_offers_product_id_id", "product_id", "id"),
+        Index("ix_offers_product_id_timestamp", "product_id", "timestamp"),
+        Index("ix_offers_product_id_price", "product_id", "price"),
+        Index("ix_offers_price", "price"),
+        Index("ix_offers_in_stock_id", "id", postgresql_where=text("items_in_stock > 0")),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, unique=True)
     price = Column(Integer)
     items_in_stock = Column(Integer)
     timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
 
-    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id"))
+    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"))
 
     product = relationship("Product", back_populates="offers")
 
 
+class OfferPriceHistory(Base):
+    """
+    Append-only history of offer prices and stock.
+
+    A row is written by the refresh pipeline only when the price or stock of an offer changes.
+    The table is range partitioned by month on ``timestamp``.
+
+    Attributes:
+        id (int): Sequential identifier of the history row.
+        timestamp (datetime): The time the change was observed.
+        offer_id (UUID): The offer that changed.
+        product_id (UUID): The foreign key referencing the associated product.
+        price (int): The new price of the offer.
+        items_in_stock (int): The new number of items in stock.
+    """
+
+    __tablename__ = "offer_price_history"
+    __table_args__ = (
+        Index("ix_offer_price_history_product_id_timestamp", "product_id", "timestamp"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    timestamp = Column(DateTime, primary_key=True, default=datetime.utcnow, nullable=False)
+    offer_id = Column(UUID(as_uuid=True), nullable=False)
+    price = Column(Integer)
+    items_in_stock = Column(Integer)
+
+    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+
+
+class OfferSummary(Base):
+    """
+    Aggregate of the current offers of a product.
+
+    Maintained by the refresh pipeline for every product whose offers change; products
+    without offers have no summary.
+
+    Attributes:
+        product_id (UUID): The foreign key referencing the summarized product.
+        offer_count (int): Number of offers.
+        min_price (int): Price of the cheapest offer.
+        avg_price (float): Average offer price.
+        max_price (int): Price of the most expensive offer.
+        total_stock (int): Items in stock over all offers.
+        updated_at (datetime): The time the summary was last computed.
+    """
+
+    __tablename__ = "offer_summaries"
+    __table_args__ = (
+        Index("ix_offer_summaries_min_price", "min_price", "product_id"),
+        Index("ix_offer_summaries_total_stock", "total_stock", "product_id"),
+    )
+
+    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    offer_count = Column(Integer, nullable=False)
+    min_price = Column(Integer)
+    avg_price = Column(Float)
+    max_price = Column(Integer)
+    total_stock = Column(Integer)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class ProductReadCount(Base):
+    """
+    Reads of a product's data not yet consumed by the refresh scheduler.
+
+    Every worker adds the reads it served; the refresh leader consumes them to
+    refresh popular products more often.
+
+    Attributes:
+        product_id (UUID): The product that was read.
+        reads (int): Number of reads since the scheduler last consumed them.
+    """
+
+    __tablename__ = "product_read_counts"
+
+    product_id = Column(UUID(as_uuid=True), primary_key=True)
+    reads = Column(Integer, nullable=False, default=0)
+
+
+class ProductRegistration(Base):
+    """
+    Outbox entry registering a new product in the offers service.
+
+    The entry is written in the same transaction as the product and processed by the
+    registration worker, which registers the product and loads its first offers.
+
+    Attributes:
+        product_id (UUID): The foreign key referencing the product to register.
+        status (str): ``pending`` until registered, ``registered`` until the offers are loaded,
+            then ``completed``; ``failed`` once the attempts are exhausted.
+        attempts (int): Number of processing attempts.
+        next_attempt_at (datetime): The earliest time of the next attempt.
+        last_error (str): The error of the last failed attempt.
+        import_job_id (UUID): The bulk import that created the product, if any.
+        created_at (datetime): The time the product was created.
+        updated_at (datetime): The time the entry last changed.
+    """
+
+    __tablename__ = "product_registration_outbox"
+    __table_args__ = (
+        Index(
+            "ix_product_registration_outbox_next_attempt_at",
+            "next_attempt_at",
+            postgresql_where=text("status IN ('pending', 'registered')"),
+        ),
+        Index("ix_product_registration_outbox_import_job_id", "import_job_id", "status"),
+    )
+
+    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_error = Column(String)
+    import_job_id = Column(UUID(as_uuid=True), ForeignKey("product_import_jobs.id"))
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class ProductImportJob(Base):
+    """
+    A bulk import of products.
+
+    Attributes:
+        id (UUID): The unique identifier for the import.
+        status (str): ``running`` while the upload is read, then ``completed`` or ``failed``.
+        format (str): Format of the upload, ``ndjson`` or ``csv``.
+        imported (int): Number of products created so far.
+        rejected (int): Number of invalid rows.
+        errors (list): The first invalid rows with their line numbers and errors.
+        created_at (datetime): The time the import started.
+        finished_at (datetime): The time the upload was read completely.
+    """
+
+    __tablename__ = "product_import_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    status = Column(String, nullable=False, default="running")
+    format = Column(String, nullable=False)
+    imported = Column(Integer, nullable=False, default=0)
+    rejected = Column(Integer, nullable=False, default=0)
+    errors = Column(JSONB, nullable=False, default=list)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = Column(DateTime)
@@ -1,10 +1,20 @@
 from fastapi import APIRouter
 
-from microservice.routes import offer_routes, product_routes, auth_routes
+from microservice.config.settings import Settings
+from microservice.routes import offer_routes, product_routes, auth_routes, status_routes, metrics_routes
 
 
 api_router = APIRouter()
 
+if Settings.DB_ASYNC_READS:
+    from microservice.routes import async_offer_routes, async_product_routes
+
+    # Registered first, so the async GET handlers take precedence over the sync ones.
+    api_router.include_router(async_product_routes.router, prefix="/products", tags=["Products"])
+    api_router.include_router(async_offer_routes.router, prefix="/offers", tags=["Offers"])
+
 api_router.include_router(product_routes.router, prefix="/products", tags=["Products"])
 api_router.include_router(offer_routes.router, prefix="/offers", tags=["Offers"])
 api_router.include_router(auth_routes.router, prefix="/user", tags=["Auth"])
+api_router.include_router(status_routes.router, prefix="/status", tags=["Status"])
+api_router.include_router(metrics_routes.router, tags=["Metrics"])
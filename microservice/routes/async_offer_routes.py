@@ -0,0 +1,206 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from microservice.config.settings import Settings
+from microservice.database.database_setup import get_async_session
+from microservice.services.cache import offers_cache, price_trend_cache
+from microservice.services.read_tracker import read_tracker
+from microservice.models.models import Offer, Product
+from microservice.routes.offer_routes import (
+    OFFER_COLUMNS, OfferResponse, OfferSummaryResponse, PriceTrendBatchRequest, offer_filters, offer_rows,
+    price_trend_cache_key,
+)
+from microservice.services.offer_summary import SummarySort, offer_summaries_statement, summary_cursor_key
+from microservice.services.price_trend import (
+    PriceBucket, batch_price_trend_response, price_buckets_statement, price_points_statement, price_trend_response,
+    price_trend_statement
+)
+from microservice.utils.pagination import decode_sort_cursor, encode_sort_cursor, keyset_page, split_page
+from microservice.utils.serialization import fast_json_response
+from microservice.utils.logging_configure import get_logger
+
+router = APIRouter()
+
+logger_api = get_logger()
+
+
+@router.get("/", response_model=list[OfferResponse])
+async def get_all_offers(
+        response: Response,
+        skip: int = Query(0, ge=0),
+        limit: int = Query(100, ge=1, le=Settings.PAGE_MAX_LIMIT),
+        cursor: Optional[str] = None,
+        filters: list = Depends(offer_filters),
+        session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Get a list of all offers using the async database engine.
+
+    Args:
+        skip (int): Number of items to skip, ignored when a cursor is given.
+        limit (int): Maximum number of items to return.
+        cursor (str, optional): Cursor of the page to return.
+        filters (list): Price, stock and product filters.
+
+    Returns:
+        list[OfferResponse]: List of OfferResponse objects.
+    """
+    statement = keyset_page(select(*OFFER_COLUMNS).where(*filters), Offer.id, cursor, skip, limit)
+    try:
+        offers = split_page((await session.execute(statement)).all(), limit, response)
+        logger_api.info("Retrieved all offers successfully.")
+        return fast_json_response(offer_rows(offers), response)
+    except Exception as exc:
+        logger_api.exception("Error getting offers:")
+        raise HTTPException(status_code=500, detail="Error getting offers")
+
+
+@router.get("/summaries/", response_model=list[OfferSummaryResponse])
+async def get_offer_summaries(
+        response: Response,
+        skip: int = Query(0, ge=0),
+        limit: int = Query(100, ge=1, le=Settings.PAGE_MAX_LIMIT),
+        cursor: Optional[str] = None,
+        sort: SummarySort = Query("min_price", description="Sort by min_price or total_stock, prefix - for descending"),
+        in_stock: bool = Query(False, description="Return only products with items in stock"),
+        session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Get the cheapest offer, average price and total stock of each product using the async database engine.
+
+    Args:
+        skip (int): Number of items to skip, ignored when a cursor is given.
+        limit (int): Maximum number of items to return.
+        cursor (str, optional): Cursor of the page to return.
+        sort (str): Sort column, ``min_price`` or ``total_stock``, descending with a ``-`` prefix.
+        in_stock (bool): Return only products with items in stock.
+
+    Returns:
+        list[OfferSummaryResponse]: List of OfferSummaryResponse objects.
+    """
+    statement = offer_summaries_statement(sort, skip, limit, in_stock, decode_sort_cursor(cursor) if cursor else None)
+    try:
+        summaries = split_page(
+            (await session.execute(statement)).all(), limit, response, summary_cursor_key(sort), encode_sort_cursor
+        )
+        logger_api.info("Retrieved %d offer summaries.", len(summaries))
+        return summaries
+    except Exception as exc:
+        logger_api.exception("Error retrieving offer summaries:")
+        raise HTTPException(status_code=500, detail="Error retrieving offer summaries")
+
+
+@router.get("/{offer_id}", response_model=OfferResponse)
+async def get_offer_by_id(offer_id: UUID, session: AsyncSession = Depends(get_async_session)):
+    """
+    Get an offer by its ID using the async database engine.
+
+    Args:
+        offer_id (UUID): ID of the offer to retrieve.
+
+    Returns:
+        OfferResponse: OfferResponse object.
+    """
+    offer_by_id = await session.get(Offer, offer_id)
+    if not offer_by_id:
+        logger_api.error("Offer with offer id %s does not exist.", offer_id)
+        raise HTTPException(status_code=404, detail=f"Offer with id {offer_id} does not exist")
+    logger_api.info("Retrieved product with offer id %s.", offer_id)
+    return offer_by_id
+
+
+@router.get("/products/{product_id}", response_model=list[OfferResponse])
+async def get_offers_by_product_id(product_id: UUID, session: AsyncSession = Depends(get_async_session)):
+    """
+    Get offers by product ID using the async database engine.
+
+    Args:
+        product_id (UUID): ID of the product to retrieve offers for.
+
+    Returns:
+        list[OfferResponse]: List of OfferResponse objects for the specified product.
+    """
+    offers_dict = await run_in_threadpool(offers_cache.get, product_id)
+    if offers_dict is not None:
+        read_tracker.record(product_id)
+        return fast_json_response(offers_dict)
+
+    if await session.scalar(select(Product.id).where(Product.id == product_id)) is None:
+        logger_api.error("Product with product id %s does not exist.", product_id)
+        raise HTTPException(status_code=404, detail=f"Product with id {product_id} does not exist")
+    read_tracker.record(product_id)
+
+    offers_dict = offer_rows(await session.execute(select(*OFFER_COLUMNS).where(Offer.product_id == product_id)))
+    await run_in_threadpool(offers_cache.set, product_id, offers_dict)
+    logger_api.info("Retrieved all offers with product id %s.", product_id)
+    return fast_json_response(offers_dict)
+
+
+@router.get("/price_trend/")
+async def get_price_trend(
+        product_id: str = Query(..., description="Product ID"),
+        start_date: datetime = Query(..., description="Start date for the analysis"),
+        end_date: datetime = Query(..., description="End date for the analysis"),
+        bucket: Optional[PriceBucket] = Query(None, description="Downsample the history into hour or day buckets"),
+        session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Get the price trend for a product within a date range using the async database engine.
+
+    Args:
+        product_id (str): The ID of the product for analysis.
+        start_date (datetime): The start date for the analysis.
+        end_date (datetime): The end date for the analysis.
+        bucket (str, optional): Bucket size, ``hour`` or ``day``.
+
+    Returns:
+        dict: A dictionary containing the price trend, percent change and either timestamps and prices or buckets.
+    """
+    cache_key = price_trend_cache_key(product_id, start_date, end_date, bucket)
+    trend = await run_in_threadpool(price_trend_cache.get, cache_key)
+    if trend is not None:
+        return trend
+
+    try:
+        summary = (await session.execute(price_trend_statement([product_id], start_date, end_date))).first()
+        points = buckets = None
+        if summary is not None and bucket:
+            buckets = (await session.execute(price_buckets_statement(product_id, start_date, end_date, bucket))).all()
+        elif summary is not None:
+            points = (await session.execute(price_points_statement(product_id, start_date, end_date))).all()
+        trend = price_trend_response(summary, points, buckets, bucket)
+        await run_in_threadpool(price_trend_cache.set, cache_key, trend)
+        return trend
+    except Exception as exc:
+        logger_api.exception("Error getting price trend:")
+        raise HTTPException(status_code=500, detail="Error getting price trend")
+
+
+@router.post("/price_trend/batch/")
+async def get_price_trends(data: PriceTrendBatchRequest, session: AsyncSession = Depends(get_async_session)):
+    """
+    Get the price trend of several products within a date range using the async database engine.
+
+    Args:
+        data (PriceTrendBatchRequest): The product IDs and the date range for the analysis.
+
+    Returns:
+        dict: A result per requested product, holding either its trend or an error.
+    """
+    product_ids = list(dict.fromkeys(data.product_ids))
+    try:
+        existing_ids = set(await session.scalars(select(Product.id).where(Product.id.in_(product_ids))))
+        summary_rows = (await session.execute(
+            price_trend_statement(product_ids, data.start_date, data.end_date)
+        )).all()
+        logger_api.info("Tracked the price of %d products.", len(product_ids))
+        return batch_price_trend_response(product_ids, existing_ids, summary_rows)
+    except Exception as exc:
+        logger_api.exception("Error getting price trends:")
+        raise HTTPException(status_code=500, detail="Error getting price trends")
@@ -0,0 +1,75 @@
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from microservice.config.settings import Settings
+from microservice.database.database_setup import get_async_session
+from microservice.models.models import Product
+from microservice.routes.product_routes import ProductResponse
+from microservice.services.cache import product_cache
+from microservice.utils.logging_configure import get_logger
+from microservice.utils.pagination import keyset_page, split_page
+
+router = APIRouter()
+
+logger_api = get_logger()
+
+
+@router.get("/", response_model=list[ProductResponse])
+async def get_all_products(
+        response: Response,
+        skip: int = Query(0, ge=0),
+        limit: int = Query(100, ge=1, le=Settings.PAGE_MAX_LIMIT),
+        cursor: Optional[str] = None,
+        session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Get a list of all products using the async database engine.
+
+    Args:
+        skip (int): Number of items to skip, ignored when a cursor is given.
+        limit (int): Maximum number of items to return.
+        cursor (str, optional): Cursor of the page to return.
+
+    Returns:
+        list[ProductResponse]: List of ProductResponse objects.
+    """
+    statement = keyset_page(select(Product), Product.id, cursor, skip, limit)
+    try:
+        products = split_page((await session.scalars(statement)).all(), limit, response)
+        logger_api.info("Retrieved all products successfully.")
+        return products
+    except Exception as exc:
+        logger_api.exception("Error retrieving products: ")
+        raise HTTPException(status_code=500, detail="Error retrieving products")
+
+
+@router.get("/{product_id}", response_model=ProductResponse)
+async def get_product(product_id: UUID, session: AsyncSession = Depends(get_async_session)):
+    """
+    Get a product by its ID using the async database engine.
+
+    Args:
+        product_id (UUID): ID of the product to retrieve.
+
+    Returns:
+        ProductResponse: ProductResponse object.
+    """
+    product_dict = await run_in_threadpool(product_cache.get, product_id)
+    if product_dict is not None:
+        return product_dict
+
+    product = await session.get(Product, product_id)
+    if not product:
+        logger_api.error("Product with product id %s does not exist.", product_id)
+        raise HTTPException(
+            status_code=404, detail=f"Product with id {product_id} does not exist"
+        )
+    product_dict = {"id": product.id, "name": product.name, "description": product.description}
+    await run_in_threadpool(product_cache.set, product_id, product_dict)
+    logger_api.info("Retrieved product with product id %s.", product_id)
+    return product_dict
@@ -1,9 +1,10 @@
 from pydantic import BaseModel, EmailStr, Field
-from fastapi import APIRouter, Body
+from fastapi import APIRouter, Body, Depends
+from sqlalchemy.orm import Session
 from microservice.utils.logging_configure import get_logger
 from microservice.auth.jwt_handler import sign_jwt
 from microservice.models.auth_model import User, is_valid_password
-from microservice.database.database_setup import session
+from microservice.database.database_setup import get_session
 
 logger_api = get_logger()
 
@@ -22,7 +23,7 @@ class UserLoginSchema(BaseModel):
 
 
 @router.post("/signup")
-def user_signup(user: UserSchema = Body(default=None)):
+def user_signup(user: UserSchema = Body(default=None), session: Session = Depends(get_session)):
     """
     Create a new user account.
 
@@ -43,15 +44,16 @@ def user_signup(user: UserSchema = Body(default=None)):
     user_db.set_password(user.password)
     session.add(user_db)
     session.commit()
-    logger_api.info(f"User with email {user.email} successfully added")
+    logger_api.info("User with email %s successfully added", user.email)
     return sign_jwt(user.email)
 
 
-def check_user(data: UserLoginSchema):
+def check_user(session: Session, data: UserLoginSchema):
     """
     Check if the user login credentials are valid.
 
     Args:
+        session (Session): The database session to read with.
         data (UserLoginSchema): User login information including email and password.
 
     Returns:
@@ -64,7 +66,7 @@ def check_user(data: UserLoginSchema):
 
 
 @router.post("/login")
-def user_login(user: UserLoginSchema = Body(default=None)):
+def user_login(user: UserLoginSchema = Body(default=None), session: Session = Depends(get_session)):
     """
     Authenticate a user and return a JWT token if the login is successful.
 
@@ -74,8 +76,8 @@ def user_login(user: UserLoginSchema = Body(default=None)):
     Returns:
         Union[str, dict]: JWT token if login is successful, or an error message if login fails.
     """
-    if check_user(user):
-        logger_api.info(f"User with email {user.email} successfully logged in.")
+    if check_user(session, user):
+        logger_api.info("User with email %s successfully logged in.", user.email)
         return sign_jwt(user.email)
     else:
         logger_api.error("Invalid login attempt for email: %s", user.email)
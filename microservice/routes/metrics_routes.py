@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Response
+
+from microservice.utils.metrics import render_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+def get_metrics():
+    """
+    Get the metrics of the service in the Prometheus text format.
+
+    Returns:
+        Response: Request, query, offers service, refresh and token metrics.
+    """
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
@@ -1,11 +1,28 @@
-from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
 from microservice.utils.logging_configure import get_logger
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from microservice.config.settings import Settings
 from microservice.models.models import Offer, Product
-from microservice.database.database_setup import session
+from microservice.database.database_setup import get_session
+from microservice.services.cache import offers_cache, price_trend_cache
+from microservice.services.price_trend import (
+    PriceBucket, batch_price_trend_response, price_buckets_statement, price_points_statement, price_trend_response,
+    price_trend_statement
+)
+from microservice.services.export import (
+    MEDIA_TYPES, ExportFormat, offers_export_statement, price_history_export_statement, stream_export,
+)
+from microservice.services.offer_summary import SummarySort, offer_summaries_statement, summary_cursor_key
+from microservice.services.read_tracker import read_tracker
+from microservice.utils.pagination import decode_sort_cursor, encode_sort_cursor, keyset_page, split_page
+from microservice.utils.serialization import fast_json_response
 from uuid import UUID
 from datetime import datetime
-from scipy.stats import linregress
 
 router = APIRouter()
 
@@ -19,35 +36,197 @@ class OfferResponse(BaseModel):
     product_id: UUID
 
 
+OFFER_COLUMNS = (Offer.id, Offer.price, Offer.items_in_stock, Offer.product_id)
+
+
+def offer_rows(rows) -> list:
+    """
+    Convert rows of the ``OFFER_COLUMNS`` to response dicts.
+
+    Args:
+        rows (list[Row]): Rows selected with ``OFFER_COLUMNS``.
+
+    Returns:
+        list[dict]: The offers, in the shape of OfferResponse.
+    """
+    return [
+        {"id": offer_id, "price": price, "items_in_stock": items_in_stock, "product_id": product_id}
+        for offer_id, price, items_in_stock, product_id in rows
+    ]
+
+
+class OfferSummaryResponse(BaseModel):
+    product_id: UUID
+    name: str
+    offer_count: int
+    min_price: Optional[int]
+    avg_price: Optional[float]
+    max_price: Optional[int]
+    total_stock: Optional[int]
+    updated_at: datetime
+
+
+class PriceTrendBatchRequest(BaseModel):
+    product_ids: list[UUID] = Field(..., min_length=1, max_length=Settings.PRICE_TREND_BATCH_MAX_PRODUCTS)
+    start_date: datetime
+    end_date: datetime
+
+
+def offer_filters(
+        min_price: Optional[int] = Query(None, description="Minimum offer price"),
+        max_price: Optional[int] = Query(None, description="Maximum offer price"),
+        in_stock: bool = Query(False, description="Return only offers with items in stock"),
+        product_id: Optional[UUID] = Query(None, description="Return only offers of this product"),
+):
+    """
+    Build the filter conditions of the offer list from the query parameters.
+
+    Returns:
+        list: SQLAlchemy conditions to apply to the offer query.
+    """
+    conditions = []
+    if min_price is not None:
+        conditions.append(Offer.price >= min_price)
+    if max_price is not None:
+        conditions.append(Offer.price <= max_price)
+    if in_stock:
+        conditions.append(Offer.items_in_stock > 0)
+    if product_id is not None:
+        conditions.append(Offer.product_id == product_id)
+    return conditions
+
+
 @router.get("/", response_model=list[OfferResponse])
-def get_all_offers(skip: int = 0, limit: int = 100):
+def get_all_offers(
+        response: Response,
+        skip: int = Query(0, ge=0),
+        limit: int = Query(100, ge=1, le=Settings.PAGE_MAX_LIMIT),
+        cursor: Optional[str] = None,
+        filters: list = Depends(offer_filters),
+        session: Session = Depends(get_session),
+):
     """
     Get a list of all offers.
 
+    Offers are ordered by ID. The cursor of the next page is returned in the X-Next-Cursor header.
+    Only the returned columns are selected, and the rows are encoded with orjson without
+    validating each of them against OfferResponse.
+
     Args:
-        skip (int): Number of items to skip.
+        skip (int): Number of items to skip, ignored when a cursor is given.
         limit (int): Maximum number of items to return.
+        cursor (str, optional): Cursor of the page to return.
+        filters (list): Price, stock and product filters.
 
     Returns:
         list[OfferResponse]: List of OfferResponse objects.
     """
+    statement = keyset_page(select(*OFFER_COLUMNS).where(*filters), Offer.id, cursor, skip, limit)
     try:
-        offers = session.query(Offer).offset(skip).limit(limit).all()
-
-        # Convert SQLAlchemy objects to dictionaries
-        offers_dict = [{"id": offer.id,
-                        "price": offer.price,
-                        "items_in_stock": offer.items_in_stock,
-                        "product_id": str(offer.product_id)} for offer in offers]
+        offers = split_page(session.execute(statement).all(), limit, response)
         logger_api.info("Retrieved all offers successfully.")
-        return offers_dict
+        return fast_json_response(offer_rows(offers), response)
     except Exception as exc:
-        logger_api.exception(f"Error getting offers:")
+        logger_api.exception("Error getting offers:")
         raise HTTPException(status_code=500, detail="Error getting offers")
 
 
+def export_response(statement, export_format: str, name: str) -> StreamingResponse:
+    return StreamingResponse(
+        stream_export(statement, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{export_format}"'},
+    )
+
+
+@router.get("/export/")
+def export_offers(
+        export_format: ExportFormat = Query("ndjson", alias="format", description="ndjson or csv"),
+        filters: list = Depends(offer_filters),
+):
+    """
+    Export all offers matching the filters.
+
+    The offers are streamed from a server-side cursor as they are read, ordered by ID,
+    so the whole table can be exported in a single request.
+
+    Args:
+        export_format (str): ``ndjson`` or ``csv``.
+        filters (list): Price, stock and product filters.
+
+    Returns:
+        StreamingResponse: The offers with their ID, price, stock, timestamp and product ID.
+    """
+    logger_api.info("Exporting offers as %s.", export_format)
+    return export_response(offers_export_statement(filters), export_format, "offers")
+
+
+@router.get("/price_history/export/")
+def export_price_history(
+        export_format: ExportFormat = Query("ndjson", alias="format", description="ndjson or csv"),
+        product_id: Optional[UUID] = Query(None, description="Export only the history of this product"),
+        start_date: Optional[datetime] = Query(None, description="Export changes at or after this time"),
+        end_date: Optional[datetime] = Query(None, description="Export changes at or before this time"),
+):
+    """
+    Export the price history.
+
+    The recorded price and stock changes are streamed from a server-side cursor, ordered by time.
+
+    Args:
+        export_format (str): ``ndjson`` or ``csv``.
+        product_id (UUID, optional): Export only the history of this product.
+        start_date (datetime, optional): Export changes at or after this time.
+        end_date (datetime, optional): Export changes at or before this time.
+
+    Returns:
+        StreamingResponse: The history rows with their time, offer, product, price and stock.
+    """
+    logger_api.info("Exporting the price history as %s.", export_format)
+    statement = price_history_export_statement(product_id, start_date, end_date)
+    return export_response(statement, export_format, "price_history")
+
+
+@router.get("/summaries/", response_model=list[OfferSummaryResponse])
+def get_offer_summaries(
+        response: Response,
+        skip: int = Query(0, ge=0),
+        limit: int = Query(100, ge=1, le=Settings.PAGE_MAX_LIMIT),
+        cursor: Optional[str] = None,
+        sort: SummarySort = Query("min_price", description="Sort by min_price or total_stock, prefix - for descending"),
+        in_stock: bool = Query(False, description="Return only products with items in stock"),
+        session: Session = Depends(get_session),
+):
+    """
+    Get the cheapest offer, average price and total stock of each product.
+
+    The summaries are precomputed by the offer refresh, so a page is a single indexed read.
+    The cursor of the next page is returned in the X-Next-Cursor header.
+
+    Args:
+        skip (int): Number of items to skip, ignored when a cursor is given.
+        limit (int): Maximum number of items to return.
+        cursor (str, optional): Cursor of the page to return.
+        sort (str): Sort column, ``min_price`` or ``total_stock``, descending with a ``-`` prefix.
+        in_stock (bool): Return only products with items in stock.
+
+    Returns:
+        list[OfferSummaryResponse]: List of OfferSummaryResponse objects.
+    """
+    statement = offer_summaries_statement(sort, skip, limit, in_stock, decode_sort_cursor(cursor) if cursor else None)
+    try:
+        summaries = split_page(
+            session.execute(statement).all(), limit, response, summary_cursor_key(sort), encode_sort_cursor
+        )
+        logger_api.info("Retrieved %d offer summaries.", len(summaries))
+        return summaries
+    except Exception as exc:
+        logger_api.exception("Error retrieving offer summaries:")
+        raise HTTPException(status_code=500, detail="Error retrieving offer summaries")
+
+
 @router.get("/{offer_id}", response_model=OfferResponse)
-def get_offer_by_id(offer_id: UUID):
+def get_offer_by_id(offer_id: UUID, session: Session = Depends(get_session)):
     """
     Get an offer by its ID.
 
@@ -59,85 +238,113 @@ def get_offer_by_id(offer_id: UUID):
     """
     offer_by_id = session.query(Offer).filter(Offer.id == offer_id).first()
     if not offer_by_id:
-        logger_api.error(f"Offer with offer id {offer_id} does not exist.")
+        logger_api.error("Offer with offer id %s does not exist.", offer_id)
         raise HTTPException(status_code=404, detail=f"Offer with id {offer_id} does not exist")
-    logger_api.info(f"Retrieved product with offer id {offer_id}.")
+    logger_api.info("Retrieved product with offer id %s.", offer_id)
     return offer_by_id
 
 
 @router.get("/products/{product_id}", response_model=list[OfferResponse])
-def get_offers_by_product_id(product_id: UUID):
+def get_offers_by_product_id(product_id: UUID, session: Session = Depends(get_session)):
     """
     Get offers by product ID.
 
+    Offers are served from the cache until the refresh changes them. Reads of existing products
+    are counted so the refresh scheduler keeps frequently read products fresher. The offers are encoded
+    with orjson without validating each of them against OfferResponse.
+
     Args:
         product_id (UUID): ID of the product to retrieve offers for.
 
     Returns:
         list[OfferResponse]: List of OfferResponse objects for the specified product.
     """
-    product = session.query(Product).filter(Product.id == product_id).first()
-    if not product:
-        logger_api.error(f"Product with product id {product_id} does not exist.")
+    offers_dict = offers_cache.get(product_id)
+    if offers_dict is not None:
+        read_tracker.record(product_id)
+        return fast_json_response(offers_dict)
+
+    if session.scalar(select(Product.id).where(Product.id == product_id)) is None:
+        logger_api.error("Product with product id %s does not exist.", product_id)
         raise HTTPException(status_code=404, detail=f"Product with id {product_id} does not exist")
+    read_tracker.record(product_id)
+
+    offers_dict = offer_rows(session.execute(select(*OFFER_COLUMNS).where(Offer.product_id == product_id)))
+    offers_cache.set(product_id, offers_dict)
+    logger_api.info("Retrieved all offers with product id %s.", product_id)
+    return fast_json_response(offers_dict)
 
-    offers = session.query(Offer).filter(Offer.product_id == product_id).all()
 
-    offers_dict = [{"id": offer.id,
-                    "price": offer.price,
-                    "items_in_stock": offer.items_in_stock,
-                    "product_id": str(offer.product_id)} for offer in offers]
-    logger_api.info(f"Retrieved all offers with product id {product_id}.")
-    return offers_dict
+def price_trend_cache_key(product_id: str, start_date: datetime, end_date: datetime,
+                          bucket: Optional[str] = None) -> str:
+    return f"{product_id}:{start_date.isoformat()}:{end_date.isoformat()}:{bucket or ''}"
 
 
 @router.get("/price_trend/")
-async def get_price_trend(
+def get_price_trend(
         product_id: str = Query(..., description="Product ID"),
         start_date: datetime = Query(..., description="Start date for the analysis"),
-        end_date: datetime = Query(..., description="End date for the analysis")
+        end_date: datetime = Query(..., description="End date for the analysis"),
+        bucket: Optional[PriceBucket] = Query(None, description="Downsample the history into hour or day buckets"),
+        session: Session = Depends(get_session),
 ):
     """
        Get the price trend and percentual rise/fall for a specified product within a given date range.
 
+       The analysis reads the price history, which holds a row for every observed price or stock change.
+       The trend is the slope of a linear regression of price over time, in price units per day,
+       computed by the database. With a bucket, the history is returned as open/high/low/close/average
+       per hour or day instead of raw prices. Results are cached until a refresh records new price changes.
+
        Args:
            product_id (str): The ID of the product for analysis.
            start_date (datetime): The start date for the analysis.
            end_date (datetime): The end date for the analysis.
+           bucket (str, optional): Bucket size, ``hour`` or ``day``.
 
        Returns:
-           dict: A dictionary containing the price trend, percent change, timestamps, and prices.
+           dict: A dictionary containing the price trend, percent change and either timestamps and prices or buckets.
        """
+    cache_key = price_trend_cache_key(product_id, start_date, end_date, bucket)
+    trend = price_trend_cache.get(cache_key)
+    if trend is not None:
+        return trend
+
     try:
-        price_data = (
-            session.query(Offer.timestamp, Offer.price)
-            .filter(
-                Offer.product_id == product_id,
-                Offer.timestamp >= start_date,
-                Offer.timestamp <= end_date
-            )
-            .order_by(Offer.timestamp)
-            .all()
-        )
-        if not price_data:
-            logger_api.info(f"No price data available for the specified period.")
-            return {"message": "No price data available for the specified period."}
+        summary = session.execute(price_trend_statement([product_id], start_date, end_date)).first()
+        points = buckets = None
+        if summary is not None and bucket:
+            buckets = session.execute(price_buckets_statement(product_id, start_date, end_date, bucket)).all()
+        elif summary is not None:
+            points = session.execute(price_points_statement(product_id, start_date, end_date)).all()
+        trend = price_trend_response(summary, points, buckets, bucket)
+        price_trend_cache.set(cache_key, trend)
+        return trend
+    except Exception as exc:
+        logger_api.exception("Error getting price trend:")
+        raise HTTPException(status_code=500, detail="Error getting price trend")
 
-        timestamps, prices = zip(*price_data)
 
-        slope, _, _, _, _ = linregress(range(len(prices)), prices)
+@router.post("/price_trend/batch/")
+def get_price_trends(data: PriceTrendBatchRequest, session: Session = Depends(get_session)):
+    """
+    Get the price trend and percentual rise/fall of several products within a given date range.
 
-        initial_price = prices[0]
-        final_price = prices[-1]
-        percent_change = ((final_price - initial_price) / initial_price) * 100
+    The trends of all products are computed by a single grouped query. Products that do not exist
+    or have no price data in the range are reported per product without failing the batch.
+
+    Args:
+        data (PriceTrendBatchRequest): The product IDs and the date range for the analysis.
 
-        logger_api.info(f"Successfully tracked the price.")
-        return {
-            "trend": slope,
-            "percent_change": percent_change,
-            "timestamps": timestamps,
-            "prices": prices
-        }
+    Returns:
+        dict: A result per requested product, holding either its trend or an error.
+    """
+    product_ids = list(dict.fromkeys(data.product_ids))
+    try:
+        existing_ids = set(session.scalars(select(Product.id).where(Product.id.in_(product_ids))))
+        summary_rows = session.execute(price_trend_statement(product_ids, data.start_date, data.end_date)).all()
+        logger_api.info("Tracked the price of %d products.", len(product_ids))
+        return batch_price_trend_response(product_ids, existing_ids, summary_rows)
     except Exception as exc:
-        logger_api.exception(f"Error getting price trend:")
-        raise HTTPException(status_code=500, detail="Error getting price trend")
+        logger_api.exception("Error getting price trends:")
+        raise HTTPException(status_code=500, detail="Error getting price trends")
@@ -1,15 +1,26 @@
+from datetime import datetime
+from typing import Optional
 from uuid import UUID
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
-
-from microservice.services.offers import get_product_offer_data
-from microservice.services.products import register_product_in_offer_service
-from microservice.services.token_manager import token_manager
-from microservice.database.database_setup import session
-from microservice.models.models import Offer, Product
+import anyio
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from microservice.config.settings import Settings
+from microservice.services.cache import invalidate_product, product_cache
+from microservice.services.product_deletion import delete_products, invalidate_deleted_products
+from microservice.services.product_import import (
+    CONTENT_TYPES, ImportFormat, create_import_job, import_job_status, import_products,
+)
+from microservice.services.registration_outbox import PENDING, enqueue_registration, registration_worker
+from microservice.database.database_setup import get_session, session_scope
+from microservice.models.models import Product, ProductRegistration
 from microservice.auth.jwt_bearer import JwtBearer
 
 from microservice.utils.logging_configure import get_logger
+from microservice.utils.pagination import keyset_page, split_page
 
 
 logger_api = get_logger()
@@ -29,52 +40,148 @@ class ProductResponse(BaseModel):
     description: str
 
 
-def create_offer_db(offers_data, product_id: UUID):
-    """
-    Create Offer database records based on offer data.
+class ProductCreatedResponse(ProductResponse):
+    registration_status: str
+
+
+class ProductRegistrationResponse(BaseModel):
+    product_id: UUID
+    status: str
+    attempts: int
+    last_error: Optional[str]
+    next_attempt_at: datetime
+    created_at: datetime
+    updated_at: datetime
+
+
+class ProductBulkDelete(BaseModel):
+    product_ids: list[UUID] = Field(min_length=1, max_length=Settings.PRODUCT_BULK_DELETE_MAX_IDS)
 
-    Args:
-        offers_data (list[dict]): List of offer data.
-        product_id (UUID): ID of the product associated with the offers.
-    Returns:
-        bool: True if offers were successfully created, False otherwise.
-    """
-    for offer in offers_data:
-        offer_db = Offer(
-            id=offer["id"],
-            price=offer["price"],
-            items_in_stock=offer["items_in_stock"],
-            product_id=product_id,
-        )
-        session.add(offer_db)
-    session.commit()
-    logger_api.info(f"Successful addition of all offeers for product with id {product_id}.")
-    return True
+
+class ProductBulkDeleteResponse(BaseModel):
+    deleted: dict[str, int]
+    not_found: list[UUID]
+
+
+class ProductImportError(BaseModel):
+    line: int
+    error: str
+
+
+class ProductImportJobResponse(BaseModel):
+    id: UUID
+    status: str
+    format: str
+    imported: int
+    rejected: int
+    errors: list[ProductImportError]
+    created_at: datetime
+    finished_at: Optional[datetime]
+    registrations: dict[str, int]
+
+
+def _sync_chunks(stream):
+    """
+    Read an async request body stream from a worker thread.
+    """
+    iterator = stream.__aiter__()
+    while True:
+        try:
+            yield anyio.from_thread.run(iterator.__anext__)
+        except StopAsyncIteration:
+            return
 
 
 @router.get("/", response_model=list[ProductResponse])
-def get_all_products(skip: int = 0, limit: int = 100):
+def get_all_products(
+        response: Response,
+        skip: int = Query(0, ge=0),
+        limit: int = Query(100, ge=1, le=Settings.PAGE_MAX_LIMIT),
+        cursor: Optional[str] = None,
+        session: Session = Depends(get_session),
+):
     """
     Get a list of all products.
 
+    Products are ordered by ID. The cursor of the next page is returned in the X-Next-Cursor header.
+
     Args:
-        skip (int): Number of items to skip.
+        skip (int): Number of items to skip, ignored when a cursor is given.
         limit (int): Maximum number of items to return.
+        cursor (str, optional): Cursor of the page to return.
 
     Returns:
         list[ProductResponse]: List of ProductResponse objects.
     """
+    statement = keyset_page(select(Product), Product.id, cursor, skip, limit)
     try:
-        products = session.query(Product).offset(skip).limit(limit).all()
+        products = split_page(session.scalars(statement).all(), limit, response)
         logger_api.info("Retrieved all products successfully.")
         return products
     except Exception as exc:
-        logger_api.exception(f"Error retrieving products: ")
+        logger_api.exception("Error retrieving products: ")
         raise HTTPException(status_code=500, detail="Error retrieving products")
 
 
+@router.post(
+    "/import/", dependencies=[Depends(JwtBearer())], status_code=202, response_model=ProductImportJobResponse
+)
+async def import_product_catalog(
+        request: Request,
+        response: Response,
+        import_format: Optional[ImportFormat] = Query(None, alias="format"),
+):
+    """
+    Import products from a streamed NDJSON or CSV upload.
+
+    The upload is read as it arrives and the products are inserted in batches, so memory use does not
+    depend on its size. The products are then registered in the offers service in the background;
+    the progress is available at the URL of the Location header.
+
+    Args:
+        import_format (str, optional): ``ndjson`` or ``csv``, taken from the Content-Type header when omitted.
+
+    Returns:
+        ProductImportJobResponse: The import job once the upload has been read.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    import_format = import_format or CONTENT_TYPES.get(content_type)
+    if import_format is None:
+        raise HTTPException(status_code=415, detail="Upload NDJSON (application/x-ndjson) or CSV (text/csv)")
+
+    job_id = await run_in_threadpool(create_import_job, import_format)
+    logger_api.info("Started product import %s from %s.", job_id, import_format)
+    await run_in_threadpool(import_products, job_id, _sync_chunks(request.stream()), import_format)
+
+    response.headers["Location"] = f"/products/import/{job_id}"
+    return await run_in_threadpool(_import_job_status, job_id)
+
+
+@router.get("/import/{job_id}", response_model=ProductImportJobResponse)
+def get_import_job(job_id: UUID, session: Session = Depends(get_session)):
+    """
+    Get the progress of a product import.
+
+    Args:
+        job_id (UUID): ID of the import job.
+
+    Returns:
+        ProductImportJobResponse: The imported and rejected rows and the registration status counts.
+    """
+    status = import_job_status(session, job_id)
+    if status is None:
+        logger_api.error("Product import %s does not exist.", job_id)
+        raise HTTPException(status_code=404, detail=f"Product import with id {job_id} does not exist")
+    return status
+
+
+def _import_job_status(job_id: UUID):
+    with session_scope() as session:
+        return import_job_status(session, job_id)
+
+
 @router.get("/{product_id}", response_model=ProductResponse)
-def get_product(product_id: UUID):
+def get_product(product_id: UUID, session: Session = Depends(get_session)):
     """
     Get a product by its ID.
 
@@ -84,65 +191,76 @@ def get_product(product_id: UUID):
     Returns:
         ProductResponse: ProductResponse object.
     """
+    product_dict = product_cache.get(product_id)
+    if product_dict is not None:
+        return product_dict
 
     product = session.query(Product).filter(Product.id == product_id).first()
     if not product:
-        logger_api.error(f"Product with product id {product_id} does not exist.")
+        logger_api.error("Product with product id %s does not exist.", product_id)
         raise HTTPException(
             status_code=404, detail=f"Product with id {product_id} does not exist"
         )
-    logger_api.info(f"Retrieved product with product id {product_id}.")
-    return product
+    product_dict = {"id": product.id, "name": product.name, "description": product.description}
+    product_cache.set(product_id, product_dict)
+    logger_api.info("Retrieved product with product id %s.", product_id)
+    return product_dict
+
+
+@router.get("/{product_id}/registration", response_model=ProductRegistrationResponse)
+def get_product_registration(product_id: UUID, session: Session = Depends(get_session)):
+    """
+    Get the registration of a product in the offers service.
+
+    Args:
+        product_id (UUID): ID of the product.
+
+    Returns:
+        ProductRegistrationResponse: Status, attempts and last error of the registration.
+    """
+    registration = session.get(ProductRegistration, product_id)
+    if not registration:
+        logger_api.error("Registration of product with product id %s does not exist.", product_id)
+        raise HTTPException(
+            status_code=404, detail=f"Registration of product with id {product_id} does not exist"
+        )
+    return registration
 
 
-@router.post("/", dependencies=[Depends(JwtBearer())], response_model=ProductResponse)
-def create_product(
-        product: ProductCreate,
-        active_access_token: str = Depends(token_manager.get_access_token)):
+@router.post("/", dependencies=[Depends(JwtBearer())], status_code=202, response_model=ProductCreatedResponse)
+def create_product(product: ProductCreate, response: Response, session: Session = Depends(get_session)):
     """
     Create a new product.
 
+    The product and its registration outbox entry are committed together; the registration worker
+    then registers the product in the offers service and loads its offers. The status of the
+    registration is available at the URL of the Location header.
+
     Args:
         product (ProductCreate): ProductCreate object with product data.
-        active_access_token (str): Active access token obtained from token_manager.
 
     Returns:
-        ProductResponse: ProductResponse object of the newly created product.
+        ProductCreatedResponse: The newly created product and its registration status.
     """
-
     product_db = Product(name=product.name, description=product.description)
     session.add(product_db)
+    session.flush()
+    enqueue_registration(session, product_db.id)
     session.commit()
+    registration_worker.wake()
 
-    if not active_access_token:
-        logger_api.error("No active access token available.")
-        raise HTTPException(status_code=500, detail="No active access token")
-
-    product_dict = {
-        "id": str(product_db.id),
+    response.headers["Location"] = f"/products/{product_db.id}/registration"
+    logger_api.info("Created product with product id %s, registration pending.", product_db.id)
+    return {
+        "id": product_db.id,
         "name": product_db.name,
         "description": product_db.description,
+        "registration_status": PENDING,
     }
 
-    register_product = register_product_in_offer_service(
-        active_access_token, product_dict
-    )
-
-    if not register_product:
-        logger_api.error("Error while calling external API.")
-        raise HTTPException(status_code=500, detail="Error while calling external API")
-
-    offers_data = get_product_offer_data(active_access_token, product_db.id)
-
-    if create_offer_db(offers_data, product_db.id):
-        return product_db
-    else:
-        logger_api.error("Error with creating offers.")
-        raise HTTPException(status_code=500, detail="Error with creating offers")
-
 
 @router.put("/{product_id}", dependencies=[Depends(JwtBearer())], response_model=ProductResponse)
-def update_product(product_id: UUID, new_product: ProductCreate):
+def update_product(product_id: UUID, new_product: ProductCreate, session: Session = Depends(get_session)):
     """
     Update a product by its ID.
 
@@ -156,7 +274,7 @@ def update_product(product_id: UUID, new_product: ProductCreate):
 
     product = session.query(Product).filter(Product.id == product_id).first()
     if not product:
-        logger_api.error(f"Product with product id {product_id} does not exist.")
+        logger_api.error("Product with product id %s does not exist.", product_id)
         raise HTTPException(
             status_code=404, detail=f"Product with id {product_id} does not exist"
         )
@@ -164,13 +282,34 @@ def update_product(product_id: UUID, new_product: ProductCreate):
     product.name = new_product.name
     product.description = new_product.description
     session.commit()
+    invalidate_product(product_id)
 
-    logger_api.info(f"Updated product with product id {product_id}.")
+    logger_api.info("Updated product with product id %s.", product_id)
     return product
 
 
+@router.post("/bulk-delete/", dependencies=[Depends(JwtBearer())], response_model=ProductBulkDeleteResponse)
+def bulk_delete_products(request: ProductBulkDelete, session: Session = Depends(get_session)):
+    """
+    Delete several products by their IDs, with their offers, history and registrations.
+
+    Args:
+        request (ProductBulkDelete): IDs of the products to delete.
+
+    Returns:
+        ProductBulkDeleteResponse: Number of deleted rows per kind and the IDs of missing products.
+    """
+    product_ids = set(request.product_ids)
+    existing_ids = session.scalars(select(Product.id).where(Product.id.in_(product_ids))).all()
+    deleted = delete_products(session, existing_ids)
+    session.commit()
+    invalidate_deleted_products(existing_ids, deleted)
+    logger_api.info("Deleted %d products: %s.", deleted["products"], deleted)
+    return ProductBulkDeleteResponse(deleted=deleted, not_found=list(product_ids - set(existing_ids)))
+
+
 @router.delete("/{product_id}", dependencies=[Depends(JwtBearer())], response_model=ProductResponse)
-def delete_product(product_id: UUID):
+def delete_product(product_id: UUID, session: Session = Depends(get_session)):
     """
     Delete a product by its ID.
 
@@ -183,14 +322,13 @@ def delete_product(product_id: UUID):
 
     product = session.query(Product).filter(Product.id == product_id).first()
     if not product:
-        logger_api.error(f"Product with product id {product_id} does not exist.")
+        logger_api.error("Product with product id %s does not exist.", product_id)
         raise HTTPException(
             status_code=404, detail=f"Product with id {product_id} does not exist"
         )
-    offers = session.query(Offer).filter(Offer.product_id == product_id).all()
-    for offer in offers:
-        session.delete(offer)
-    session.delete(product)
+    response = ProductResponse(id=product.id, name=product.name, description=product.description)
+    deleted = delete_products(session, [product_id])
     session.commit()
-    logger_api.info(f"Deleted product with product id {product_id}.")
-    return product
+    invalidate_deleted_products([product_id], deleted)
+    logger_api.info("Deleted product with product id %s and %d offers.", product_id, deleted["offers"])
+    return response
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from microservice.background_service.leader_election import leader_elector
+from microservice.database.database_setup import get_session, pool_status
+from microservice.services.cache import cache_stats
+from microservice.services.http_client import offers_service_client
+from microservice.utils.logging_configure import get_logger
+
+logger_api = get_logger()
+
+router = APIRouter()
+
+
+@router.get("/pool")
+def get_pool_status():
+    """
+    Get the state of the database connection pool.
+
+    Returns:
+        dict: Pool size, checked-in, checked-out and overflow connection counts.
+    """
+    return pool_status()
+
+
+@router.get("/cache")
+def get_cache_status():
+    """
+    Get the statistics of the in-process caches.
+
+    Returns:
+        dict: Size and hit/miss/eviction counters of the product and offer caches.
+    """
+    return cache_stats()
+
+
+@router.get("/leader")
+def get_leader_status(session: Session = Depends(get_session)):
+    """
+    Get the worker holding the offer refresh leadership.
+
+    Returns:
+        dict: This worker's ID, whether it is the leader and the current leader, if any.
+    """
+    return leader_elector.status(session)
+
+
+@router.get("/upstream")
+def get_upstream_status():
+    """
+    Get the state of the offers service client.
+
+    Returns:
+        dict: The circuit breaker state and the call latency histogram per endpoint.
+    """
+    return offers_service_client.stats()
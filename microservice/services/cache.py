@@ -0,0 +1,419 @@
+import json
+import threading
+from abc import ABC, abstractmethod
+import time
+from collections import OrderedDict
+from uuid import UUID
+
+from fastapi.encoders import jsonable_encoder
+
+from microservice.config.settings import Settings
+from microservice.utils.logging_configure import get_logger
+
+logger_api = get_logger()
+
+_MISSING = object()
+
+
+class CacheBackend(ABC):
+    """
+    Interface of the caches used by the read endpoints.
+
+    Values must be JSON serializable, so every backend can store them.
+    """
+
+    name: str
+
+    @abstractmethod
+    def get(self, key, default=None):
+        pass
+
+    @abstractmethod
+    def set(self, key, value):
+        pass
+
+    @abstractmethod
+    def invalidate(self, *keys):
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+    @abstractmethod
+    def stats(self):
+        pass
+
+
+class TTLCache(CacheBackend):
+    """
+    Bounded, thread-safe, in-process LRU cache whose entries expire after a fixed time to live.
+
+    Hits, misses, evictions and expirations are counted so the effect of the cache can be observed.
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl_seconds: float, clock=time.monotonic):
+        """
+        Initialize the TTLCache instance.
+
+        Args:
+            name (str): Name of the cache, used in statistics.
+            max_entries (int): Maximum number of entries before the least recently used one is evicted.
+            ttl_seconds (float): Time in seconds after which an entry expires.
+            clock (callable): Monotonic clock returning seconds, replaceable in tests.
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key, default=None):
+        """
+        Get a cached value.
+
+        Args:
+            key: The cache key.
+            default: Value returned when the key is missing or expired.
+
+        Returns:
+            The cached value, or ``default``.
+        """
+        with self.lock:
+            entry = self.entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= self.clock():
+                del self.entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """
+        Store a value, evicting the least recently used entry when the cache is full.
+
+        Args:
+            key: The cache key.
+            value: The value to cache.
+        """
+        with self.lock:
+            self.entries[key] = (self.clock() + self.ttl_seconds, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *keys):
+        """
+        Remove entries from the cache.
+
+        Args:
+            *keys: The cache keys to remove. Missing keys are ignored.
+        """
+        with self.lock:
+            for key in keys:
+                if self.entries.pop(key, _MISSING) is not _MISSING:
+                    self.invalidations += 1
+
+    def clear(self):
+        """
+        Remove all entries from the cache.
+        """
+        with self.lock:
+            self.invalidations += len(self.entries)
+            self.entries.clear()
+
+    def stats(self):
+        """
+        Get the cache statistics.
+
+        Returns:
+            dict: Size, limits and hit/miss/eviction/expiration/invalidation counters.
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "backend": "local",
+                "size": len(self.entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+class RedisCache(CacheBackend):
+    """
+    Cache shared by all worker processes through a Redis-compatible server.
+
+    Values are stored as JSON with the cache TTL. A short-lived in-process cache sits in front
+    of Redis; invalidations are published on a pub/sub channel so every worker drops its
+    local copies (see CacheInvalidationListener).
+    """
+
+    def __init__(self, name: str, client, ttl_seconds: float, local: TTLCache):
+        """
+        Initialize the RedisCache instance.
+
+        Args:
+            name (str): Name of the cache, used in keys and statistics.
+            client (redis.Redis): Client of the Redis-compatible server.
+            ttl_seconds (float): Time in seconds after which an entry expires in Redis.
+            local (TTLCache): In-process cache in front of Redis.
+        """
+        self.name = name
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.local = local
+        self.lock = threading.Lock()
+        self.shared_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, key) -> str:
+        return f"{Settings.CACHE_KEY_PREFIX}:{self.name}:{key}"
+
+    def get(self, key, default=None):
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = _MISSING
+        try:
+            payload = self.client.get(self._key(key))
+            if payload is not None:
+                value = json.loads(payload)
+        except ValueError:
+            # A corrupt or foreign value under the prefix is dropped and read as a miss.
+            logger_api.exception("Error decoding cache %s entry %s:", self.name, key)
+            with self.lock:
+                self.errors += 1
+            self._delete(key)
+        except Exception:
+            logger_api.exception("Error reading cache %s:", self.name)
+            with self.lock:
+                self.errors += 1
+        if value is _MISSING:
+            with self.lock:
+                self.misses += 1
+            return default
+        self.local.set(key, value)
+        with self.lock:
+            self.shared_hits += 1
+        return value
+
+    def _delete(self, key):
+        try:
+            self.client.delete(self._key(key))
+        except Exception:
+            logger_api.exception("Error deleting cache %s entry %s:", self.name, key)
+
+    def set(self, key, value):
+        value = jsonable_encoder(value)
+        self.local.set(key, value)
+        try:
+            self.client.set(self._key(key), json.dumps(value), px=max(int(self.ttl_seconds * 1000), 1))
+        except Exception:
+            logger_api.exception("Error writing cache %s:", self.name)
+            with self.lock:
+                self.errors += 1
+
+    def invalidate(self, *keys):
+        if not keys:
+            return
+        self.local.invalidate(*keys)
+        try:
+            self.client.delete(*(self._key(key) for key in keys))
+            self._publish({"cache": self.name, "keys": [str(key) for key in keys]})
+        except Exception:
+            logger_api.exception("Error invalidating cache %s:", self.name)
+
+    def clear(self):
+        self.local.clear()
+        try:
+            keys = list(self.client.scan_iter(match=self._key("*"), count=1000))
+            for start in range(0, len(keys), 1000):
+                self.client.delete(*keys[start:start + 1000])
+            self._publish({"cache": self.name, "clear": True})
+        except Exception:
+            logger_api.exception("Error clearing cache %s:", self.name)
+
+    def _publish(self, message: dict):
+        self.client.publish(f"{Settings.CACHE_KEY_PREFIX}:invalidate", json.dumps(message))
+
+    def stats(self):
+        with self.lock:
+            return {
+                "name": self.name,
+                "backend": "redis",
+                "ttl_seconds": self.ttl_seconds,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "errors": self.errors,
+                "local": self.local.stats(),
+            }
+
+
+class CacheInvalidationListener:
+    """
+    Drop the in-process copies of shared cache entries invalidated by any worker.
+    """
+
+    def __init__(self, client, caches: list):
+        """
+        Initialize the CacheInvalidationListener instance.
+
+        Args:
+            client (redis.Redis): Client of the Redis-compatible server.
+            caches (list[RedisCache]): The caches whose local copies are invalidated.
+        """
+        self.client = client
+        self.caches = {cache.name: cache for cache in caches}
+        self.pubsub = None
+
+    def handle(self, message: dict):
+        """
+        Apply an invalidation message published by RedisCache.
+
+        Args:
+            message (dict): A pub/sub message with a JSON payload.
+        """
+        if message.get("type") != "message":
+            return
+        payload = json.loads(message["data"])
+        cache = self.caches.get(payload.get("cache"))
+        if cache is None:
+            return
+        if payload.get("clear"):
+            cache.local.clear()
+        else:
+            cache.local.invalidate(*(_parse_key(key) for key in payload.get("keys", [])))
+
+    def start(self):
+        """
+        Subscribe to the invalidation channel and process messages in a daemon thread.
+        """
+        self.pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self.pubsub.subscribe(f"{Settings.CACHE_KEY_PREFIX}:invalidate")
+
+        def listen():
+            while self.pubsub is not None:
+                try:
+                    message = self.pubsub.get_message(timeout=1.0)
+                    if message:
+                        self.handle(message)
+                except Exception:
+                    logger_api.exception("Error processing cache invalidation:")
+                    time.sleep(1)
+
+        thread = threading.Thread(target=listen, name="cache-invalidation", daemon=True)
+        thread.start()
+        logger_api.info("Listening for cache invalidations.")
+
+    def stop(self):
+        pubsub, self.pubsub = self.pubsub, None
+        if pubsub is not None:
+            pubsub.close()
+
+
+def _parse_key(key: str):
+    """
+    Restore UUID keys sent as strings in invalidation messages.
+    """
+    try:
+        return UUID(key)
+    except ValueError:
+        return key
+
+
+def redis_client():
+    """
+    Create a client of the Redis-compatible server configured by REDIS_URL.
+
+    Returns:
+        redis.Redis: The client.
+
+    Raises:
+        RuntimeError: If the redis package is not installed.
+    """
+    try:
+        import redis
+    except ImportError:
+        raise RuntimeError("CACHE_BACKEND=redis requires the redis package.")
+    return redis.Redis.from_url(Settings.REDIS_URL)
+
+
+def create_cache(name: str, client=None) -> CacheBackend:
+    """
+    Create a cache with the backend selected by CACHE_BACKEND.
+
+    Args:
+        name (str): Name of the cache.
+        client (redis.Redis, optional): Client to use instead of the one configured by REDIS_URL.
+
+    Returns:
+        CacheBackend: An in-process TTLCache, or a RedisCache for the ``redis`` backend.
+    """
+    if Settings.CACHE_BACKEND == "redis":
+        local = TTLCache(name, Settings.CACHE_MAX_ENTRIES, Settings.CACHE_LOCAL_TTL_SECONDS)
+        return RedisCache(name, client or redis_client(), Settings.CACHE_TTL_SECONDS, local)
+    return TTLCache(name, Settings.CACHE_MAX_ENTRIES, Settings.CACHE_TTL_SECONDS)
+
+
+product_cache = create_cache("products")
+offers_cache = create_cache("offers")
+price_trend_cache = create_cache("price_trend")
+
+caches = [product_cache, offers_cache, price_trend_cache]
+
+
+def invalidate_product(product_id):
+    """
+    Remove a product and its offers from the caches after the product was changed.
+
+    Args:
+        product_id (UUID): ID of the changed product.
+    """
+    product_cache.invalidate(product_id)
+    offers_cache.invalidate(product_id)
+
+
+def start_cache_invalidation_listener():
+    """
+    Start listening for invalidations published by other workers when the redis backend is used.
+
+    Returns:
+        CacheInvalidationListener or None: The started listener, or None for the local backend.
+    """
+    shared_caches = [cache for cache in caches if isinstance(cache, RedisCache)]
+    if not shared_caches:
+        return None
+    listener = CacheInvalidationListener(shared_caches[0].client, shared_caches)
+    listener.start()
+    return listener
+
+
+def cache_stats():
+    """
+    Get the statistics of all caches.
+
+    Returns:
+        dict: Statistics keyed by cache name.
+    """
+    return {cache.name: cache.stats() for cache in caches}
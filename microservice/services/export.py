@@ -0,0 +1,140 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterator, Literal, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+
+from microservice.config.settings import Settings
+from microservice.database.database_setup import session_scope
+from microservice.models.models import Offer, OfferPriceHistory
+from microservice.utils.logging_configure import get_logger
+
+logger_api = get_logger()
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+OFFER_COLUMNS = (Offer.id, Offer.price, Offer.items_in_stock, Offer.timestamp, Offer.product_id)
+
+PRICE_HISTORY_COLUMNS = (
+    OfferPriceHistory.id, OfferPriceHistory.timestamp, OfferPriceHistory.offer_id,
+    OfferPriceHistory.product_id, OfferPriceHistory.price, OfferPriceHistory.items_in_stock,
+)
+
+
+def offers_export_statement(filters: list):
+    """
+    Build the query exporting the offers.
+
+    Args:
+        filters (list): Conditions of the offer list filters.
+
+    Returns:
+        Select: The offer columns ordered by ID.
+    """
+    return select(*OFFER_COLUMNS).where(*filters).order_by(Offer.id)
+
+
+def price_history_export_statement(product_id: Optional[UUID] = None, start_date: Optional[datetime] = None,
+                                   end_date: Optional[datetime] = None):
+    """
+    Build the query exporting the price history.
+
+    Args:
+        product_id (UUID, optional): Export only the history of this product.
+        start_date (datetime, optional): Export only changes at or after this time.
+        end_date (datetime, optional): Export only changes at or before this time.
+
+    Returns:
+        Select: The history columns ordered by time.
+    """
+    statement = select(*PRICE_HISTORY_COLUMNS).order_by(OfferPriceHistory.timestamp, OfferPriceHistory.id)
+    if product_id is not None:
+        statement = statement.where(OfferPriceHistory.product_id == product_id)
+    if start_date is not None:
+        statement = statement.where(OfferPriceHistory.timestamp >= start_date)
+    if end_date is not None:
+        statement = statement.where(OfferPriceHistory.timestamp <= end_date)
+    return statement
+
+
+def _export_value(value):
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def encode_ndjson(columns: list, rows: list) -> bytes:
+    """
+    Encode rows as newline-delimited JSON objects.
+
+    Args:
+        columns (list[str]): The column names.
+        rows (list[tuple]): The rows.
+
+    Returns:
+        bytes: One JSON object per row.
+    """
+    return "".join(
+        json.dumps(dict(zip(columns, map(_export_value, row))), separators=(",", ":")) + "\n" for row in rows
+    ).encode("utf-8")
+
+
+def encode_csv(columns: list, rows: list, header: bool = False) -> bytes:
+    """
+    Encode rows as CSV.
+
+    Args:
+        columns (list[str]): The column names.
+        rows (list[tuple]): The rows.
+        header (bool): Start with the header row.
+
+    Returns:
+        bytes: The CSV lines.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(columns)
+    writer.writerows([map(_export_value, row) for row in rows])
+    return buffer.getvalue().encode("utf-8")
+
+
+def stream_export(statement, export_format: ExportFormat,
+                  batch_size: int = Settings.EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """
+    Stream the rows of a query, encoded batch by batch.
+
+    The rows are read through a server-side cursor ``batch_size`` at a time in a session of
+    their own, so memory use does not depend on the number of exported rows.
+
+    Args:
+        statement (Select): The export query.
+        export_format (str): ``ndjson`` or ``csv``.
+        batch_size (int): Number of rows fetched and encoded at a time.
+
+    Yields:
+        bytes: The encoded rows of a batch; the CSV header comes with the first one.
+    """
+    columns = [column.name for column in statement.selected_columns]
+    exported = 0
+    with session_scope() as session:
+        result = session.execute(statement, execution_options={"yield_per": batch_size})
+        if export_format == "csv":
+            yield encode_csv(columns, [], header=True)
+        for rows in result.partitions():
+            exported += len(rows)
+            if export_format == "csv":
+                yield encode_csv(columns, rows)
+            else:
+                yield encode_ndjson(columns, rows)
+    logger_api.info("Exported %d rows.", exported)
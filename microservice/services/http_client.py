@@ -0,0 +1,385 @@
+import asyncio
+import bisect
+import random
+import threading
+import time
+from typing import Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+from microservice.config.settings import Settings
+from microservice.utils.logging_configure import get_logger
+from microservice.utils.metrics import UPSTREAM_REQUEST_DURATION
+
+logger_api = get_logger()
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Methods safe to replay after the request may have reached the service.
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling the upstream service while its circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Stop calling an upstream service after consecutive failures.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and calls are rejected
+    for ``reset_timeout`` seconds. Then a single trial call is let through (half-open): its
+    success closes the circuit, its failure opens it again. A trial ending otherwise, e.g. with a
+    429 response or a cancellation, is released so the next call is a trial again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, clock=time.monotonic):
+        """
+        Initialize the CircuitBreaker instance.
+
+        Args:
+            failure_threshold (int): Consecutive failures opening the circuit.
+            reset_timeout (float): Seconds the circuit stays open before a trial call.
+            clock (callable): Monotonic clock returning seconds, replaceable in tests.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self.lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a call may be made.
+
+        Returns:
+            bool: True when the circuit is closed, or for the single trial call when half-open.
+        """
+        return self.acquire() is not None
+
+    def acquire(self) -> Optional[str]:
+        """
+        Check whether a call may be made, telling apart the trial call.
+
+        Returns:
+            str or None: ``closed`` when the circuit is closed, ``half_open`` for the single trial
+            call, None when the call is rejected. The trial call must end with ``record_success``,
+            ``record_failure`` or ``release_trial``.
+        """
+        with self.lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return state
+            if state == self.HALF_OPEN and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return state
+            return None
+
+    def release_trial(self):
+        """
+        End a trial call without judging the service, letting the next call be a trial.
+        """
+        with self.lock:
+            self.trial_in_flight = False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial_in_flight or self.failures >= self.failure_threshold:
+                if self._state() == self.CLOSED:
+                    logger_api.warning("Circuit breaker opened after %d consecutive failures.", self.failures)
+                self.opened_at = self.clock()
+            self.trial_in_flight = False
+
+
+class LatencyHistogram:
+    """
+    Cumulative histogram of call latencies.
+    """
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self.lock:
+            self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self.total += seconds
+
+    def snapshot(self) -> dict:
+        """
+        Get the histogram.
+
+        Returns:
+            dict: Call count, total seconds and the number of calls per upper bucket bound in seconds.
+        """
+        with self.lock:
+            bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+            return {"count": sum(self.counts), "sum": self.total, "buckets": dict(zip(bounds, self.counts))}
+
+
+class UpstreamClient:
+    """
+    HTTP client of the offers microservice.
+
+    Sync calls share a pooled ``requests.Session``, so connections are kept alive between calls.
+    Every call has connect and read timeouts. Connection errors, timeouts, 5xx and 429 responses
+    are retried with jittered exponential backoff, honouring ``Retry-After``; non-idempotent calls
+    such as POST are only retried when the connection could not be established. A circuit breaker
+    rejects calls while the service keeps failing, and call latencies are recorded per endpoint.
+    """
+
+    def __init__(
+            self,
+            base_url: str = Settings.BASE_URL,
+            pool_size: int = Settings.UPSTREAM_POOL_SIZE,
+            connect_timeout: float = Settings.UPSTREAM_CONNECT_TIMEOUT_SECONDS,
+            read_timeout: float = Settings.UPSTREAM_READ_TIMEOUT_SECONDS,
+            max_retries: int = Settings.UPSTREAM_MAX_RETRIES,
+            backoff: float = Settings.UPSTREAM_BACKOFF_SECONDS,
+            max_backoff: float = Settings.UPSTREAM_MAX_BACKOFF_SECONDS,
+            breaker: Optional[CircuitBreaker] = None,
+    ):
+        """
+        Initialize the UpstreamClient instance.
+
+        Args:
+            base_url (str): Base URL of the offers microservice.
+            pool_size (int): Number of kept-alive connections.
+            connect_timeout (float): Default connect timeout in seconds.
+            read_timeout (float): Default read timeout in seconds.
+            max_retries (int): Number of retries after the first attempt.
+            backoff (float): Base of the exponential backoff in seconds.
+            max_backoff (float): Upper bound of a single backoff in seconds.
+            breaker (CircuitBreaker, optional): Circuit breaker of the service.
+        """
+        self.base_url = base_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker or CircuitBreaker(
+            Settings.UPSTREAM_BREAKER_FAILURES, Settings.UPSTREAM_BREAKER_RESET_SECONDS
+        )
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.latencies = {}
+        self.lock = threading.Lock()
+
+    def request(self, method: str, endpoint: str, path: str, timeout=None, **kwargs) -> requests.Response:
+        """
+        Call the offers microservice.
+
+        Args:
+            method (str): The HTTP method.
+            endpoint (str): Name of the endpoint the latency is recorded under.
+            path (str): Path appended to the base URL.
+            timeout (float or tuple, optional): Timeout overriding the default (connect, read) timeouts.
+            **kwargs: Further arguments of ``requests.Session.request``.
+
+        Returns:
+            requests.Response: The last response.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open.
+            requests.RequestException: If the last attempt failed without a response.
+        """
+        for attempt in range(self.max_retries + 1):
+            trial = self._check_circuit(endpoint)
+            try:
+                started = time.perf_counter()
+                try:
+                    response = self.session.request(
+                        method, f"{self.base_url}{path}", timeout=timeout or self.timeout, **kwargs
+                    )
+                except (requests.ConnectionError, requests.Timeout) as exc:
+                    self._observe(endpoint, time.perf_counter() - started, "error")
+                    if not self._failed(endpoint, attempt, exc, self._retryable(method, exc)):
+                        raise
+                    time.sleep(self._backoff(attempt))
+                    continue
+                except Exception:
+                    self._observe(endpoint, time.perf_counter() - started, "error")
+                    self.breaker.record_failure()
+                    raise
+                self._observe(endpoint, time.perf_counter() - started, str(response.status_code))
+                if response.status_code in RETRY_STATUS_CODES:
+                    if self._failed(endpoint, attempt, response, self._retryable(method)):
+                        time.sleep(self._backoff(attempt, response.headers.get("Retry-After")))
+                        continue
+                    return response
+                self._succeeded(response.status_code)
+                return response
+            finally:
+                if trial:
+                    self.breaker.release_trial()
+
+    async def arequest(self, client: httpx.AsyncClient, method: str, endpoint: str, path: str,
+                       **kwargs) -> httpx.Response:
+        """
+        Call the offers microservice through an async client, with the same retries and circuit breaker.
+
+        Args:
+            client (httpx.AsyncClient): The pooled async client used for the call.
+            method (str): The HTTP method.
+            endpoint (str): Name of the endpoint the latency is recorded under.
+            path (str): Path appended to the base URL.
+            **kwargs: Further arguments of ``httpx.AsyncClient.request``.
+
+        Returns:
+            httpx.Response: The last response.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open.
+            httpx.TransportError: If the last attempt failed without a response.
+        """
+        for attempt in range(self.max_retries + 1):
+            trial = self._check_circuit(endpoint)
+            try:
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, f"{self.base_url}{path}", **kwargs)
+                except httpx.TransportError as exc:
+                    self._observe(endpoint, time.perf_counter() - started, "error")
+                    if not self._failed(endpoint, attempt, exc, self._retryable(method, exc)):
+                        raise
+                    await asyncio.sleep(self._backoff(attempt))
+                    continue
+                except Exception:
+                    self._observe(endpoint, time.perf_counter() - started, "error")
+                    self.breaker.record_failure()
+                    raise
+                self._observe(endpoint, time.perf_counter() - started, str(response.status_code))
+                if response.status_code in RETRY_STATUS_CODES:
+                    if self._failed(endpoint, attempt, response, self._retryable(method)):
+                        await asyncio.sleep(self._backoff(attempt, response.headers.get("Retry-After")))
+                        continue
+                    return response
+                self._succeeded(response.status_code)
+                return response
+            finally:
+                if trial:
+                    self.breaker.release_trial()
+
+    def stats(self) -> dict:
+        """
+        Get the circuit breaker state and the latency histograms.
+
+        Returns:
+            dict: The circuit state and a latency histogram per endpoint.
+        """
+        with self.lock:
+            latencies = dict(self.latencies)
+        return {
+            "circuit": self.breaker.state,
+            "latency": {endpoint: histogram.snapshot() for endpoint, histogram in latencies.items()},
+        }
+
+    def _check_circuit(self, endpoint: str) -> bool:
+        """
+        Reject the call while the circuit is open.
+
+        Returns:
+            bool: True if the call is the trial call of a half-open circuit.
+        """
+        state = self.breaker.acquire()
+        if state is None:
+            raise CircuitOpenError(f"The offers service is unavailable, not calling {endpoint}.")
+        return state == CircuitBreaker.HALF_OPEN
+
+    @staticmethod
+    def _retryable(method: str, error: Optional[Exception] = None) -> bool:
+        """
+        Check whether a failed call may be replayed.
+
+        Non-idempotent calls are only replayed when the connection could not be established,
+        since the service may have processed a request whose response was lost.
+
+        Args:
+            method (str): The HTTP method.
+            error (Exception, optional): The error of the call, None for an error response.
+
+        Returns:
+            bool: True if the call may be retried.
+        """
+        if method.upper() in IDEMPOTENT_METHODS:
+            return True
+        if isinstance(error, (requests.ConnectTimeout, httpx.ConnectError, httpx.ConnectTimeout)):
+            return True
+        if isinstance(error, requests.ConnectionError) and error.args:
+            return isinstance(getattr(error.args[0], "reason", None), NewConnectionError)
+        return False
+
+    def _failed(self, endpoint: str, attempt: int, error, retryable: bool = True) -> bool:
+        """
+        Record a failed attempt.
+
+        Returns:
+            bool: True if the call should be retried.
+        """
+        status_code = getattr(error, "status_code", None)
+        if status_code != 429:
+            self.breaker.record_failure()
+        retry = retryable and attempt < self.max_retries
+        logger_api.warning(
+            "Call to %s failed (%s), attempt %d of %d.",
+            endpoint, status_code or type(error).__name__, attempt + 1, self.max_retries + 1,
+        )
+        return retry
+
+    def _succeeded(self, status_code: int):
+        if status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _observe(self, endpoint: str, seconds: float, status: str):
+        UPSTREAM_REQUEST_DURATION.labels(endpoint, status).observe(seconds)
+        with self.lock:
+            histogram = self.latencies.get(endpoint)
+            if histogram is None:
+                histogram = self.latencies[endpoint] = LatencyHistogram()
+        histogram.observe(seconds)
+
+
+offers_service_client = UpstreamClient()
@@ -0,0 +1,138 @@
+from typing import Iterable, Literal, Optional
+
+from sqlalchemy import Float, and_, cast, delete, exists, func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from microservice.models.models import Offer, OfferSummary, Product
+
+SummarySort = Literal["min_price", "-min_price", "total_stock", "-total_stock"]
+
+
+def _summary_upsert(product_ids: Optional[Iterable] = None):
+    """
+    Build the statement recomputing the summaries of products from their offers.
+
+    Args:
+        product_ids (Iterable, optional): IDs of the products to summarize. All products when omitted.
+
+    Returns:
+        Insert: INSERT ... SELECT ... GROUP BY product_id ON CONFLICT DO UPDATE statement.
+    """
+    aggregate = select(
+        Offer.product_id,
+        func.count(),
+        func.min(Offer.price),
+        cast(func.avg(Offer.price), Float),
+        func.max(Offer.price),
+        func.sum(Offer.items_in_stock),
+        func.now(),
+    ).group_by(Offer.product_id)
+    if product_ids is not None:
+        aggregate = aggregate.where(Offer.product_id.in_(list(product_ids)))
+
+    columns = ["product_id", "offer_count", "min_price", "avg_price", "max_price", "total_stock", "updated_at"]
+    statement = insert(OfferSummary).from_select(columns, aggregate)
+    return statement.on_conflict_do_update(
+        index_elements=[OfferSummary.product_id],
+        set_={column: statement.excluded[column] for column in columns[1:]},
+    )
+
+
+def refresh_offer_summaries(session: Session, product_ids: Iterable):
+    """
+    Recompute the summaries of products whose offers changed, without committing.
+
+    Args:
+        session (Session): The database session to write with.
+        product_ids (Iterable[UUID]): IDs of the products whose offers changed.
+    """
+    product_ids = list(product_ids)
+    if not product_ids:
+        return
+    session.execute(_summary_upsert(product_ids))
+    session.execute(
+        delete(OfferSummary).where(
+            OfferSummary.product_id.in_(product_ids),
+            ~exists().where(Offer.product_id == OfferSummary.product_id),
+        )
+    )
+
+
+def backfill_offer_summaries(connection):
+    """
+    Summarize all products with offers when the summary table is still empty.
+
+    Args:
+        connection (Connection): The database connection to write with.
+    """
+    if connection.execute(select(OfferSummary.product_id).limit(1)).first() is None:
+        connection.execute(_summary_upsert())
+
+
+def offer_summaries_statement(sort: str, skip: int, limit: int, in_stock: bool = False,
+                              cursor: Optional[tuple] = None):
+    """
+    Build the query listing one page of the offer summaries with their product names.
+
+    Summaries are ordered by the sort column and product ID, with summaries lacking a value
+    last in ascending and first in descending order, as in the indexes. Pages after the first
+    start after the ``(value, product_id)`` cursor of the previous one; ``skip`` is kept for
+    compatibility. One extra row is selected to tell whether there is a next page.
+
+    Args:
+        sort (str): Sort column, ``min_price`` or ``total_stock``; prefixed with ``-`` for descending order.
+        skip (int): Number of summaries to skip when no cursor is given.
+        limit (int): Maximum number of summaries to return.
+        in_stock (bool): Return only products with items in stock.
+        cursor (tuple[int or None, UUID], optional): Sort value and product ID of the last summary of the previous page.
+
+    Returns:
+        Select: Summary rows joined with the product name, ordered by the sort column and product ID.
+    """
+    column = getattr(OfferSummary, sort.lstrip("-"))
+    descending = sort.startswith("-")
+    order = [column.desc(), OfferSummary.product_id.desc()] if descending else [column, OfferSummary.product_id]
+    statement = (
+        select(
+            OfferSummary.product_id, Product.name, OfferSummary.offer_count, OfferSummary.min_price,
+            OfferSummary.avg_price, OfferSummary.max_price, OfferSummary.total_stock, OfferSummary.updated_at,
+        )
+        .join(Product, Product.id == OfferSummary.product_id)
+        .order_by(*order)
+        .limit(limit + 1)
+    )
+    if cursor:
+        statement = statement.where(_after_cursor(column, descending, *cursor))
+    elif skip:
+        statement = statement.offset(skip)
+    if in_stock:
+        statement = statement.where(OfferSummary.total_stock > 0)
+    return statement
+
+
+def _after_cursor(column, descending: bool, value: Optional[int], product_id):
+    # NULLs sort after every value in ascending order and before them in descending order.
+    if descending:
+        if value is None:
+            return or_(column.is_not(None), OfferSummary.product_id < product_id)
+        return or_(column < value, and_(column == value, OfferSummary.product_id < product_id))
+    if value is None:
+        return and_(column.is_(None), OfferSummary.product_id > product_id)
+    return or_(
+        column > value, and_(column == value, OfferSummary.product_id > product_id), column.is_(None)
+    )
+
+
+def summary_cursor_key(sort: str):
+    """
+    Get the function returning the cursor key of a summary row.
+
+    Args:
+        sort (str): The sort of the page.
+
+    Returns:
+        callable: Function returning the ``(value, product_id)`` of a row.
+    """
+    name = sort.lstrip("-")
+    return lambda row: (getattr(row, name), row.product_id)
@@ -0,0 +1,235 @@
+from datetime import datetime
+from typing import Iterable
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+from sqlalchemy import delete, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from microservice.config.settings import Settings
+from microservice.models.models import Offer, OfferPriceHistory, Product
+from microservice.services.cache import offers_cache
+from microservice.services.offer_summary import refresh_offer_summaries
+from microservice.services.price_history import price_history_rows
+from microservice.utils.logging_configure import get_logger
+
+logger_api = get_logger()
+
+
+class OfferSyncResult(BaseModel):
+    """
+    Summary of an offer synchronization.
+
+    Attributes:
+        inserted (int): Number of new offers.
+        updated (int): Number of offers whose price, stock or product changed.
+        deleted (int): Number of offers no longer returned by the offers service.
+        unchanged (int): Number of offers left untouched.
+        price_changes (int): Number of rows appended to the price history.
+        failed_products (int): Number of products whose batch could not be written.
+        changed_product_ids (set[UUID]): Products with at least one inserted, updated or deleted offer.
+        failed_product_ids (set[UUID]): Products whose batch could not be written.
+    """
+
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    price_changes: int = 0
+    failed_products: int = 0
+    changed_product_ids: set[UUID] = Field(default_factory=set)
+    failed_product_ids: set[UUID] = Field(default_factory=set)
+
+    def merge(self, other: "OfferSyncResult"):
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.deleted += other.deleted
+        self.unchanged += other.unchanged
+        self.price_changes += other.price_changes
+        self.failed_products += other.failed_products
+        self.changed_product_ids |= other.changed_product_ids
+        self.failed_product_ids |= other.failed_product_ids
+
+
+def diff_offers(stored_offers: dict, offers_by_product: dict):
+    """
+    Compare incoming offers with the stored ones.
+
+    Args:
+        stored_offers (dict): Stored ``(product_id, price, items_in_stock)`` tuples keyed by offer ID,
+            for every product in ``offers_by_product`` and every incoming offer ID.
+        offers_by_product (dict): Offer data from the offers service keyed by product ID.
+
+    Returns:
+        tuple[list[dict], list[UUID], OfferSyncResult]: Rows to upsert, offer IDs to delete and the
+        resulting counts.
+    """
+    result = OfferSyncResult()
+    upserts = {}
+
+    for product_id, offers_data in offers_by_product.items():
+        for offer in offers_data:
+            offer_id = UUID(str(offer["id"]))
+            row = (product_id, offer["price"], offer["items_in_stock"])
+            stored_row = stored_offers.get(offer_id)
+            if stored_row == row:
+                continue
+            upserts[offer_id] = {
+                "id": offer_id,
+                "price": offer["price"],
+                "items_in_stock": offer["items_in_stock"],
+                "product_id": product_id,
+            }
+            result.changed_product_ids.add(product_id)
+            if stored_row is not None and stored_row[0] != product_id:
+                result.changed_product_ids.add(stored_row[0])
+
+    incoming_ids = {
+        UUID(str(offer["id"])) for offers_data in offers_by_product.values() for offer in offers_data
+    }
+    delete_ids = [offer_id for offer_id in stored_offers if offer_id not in incoming_ids]
+    for offer_id in delete_ids:
+        result.changed_product_ids.add(stored_offers[offer_id][0])
+
+    result.inserted = sum(1 for offer_id in upserts if offer_id not in stored_offers)
+    result.updated = len(upserts) - result.inserted
+    result.deleted = len(delete_ids)
+    result.unchanged = len(incoming_ids) - len(upserts)
+    return list(upserts.values()), delete_ids, result
+
+
+class OfferSyncWriter:
+    """
+    Write refreshed offers by diffing them against the database.
+
+    Products are processed in batches, each batch in a single transaction, so readers
+    never see a product without its offers. Price and stock changes are appended to
+    the price history and the offer summaries of changed products are recomputed in
+    the same transaction. Cached offers of changed products are invalidated after each commit.
+    """
+
+    def __init__(self, batch_size: int = Settings.OFFER_SYNC_BATCH_SIZE):
+        """
+        Initialize the OfferSyncWriter instance.
+
+        Args:
+            batch_size (int): Number of products written per transaction.
+        """
+        self.batch_size = batch_size
+
+    def sync(self, session: Session, offers_by_product: dict) -> OfferSyncResult:
+        """
+        Synchronize stored offers with the offers returned by the offers service.
+
+        Args:
+            session (Session): The database session to write with.
+            offers_by_product (dict): Offer data keyed by product ID. Products missing from the
+                mapping are left untouched.
+
+        Returns:
+            OfferSyncResult: Counts of the applied changes.
+        """
+        result = OfferSyncResult()
+        items = list(offers_by_product.items())
+
+        for start in range(0, len(items), self.batch_size):
+            result.merge(self._write(session, dict(items[start:start + self.batch_size])))
+
+        logger_api.info(
+            "Offers synchronized: %d inserted, %d updated, %d deleted, %d unchanged, %d price changes.",
+            result.inserted, result.updated, result.deleted, result.unchanged, result.price_changes,
+        )
+        return result
+
+    def _write(self, session: Session, offers_by_product: dict) -> OfferSyncResult:
+        """
+        Write one batch of products in a transaction.
+
+        When the batch fails, its products are written again one at a time, so that only the
+        products that cannot be written are reported as failed.
+
+        Args:
+            session (Session): The database session to write with.
+            offers_by_product (dict): Offer data keyed by product ID.
+
+        Returns:
+            OfferSyncResult: Counts of the applied changes.
+        """
+        try:
+            batch_result = self._sync_batch(session, offers_by_product)
+            session.commit()
+        except Exception as exc:
+            session.rollback()
+            if len(offers_by_product) == 1:
+                logger_api.exception("Error writing offers for product %s:", next(iter(offers_by_product)))
+                return OfferSyncResult(failed_products=1, failed_product_ids=set(offers_by_product))
+            logger_api.warning(
+                "Error writing offers for a batch of %d products, writing them one at a time.", len(offers_by_product)
+            )
+            batch_result = OfferSyncResult()
+            for product_id, offers_data in offers_by_product.items():
+                batch_result.merge(self._write(session, {product_id: offers_data}))
+            return batch_result
+        offers_cache.invalidate(*batch_result.changed_product_ids)
+        return batch_result
+
+    def _sync_batch(self, session: Session, offers_by_product: dict) -> OfferSyncResult:
+        """
+        Apply the diff for one batch of products without committing.
+
+        Args:
+            session (Session): The database session to write with.
+            offers_by_product (dict): Offer data keyed by product ID.
+
+        Returns:
+            OfferSyncResult: Counts of the applied changes.
+        """
+        # Products deleted since their offers were fetched would fail the whole batch on the foreign key.
+        existing_ids = set(session.scalars(select(Product.id).where(Product.id.in_(list(offers_by_product)))))
+        offers_by_product = {
+            product_id: offers_data for product_id, offers_data in offers_by_product.items()
+            if product_id in existing_ids
+        }
+        stored_offers = self._load_stored_offers(session, offers_by_product)
+        upserts, delete_ids, result = diff_offers(stored_offers, offers_by_product)
+
+        if delete_ids:
+            session.execute(delete(Offer).where(Offer.id.in_(delete_ids)))
+
+        if upserts:
+            now = datetime.utcnow()
+            for row in upserts:
+                row["timestamp"] = now
+            statement = insert(Offer)
+            statement = statement.on_conflict_do_update(
+                index_elements=[Offer.id],
+                set_={
+                    "price": statement.excluded.price,
+                    "items_in_stock": statement.excluded.items_in_stock,
+                    "product_id": statement.excluded.product_id,
+                    "timestamp": statement.excluded.timestamp,
+                },
+            )
+            session.execute(statement, upserts)
+
+            history_rows = price_history_rows(upserts, stored_offers, now)
+            if history_rows:
+                session.execute(insert(OfferPriceHistory), history_rows)
+            result.price_changes = len(history_rows)
+
+        refresh_offer_summaries(session, result.changed_product_ids)
+        return result
+
+    @staticmethod
+    def _load_stored_offers(session: Session, offers_by_product: dict) -> dict:
+        # Offers moving in from products outside the batch are loaded too, so they count as updates.
+        offer_ids = [UUID(str(offer["id"])) for offers_data in offers_by_product.values() for offer in offers_data]
+        rows = session.execute(
+            select(Offer.id, Offer.product_id, Offer.price, Offer.items_in_stock)
+            .where(or_(Offer.product_id.in_(list(offers_by_product)), Offer.id.in_(offer_ids)))
+        )
+        return {offer_id: (product_id, price, stock) for offer_id, product_id, price, stock in rows}
+
+
+offer_sync_writer = OfferSyncWriter()
@@ -1,6 +1,9 @@
-import requests
+from typing import Optional
+
+import httpx
+from pydantic import BaseModel
 from microservice.utils.logging_configure import get_logger
-from microservice.config.settings import Settings
+from microservice.services.http_client import CircuitOpenError, offers_service_client
 
 
 logger_api = get_logger()
@@ -17,25 +20,85 @@ def get_product_offer_data(access_token, product_id):
     Returns:
         dict or bool: A dictionary containing offer data if successful, False otherwise.
     """
-    offer_service_url = f"{Settings.BASE_URL}/api/v1/products/{product_id}/offers"
-
     headers = {
         "Bearer": access_token
     }
 
     try:
-        response = requests.get(offer_service_url, headers=headers)
+        response = offers_service_client.request(
+            "GET", "product_offers", f"/api/v1/products/{product_id}/offers", headers=headers
+        )
 
         if response.status_code == 200:
             response_data = response.json()
             return response_data
         else:
-            logger_api.error(f"API Error - Status Code: {response.status_code}")
-            logger_api.error(f"API Response Content: {response.content.decode('utf-8')}")
+            logger_api.error("API Error - Status Code: %s", response.status_code)
+            logger_api.error("API Response Content: %s", response.text)
             return False
 
+    except CircuitOpenError as exc:
+        logger_api.warning(str(exc))
+        return False
     except Exception as exc:
-        logger_api.exception(f"Exception:")
+        logger_api.exception("Exception:")
         return False
 
 
+class OfferPayload(BaseModel):
+    """
+    Raw response of the offers service for the offers of a product.
+
+    Attributes:
+        not_modified (bool): Whether the service answered 304 Not Modified to a conditional request.
+        etag (str, optional): The ETag of the offers, if the service provides one.
+        body (bytes): The raw JSON body, empty when not modified.
+    """
+
+    not_modified: bool = False
+    etag: Optional[str] = None
+    body: bytes = b""
+
+
+async def fetch_product_offer_data(client: httpx.AsyncClient, access_token, product_id, etag: Optional[str] = None):
+    """
+    Asynchronously get offer data for a product using a shared HTTP client.
+
+    Retries, the circuit breaker and latency recording are shared with the sync calls.
+    With an ETag the request is conditional, so unchanged offers are not sent again.
+
+    Args:
+        client (httpx.AsyncClient): The pooled client used for the request.
+        access_token (str): The access token for authentication.
+        product_id (str): The ID of the product for which to retrieve offer data.
+        etag (str, optional): ETag of the offers received last time, sent as If-None-Match.
+
+    Returns:
+        OfferPayload or bool: The unparsed response if successful, False otherwise.
+    """
+    headers = {
+        "Bearer": access_token
+    }
+    if etag:
+        headers["If-None-Match"] = etag
+
+    try:
+        response = await offers_service_client.arequest(
+            client, "GET", "product_offers", f"/api/v1/products/{product_id}/offers", headers=headers
+        )
+
+        if response.status_code == 304:
+            return OfferPayload(not_modified=True, etag=etag)
+        if response.status_code == 200:
+            return OfferPayload(etag=response.headers.get("ETag"), body=response.content)
+        else:
+            logger_api.error("API Error - Status Code: %s", response.status_code)
+            logger_api.error("API Response Content: %s", response.text)
+            return False
+
+    except CircuitOpenError as exc:
+        logger_api.debug("Not fetching offers for product %s: %s", product_id, exc)
+        return False
+    except Exception as exc:
+        logger_api.exception("Exception while fetching offers for product %s:", product_id)
+        return False
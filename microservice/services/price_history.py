@@ -0,0 +1,83 @@
+from datetime import date, datetime
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.engine import Connection
+
+from microservice.config.settings import Settings
+from microservice.models.models import OfferPriceHistory
+from microservice.utils.logging_configure import get_logger
+
+logger_api = get_logger()
+
+
+def price_history_rows(upserts: list, stored_offers: dict, timestamp: datetime) -> list:
+    """
+    Build history rows for the offers whose price or stock changed.
+
+    Args:
+        upserts (list[dict]): Offer rows about to be written.
+        stored_offers (dict): Stored ``(product_id, price, items_in_stock)`` tuples keyed by offer ID.
+        timestamp (datetime): The time of the change.
+
+    Returns:
+        list[dict]: Rows for the ``offer_price_history`` table.
+    """
+    rows = []
+    for row in upserts:
+        stored_row = stored_offers.get(row["id"])
+        if stored_row is not None and stored_row[1:] == (row["price"], row["items_in_stock"]):
+            continue
+        rows.append({
+            "timestamp": timestamp,
+            "offer_id": row["id"],
+            "product_id": row["product_id"],
+            "price": row["price"],
+            "items_in_stock": row["items_in_stock"],
+        })
+    return rows
+
+
+def _month_start(year: int, month: int) -> date:
+    return date(year + (month - 1) // 12, (month - 1) % 12 + 1, 1)
+
+
+def ensure_price_history_partitions(connection: Connection, months_ahead: int = Settings.PRICE_HISTORY_PARTITIONS_AHEAD):
+    """
+    Create the monthly partitions of the price history table if they do not exist yet.
+
+    Partitions are created for the current month and ``months_ahead`` following months,
+    plus a default partition catching rows outside of them. Does nothing until the table
+    has been partitioned by the migrations. A partition that cannot be created, e.g. because
+    the default partition already holds rows of its month, is logged and skipped; those rows
+    stay in the default partition.
+
+    Args:
+        connection (Connection): The database connection to create the partitions with.
+        months_ahead (int): Number of future months to prepare partitions for.
+    """
+    table_name = OfferPriceHistory.__tablename__
+    partitioned = connection.scalar(
+        text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table_name}
+    )
+    if not partitioned:
+        logger_api.warning("The %s table is not partitioned, run the migrations.", table_name)
+        return
+
+    statements = []
+    today = date.today()
+    for offset in range(months_ahead + 1):
+        start = _month_start(today.year, today.month + offset)
+        end = _month_start(today.year, today.month + offset + 1)
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {table_name}_y{start:%Y}m{start:%m} "
+            f"PARTITION OF {table_name} FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+    statements.append(f"CREATE TABLE IF NOT EXISTS {table_name}_default PARTITION OF {table_name} DEFAULT")
+    for statement in statements:
+        try:
+            with connection.begin_nested():
+                connection.execute(text(statement))
+        except DBAPIError:
+            logger_api.exception("Error creating a price history partition:")
+    logger_api.info("Price history partitions are ready up to %d months ahead.", months_ahead)
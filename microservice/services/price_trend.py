@@ -0,0 +1,219 @@
+from datetime import datetime
+from typing import Iterable, Literal, Optional
+
+from sqlalchemy import DateTime, Integer, extract, func, literal, select, union_all
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
+
+from microservice.models.models import OfferPriceHistory
+
+SECONDS_PER_DAY = 86400
+
+PriceBucket = Literal["hour", "day"]
+
+
+def price_history_in_range(product_ids: Iterable, start_date: datetime, end_date: datetime):
+    """
+    Build the subquery of the price history of products within a date range.
+
+    History rows are only written when an offer changes, so the last row of every offer before
+    ``start_date`` is carried forward to ``start_date``; offers with a stable price still count.
+
+    Args:
+        product_ids (Iterable): IDs of the products for analysis.
+        start_date (datetime): The start date for the analysis.
+        end_date (datetime): The end date for the analysis.
+
+    Returns:
+        Subquery: The product_id, offer_id, timestamp and price of the rows.
+    """
+    product_ids = list(product_ids)
+    in_range = select(
+        OfferPriceHistory.product_id, OfferPriceHistory.offer_id, OfferPriceHistory.timestamp, OfferPriceHistory.price
+    ).where(
+        OfferPriceHistory.product_id.in_(product_ids),
+        OfferPriceHistory.timestamp >= start_date,
+        OfferPriceHistory.timestamp <= end_date,
+    )
+    carried_forward = (
+        select(
+            OfferPriceHistory.product_id,
+            OfferPriceHistory.offer_id,
+            literal(start_date, DateTime).label("timestamp"),
+            OfferPriceHistory.price,
+        )
+        .where(
+            OfferPriceHistory.product_id.in_(product_ids),
+            OfferPriceHistory.timestamp < start_date,
+            literal(start_date, DateTime) <= end_date,
+        )
+        .distinct(OfferPriceHistory.offer_id)
+        .order_by(OfferPriceHistory.offer_id, OfferPriceHistory.timestamp.desc())
+    )
+    return union_all(in_range, carried_forward).subquery("history")
+
+
+def _ordered_prices(history, descending: bool = False):
+    timestamp = history.c.timestamp.desc() if descending else history.c.timestamp
+    return func.array_agg(aggregate_order_by(history.c.price, timestamp), type_=ARRAY(Integer))
+
+
+def price_trend_statement(product_ids: Iterable, start_date: datetime, end_date: datetime):
+    """
+    Build the query fitting a linear price trend per product over time.
+
+    The regression runs in Postgres against the seconds elapsed since ``start_date``, so
+    irregular gaps between the recorded changes do not distort the slope.
+
+    Args:
+        product_ids (Iterable): IDs of the products for analysis.
+        start_date (datetime): The start date for the analysis.
+        end_date (datetime): The end date for the analysis.
+
+    Returns:
+        Select: One row per product with data: product_id, slope (per day), intercept (price at
+        ``start_date``), r_squared, points, first_price and last_price.
+    """
+    history = price_history_in_range(product_ids, start_date, end_date)
+    seconds = extract("epoch", history.c.timestamp - start_date)
+    return (
+        select(
+            history.c.product_id,
+            (func.regr_slope(history.c.price, seconds) * SECONDS_PER_DAY).label("slope"),
+            func.regr_intercept(history.c.price, seconds).label("intercept"),
+            func.regr_r2(history.c.price, seconds).label("r_squared"),
+            func.count().label("points"),
+            _ordered_prices(history)[1].label("first_price"),
+            _ordered_prices(history, descending=True)[1].label("last_price"),
+        )
+        .group_by(history.c.product_id)
+    )
+
+
+def price_points_statement(product_id, start_date: datetime, end_date: datetime):
+    """
+    Build the query selecting the raw price history of a product.
+
+    Args:
+        product_id: The ID of the product for analysis.
+        start_date (datetime): The start date for the analysis.
+        end_date (datetime): The end date for the analysis.
+
+    Returns:
+        Select: The (timestamp, price) query ordered by timestamp.
+    """
+    history = price_history_in_range([product_id], start_date, end_date)
+    return select(history.c.timestamp, history.c.price).order_by(history.c.timestamp)
+
+
+def price_buckets_statement(product_id, start_date: datetime, end_date: datetime, bucket: str):
+    """
+    Build the query downsampling the price history of a product into hourly or daily buckets.
+
+    Args:
+        product_id: The ID of the product for analysis.
+        start_date (datetime): The start date for the analysis.
+        end_date (datetime): The end date for the analysis.
+        bucket (str): Bucket size, ``hour`` or ``day``.
+
+    Returns:
+        Select: One row per non-empty bucket with start, open, high, low, close, average and count.
+    """
+    history = price_history_in_range([product_id], start_date, end_date)
+    bucket_start = func.date_trunc(bucket, history.c.timestamp).label("start")
+    return (
+        select(
+            bucket_start,
+            _ordered_prices(history)[1].label("open"),
+            func.max(history.c.price).label("high"),
+            func.min(history.c.price).label("low"),
+            _ordered_prices(history, descending=True)[1].label("close"),
+            func.avg(history.c.price).label("average"),
+            func.count().label("count"),
+        )
+        .group_by(bucket_start)
+        .order_by(bucket_start)
+    )
+
+
+def trend_summary(row) -> dict:
+    """
+    Convert a row of price_trend_statement into the trend fields of a response.
+
+    Args:
+        row: A row of price_trend_statement.
+
+    Returns:
+        dict: The trend per day, intercept, r squared, percent change and number of points.
+    """
+    percent_change = None
+    if row.first_price:
+        percent_change = (row.last_price - row.first_price) / row.first_price * 100
+    return {
+        "trend": row.slope,
+        "intercept": row.intercept,
+        "r_squared": row.r_squared,
+        "percent_change": percent_change,
+        "points": row.points,
+    }
+
+
+def price_trend_response(summary_row, points: Optional[list] = None, buckets: Optional[list] = None,
+                         bucket: Optional[str] = None) -> dict:
+    """
+    Build the price trend response of a product.
+
+    Args:
+        summary_row: The product's row of price_trend_statement, or None without data.
+        points (list, optional): (timestamp, price) rows, returned when no bucket is requested.
+        buckets (list, optional): Rows of price_buckets_statement.
+        bucket (str, optional): The requested bucket size.
+
+    Returns:
+        dict: The trend summary with either the raw timestamps and prices or the buckets.
+    """
+    if summary_row is None:
+        return {"message": "No price data available for the specified period."}
+
+    response = trend_summary(summary_row)
+    if bucket:
+        response["bucket"] = bucket
+        response["buckets"] = [
+            {
+                "start": row.start,
+                "open": row.open,
+                "high": row.high,
+                "low": row.low,
+                "close": row.close,
+                "average": float(row.average),
+                "count": row.count,
+            }
+            for row in buckets
+        ]
+    else:
+        response["timestamps"] = [timestamp for timestamp, _ in points]
+        response["prices"] = [price for _, price in points]
+    return response
+
+
+def batch_price_trend_response(product_ids: list, existing_ids: set, summary_rows) -> dict:
+    """
+    Build the price trend response of several products from one grouped query.
+
+    Args:
+        product_ids (list[UUID]): The requested product IDs, in request order.
+        existing_ids (set[UUID]): The requested products that exist.
+        summary_rows: Rows of price_trend_statement for the requested products.
+
+    Returns:
+        dict: A result per product, holding either the trend summary or an error.
+    """
+    summaries = {row.product_id: row for row in summary_rows}
+    results = []
+    for product_id in product_ids:
+        if product_id not in existing_ids:
+            results.append({"product_id": product_id, "error": f"Product with id {product_id} does not exist"})
+        elif product_id not in summaries:
+            results.append({"product_id": product_id, "error": "No price data available for the specified period."})
+        else:
+            results.append({"product_id": product_id, **trend_summary(summaries[product_id])})
+    return {"results": results}
@@ -0,0 +1,60 @@
+from typing import Iterable
+
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from microservice.models.models import (Offer, OfferPriceHistory, OfferSummary, Product, ProductReadCount,
+                                        ProductRegistration)
+from microservice.services.cache import invalidate_product, price_trend_cache
+
+# Rows referencing the products, deleted before them; the key names the count in the result.
+PRODUCT_ROWS = {
+    "offers": Offer,
+    "price_history": OfferPriceHistory,
+    "offer_summaries": OfferSummary,
+    "registrations": ProductRegistration,
+    "read_counts": ProductReadCount,
+}
+
+
+def delete_products(session: Session, product_ids: Iterable) -> dict:
+    """
+    Delete products and every row referencing them, without committing.
+
+    Every table is cleared with one ``DELETE ... WHERE product_id IN`` statement, so no rows are
+    loaded into the session whatever the number of offers and history rows. The foreign keys also
+    cascade, so rows written concurrently do not block the delete of the products.
+
+    Args:
+        session (Session): The database session to delete with.
+        product_ids (Iterable[UUID]): IDs of the products to delete.
+
+    Returns:
+        dict[str, int]: Number of deleted rows per kind, ``products`` included.
+    """
+    product_ids = list(product_ids)
+    deleted = {}
+    for name, model in PRODUCT_ROWS.items():
+        result = session.execute(
+            delete(model).where(model.product_id.in_(product_ids)).execution_options(synchronize_session=False)
+        )
+        deleted[name] = result.rowcount
+    result = session.execute(
+        delete(Product).where(Product.id.in_(product_ids)).execution_options(synchronize_session=False)
+    )
+    deleted["products"] = result.rowcount
+    return deleted
+
+
+def invalidate_deleted_products(product_ids: Iterable, deleted: dict):
+    """
+    Remove deleted products from the caches once the delete is committed.
+
+    Args:
+        product_ids (Iterable[UUID]): IDs of the deleted products.
+        deleted (dict[str, int]): The counts returned by ``delete_products``.
+    """
+    for product_id in product_ids:
+        invalidate_product(product_id)
+    if deleted.get("price_history"):
+        price_trend_cache.clear()
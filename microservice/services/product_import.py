@@ -0,0 +1,252 @@
+import csv
+import uuid
+from datetime import datetime
+from typing import Iterable, Iterator, Literal, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+
+from microservice.config.settings import Settings
+from microservice.database.database_setup import session_scope
+from microservice.models.models import Product, ProductImportJob, ProductRegistration
+from microservice.services.registration_outbox import PENDING, registration_worker
+from microservice.utils.logging_configure import get_logger
+
+logger_api = get_logger()
+
+ImportFormat = Literal["ndjson", "csv"]
+
+CONTENT_TYPES = {
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv",
+}
+
+LINE_TOO_LONG = f"line longer than {Settings.PRODUCT_IMPORT_MAX_LINE_BYTES} bytes"
+
+
+class ImportedProduct(BaseModel):
+    name: str = Field(min_length=1)
+    description: str
+
+
+def iter_lines(chunks: Iterable[bytes],
+               max_line_bytes: int = Settings.PRODUCT_IMPORT_MAX_LINE_BYTES) -> Iterator[Optional[bytes]]:
+    """
+    Split a stream of byte chunks into lines, keeping one incomplete line in memory.
+
+    A line longer than ``max_line_bytes`` is dropped as it arrives and yielded as None,
+    so a huge line or an upload without line breaks does not grow the buffer.
+
+    Args:
+        chunks (Iterable[bytes]): The uploaded body.
+        max_line_bytes (int): Maximum length of a line, line ending included.
+
+    Yields:
+        bytes or None: Lines with their line endings, decoded by ``parse_rows``, or None for a
+        line that is too long.
+    """
+    buffer = b""
+    too_long = False
+    for chunk in chunks:
+        buffer += chunk
+        start = 0
+        end = buffer.find(b"\n")
+        while end != -1:
+            yield None if too_long or end + 1 - start > max_line_bytes else buffer[start:end + 1]
+            too_long = False
+            start = end + 1
+            end = buffer.find(b"\n", start)
+        buffer = buffer[start:]
+        if len(buffer) > max_line_bytes:
+            too_long = True
+            buffer = b""
+    if too_long:
+        yield None
+    elif buffer:
+        yield buffer
+
+
+def parse_rows(lines: Iterable[Optional[bytes]], import_format: ImportFormat) -> Iterator[tuple]:
+    """
+    Parse and validate the products of an upload.
+
+    NDJSON uploads hold one JSON object per line. CSV uploads start with a header row
+    naming the name and description columns; quoted fields may span lines. Lines that are
+    too long or not valid UTF-8 reject their row instead of aborting the import.
+
+    Args:
+        lines (Iterable[bytes or None]): Lines of the upload, None for a line that is too long.
+        import_format (str): ``ndjson`` or ``csv``.
+
+    Yields:
+        tuple[int, ImportedProduct or None, str or None]: Line number of the row, and either the
+        product or the error of an invalid row.
+    """
+    if import_format == "csv":
+        invalid_lines = {}
+        reader = csv.DictReader(_decode_lines(lines, invalid_lines))
+        first_line = reader.line_num + 1
+        for row in reader:
+            row_lines = range(first_line, reader.line_num + 1)
+            first_line = reader.line_num + 1
+            error = next((invalid_lines[number] for number in row_lines if number in invalid_lines), None)
+            if error is not None:
+                yield reader.line_num, None, error
+                continue
+            try:
+                yield reader.line_num, ImportedProduct.model_validate(row), None
+            except ValidationError as exc:
+                yield reader.line_num, None, _validation_error(exc)
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if line is None:
+            yield line_number, None, LINE_TOO_LONG
+            continue
+        try:
+            text = line.decode("utf-8")
+            if not text.strip():
+                continue
+            yield line_number, ImportedProduct.model_validate_json(text), None
+        except UnicodeDecodeError as exc:
+            yield line_number, None, _decode_error(exc)
+        except ValidationError as exc:
+            yield line_number, None, _validation_error(exc)
+
+
+def _decode_lines(lines: Iterable[Optional[bytes]], invalid_lines: dict) -> Iterator[str]:
+    # Undecodable and too long lines are replaced so the CSV reader keeps counting lines; their rows are rejected.
+    for line_number, line in enumerate(lines, start=1):
+        if line is None:
+            invalid_lines[line_number] = LINE_TOO_LONG
+            yield "\ufffd\n"
+            continue
+        try:
+            yield line.decode("utf-8")
+        except UnicodeDecodeError as exc:
+            invalid_lines[line_number] = _decode_error(exc)
+            yield line.decode("utf-8", errors="replace")
+
+
+def _decode_error(exc: UnicodeDecodeError) -> str:
+    return f"invalid UTF-8 at byte {exc.start}"
+
+
+def _validation_error(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, error['loc'])) or 'row'}: {error['msg']}" for error in exc.errors())
+
+
+def create_import_job(import_format: ImportFormat) -> UUID:
+    """
+    Create a running import job.
+
+    Args:
+        import_format (str): ``ndjson`` or ``csv``.
+
+    Returns:
+        UUID: ID of the new job.
+    """
+    with session_scope() as session:
+        job = ProductImportJob(format=import_format, errors=[])
+        session.add(job)
+        session.commit()
+        return job.id
+
+
+def import_products(job_id: UUID, chunks: Iterable[bytes], import_format: ImportFormat,
+                    batch_size: int = Settings.PRODUCT_IMPORT_BATCH_SIZE):
+    """
+    Import the products of an upload.
+
+    Valid rows are inserted ``batch_size`` at a time, each batch in one transaction with its
+    registration outbox entries and the progress of the job. The progress is also written once
+    ``batch_size`` rows have been rejected, so at most one batch of rows and errors is held in memory.
+    The registration worker is woken up after every batch.
+
+    Args:
+        job_id (UUID): ID of the running import job.
+        chunks (Iterable[bytes]): The uploaded body.
+        import_format (str): ``ndjson`` or ``csv``.
+        batch_size (int): Number of products inserted per transaction.
+    """
+    batch = []
+    errors = []
+    with session_scope() as session:
+        try:
+            for line_number, product, error in parse_rows(iter_lines(chunks), import_format):
+                if error is not None:
+                    errors.append({"line": line_number, "error": error})
+                else:
+                    batch.append(product)
+                if len(batch) >= batch_size or len(errors) >= batch_size:
+                    _write_batch(session, job_id, batch, errors)
+                    batch, errors = [], []
+            _write_batch(session, job_id, batch, errors)
+            status = "completed"
+        except Exception as exc:
+            session.rollback()
+            logger_api.exception("Error importing products of job %s:", job_id)
+            status = "failed"
+        session.execute(
+            update(ProductImportJob)
+            .where(ProductImportJob.id == job_id)
+            .values(status=status, finished_at=datetime.utcnow())
+        )
+        session.commit()
+    logger_api.info("Product import %s %s.", job_id, status)
+
+
+def _write_batch(session: Session, job_id: UUID, products: list, errors: list):
+    if products:
+        rows = [{"id": uuid.uuid4(), "name": product.name, "description": product.description} for product in products]
+        session.execute(insert(Product), rows)
+        session.execute(
+            insert(ProductRegistration),
+            [{"product_id": row["id"], "status": PENDING, "import_job_id": job_id} for row in rows],
+        )
+
+    job = session.get(ProductImportJob, job_id)
+    job.imported += len(products)
+    job.rejected += len(errors)
+    room = Settings.PRODUCT_IMPORT_MAX_ERRORS - len(job.errors)
+    if errors and room > 0:
+        job.errors = job.errors + errors[:room]
+    session.commit()
+    if products:
+        registration_worker.wake()
+
+
+def import_job_status(session: Session, job_id: UUID) -> Optional[dict]:
+    """
+    Get the progress of an import job and of the registration of its products.
+
+    Args:
+        session (Session): The database session to query with.
+        job_id (UUID): ID of the import job.
+
+    Returns:
+        dict or None: The job fields and the number of products per registration status,
+        None if the job does not exist.
+    """
+    job = session.get(ProductImportJob, job_id)
+    if job is None:
+        return None
+    registrations = session.execute(
+        select(ProductRegistration.status, func.count())
+        .where(ProductRegistration.import_job_id == job_id)
+        .group_by(ProductRegistration.status)
+    ).all()
+    return {
+        "id": job.id,
+        "status": job.status,
+        "format": job.format,
+        "imported": job.imported,
+        "rejected": job.rejected,
+        "errors": job.errors,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+        "registrations": dict(registrations),
+    }
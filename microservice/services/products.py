@@ -1,10 +1,25 @@
-import requests
 from microservice.utils.logging_configure import get_logger
 from microservice.config.settings import Settings
+from microservice.services.http_client import offers_service_client
 
 logger_api = get_logger()
 
 
+def is_already_registered(response) -> bool:
+    """
+    Check whether the offers service rejected a registration because the product ID is registered already.
+
+    Args:
+        response (Response): The response of the offers service to the registration.
+
+    Returns:
+        bool: True for a 409 Conflict, or a 400 Bad Request reporting the product as already registered.
+    """
+    if response.status_code == 409:
+        return True
+    return response.status_code == 400 and "already" in response.text.lower()
+
+
 def register_product_in_offer_service(access_token: str, product_info: dict):
     """
     Register a product in the offer service using the provided access token and product information.
@@ -14,25 +29,30 @@ def register_product_in_offer_service(access_token: str, product_info: dict):
         product_info (dict): The product information to register.
 
     Returns:
-        bool: True if the registration is successful, False otherwise.
+        bool: True if the registration is successful or the product is already registered, False otherwise.
     """
-    offer_service_url = f"{Settings.BASE_URL}{Settings.PRODUCTS_REGISTER_ENDPOINT}"
     try:
         headers = {
             "Bearer": access_token
         }
 
-        response = requests.post(offer_service_url, json=product_info, headers=headers)
+        response = offers_service_client.request(
+            "POST", "register_product", Settings.PRODUCTS_REGISTER_ENDPOINT, json=product_info, headers=headers
+        )
 
         if response.status_code == 201:
             logger_api.info("Product registration successful.")
             return True
+        elif is_already_registered(response):
+            # POST calls are not replayed, so an earlier attempt whose response was lost may have registered it.
+            logger_api.info("Product %s is already registered.", product_info["id"])
+            return True
         else:
-            logger_api.error(f"API Error - Status Code: {response.status_code}")
-            logger_api.error(f"API Response Content: {response.content.decode('utf-8')}")
+            logger_api.error("API Error - Status Code: %s", response.status_code)
+            logger_api.error("API Response Content: %s", response.text)
             return False
 
     except Exception as exc:
-        logger_api.exception(f"Exception:")
+        logger_api.exception("Exception:")
         return False
 
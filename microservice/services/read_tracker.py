@@ -0,0 +1,82 @@
+import threading
+from collections import Counter
+
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from microservice.models.models import ProductReadCount
+
+
+class ReadTracker:
+    """
+    Count product reads served by this worker for the refresh scheduler.
+
+    Reads are counted in memory and flushed periodically with a single upsert, so read
+    traffic from every worker reaches the refresh leader without a write per request.
+    """
+
+    def __init__(self):
+        """
+        Initialize the ReadTracker instance.
+        """
+        self.counts = Counter()
+        self.lock = threading.Lock()
+
+    def record(self, product_id):
+        """
+        Count a read of a product.
+
+        Args:
+            product_id (UUID): ID of the read product.
+        """
+        with self.lock:
+            self.counts[product_id] += 1
+
+    def flush(self, session: Session):
+        """
+        Add the reads counted since the last flush to the shared read counts.
+
+        Args:
+            session (Session): The database session to write with.
+        """
+        with self.lock:
+            counts, self.counts = self.counts, Counter()
+        if not counts:
+            return
+        statement = insert(ProductReadCount)
+        statement = statement.on_conflict_do_update(
+            index_elements=[ProductReadCount.product_id],
+            set_={"reads": ProductReadCount.reads + statement.excluded.reads},
+        )
+        try:
+            session.execute(statement, [
+                {"product_id": product_id, "reads": reads} for product_id, reads in counts.items()
+            ])
+            session.commit()
+        except Exception:
+            session.rollback()
+            with self.lock:
+                self.counts.update(counts)
+            raise
+
+    @staticmethod
+    def consume(session: Session) -> dict:
+        """
+        Take the shared read counts of all workers, resetting them.
+
+        Args:
+            session (Session): The database session to read with.
+
+        Returns:
+            dict: Number of reads keyed by product ID.
+        """
+        rows = session.execute(
+            delete(ProductReadCount).returning(ProductReadCount.product_id, ProductReadCount.reads)
+        )
+        reads = {product_id: count for product_id, count in rows}
+        session.commit()
+        return reads
+
+
+read_tracker = ReadTracker()
@@ -0,0 +1,259 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from microservice.config.settings import Settings
+from microservice.database.database_setup import session_scope
+from microservice.models.models import Product, ProductRegistration
+from microservice.services.offer_sync import offer_sync_writer
+from microservice.services.offers import get_product_offer_data
+from microservice.services.products import register_product_in_offer_service
+from microservice.services.token_manager import token_manager
+from microservice.utils.logging_configure import get_logger
+
+logger_background = get_logger()
+
+PENDING = "pending"
+REGISTERED = "registered"
+COMPLETED = "completed"
+FAILED = "failed"
+
+ACTIVE_STATUSES = (PENDING, REGISTERED)
+
+
+class RegistrationError(Exception):
+    """
+    Raised when a step of a product registration fails.
+    """
+
+
+def enqueue_registration(session: Session, product_id: UUID):
+    """
+    Add the outbox entry registering a product, without committing.
+
+    Args:
+        session (Session): The database session the product is created with.
+        product_id (UUID): ID of the product to register.
+    """
+    session.add(ProductRegistration(product_id=product_id, status=PENDING))
+
+
+def registration_backoff(attempts: int) -> timedelta:
+    """
+    Get the delay before retrying a registration.
+
+    Args:
+        attempts (int): Number of attempts made so far.
+
+    Returns:
+        timedelta: Exponential delay, bounded by ``REGISTRATION_MAX_BACKOFF_SECONDS``.
+    """
+    seconds = Settings.REGISTRATION_BACKOFF_SECONDS * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(seconds, Settings.REGISTRATION_MAX_BACKOFF_SECONDS))
+
+
+class RegistrationWorker:
+    """
+    Process the product registration outbox.
+
+    Due entries are claimed with ``FOR UPDATE SKIP LOCKED`` and leased for
+    ``REGISTRATION_LEASE_SECONDS``, so every worker can run it without processing an entry
+    twice, and entries of a crashed worker are picked up again after the lease. The offers
+    service calls are made after the claim is committed, without holding locks, for at most
+    ``concurrency`` entries at a time. Failed attempts are retried with exponential backoff
+    until ``REGISTRATION_MAX_ATTEMPTS``.
+    """
+
+    def __init__(
+            self,
+            batch_size: int = Settings.REGISTRATION_BATCH_SIZE,
+            concurrency: int = Settings.REGISTRATION_CONCURRENCY,
+    ):
+        """
+        Initialize the RegistrationWorker instance.
+
+        Args:
+            batch_size (int): Maximum number of entries claimed at once.
+            concurrency (int): Maximum number of entries processed at the same time.
+        """
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.wakeup = threading.Event()
+        self.running = False
+
+    def wake(self):
+        """
+        Process the outbox now instead of at the next poll.
+        """
+        self.wakeup.set()
+
+    def claim(self, session: Session) -> list:
+        """
+        Claim the due outbox entries and commit the lease.
+
+        Args:
+            session (Session): The database session to claim with.
+
+        Returns:
+            list[Row]: Product ID, status and attempts of the claimed entries.
+        """
+        now = datetime.utcnow()
+        due = (
+            select(ProductRegistration.product_id)
+            .where(ProductRegistration.status.in_(ACTIVE_STATUSES), ProductRegistration.next_attempt_at <= now)
+            .order_by(ProductRegistration.next_attempt_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        claimed = session.execute(
+            update(ProductRegistration)
+            .where(ProductRegistration.product_id.in_(due.scalar_subquery()))
+            .values(
+                attempts=ProductRegistration.attempts + 1,
+                next_attempt_at=now + timedelta(seconds=Settings.REGISTRATION_LEASE_SECONDS),
+                updated_at=now,
+            )
+            .returning(ProductRegistration.product_id, ProductRegistration.status, ProductRegistration.attempts)
+        ).all()
+        session.commit()
+        return claimed
+
+    def process(self) -> int:
+        """
+        Process one batch of due outbox entries.
+
+        Returns:
+            int: Number of processed entries.
+        """
+        with session_scope() as session:
+            claimed = self.claim(session)
+        if not claimed:
+            return 0
+        try:
+            access_token = token_manager.get_access_token()
+        except Exception as exc:
+            access_token = None
+            logger_background.exception("No token for the product registrations:")
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            list(executor.map(lambda entry: self.process_entry(entry, access_token), claimed))
+        return len(claimed)
+
+    def process_entry(self, entry, access_token: str):
+        """
+        Process a claimed outbox entry in its own session.
+
+        Args:
+            entry (Row): Product ID, status and attempts of the claimed entry.
+            access_token (str): The access token for the offers service.
+        """
+        product_id, status, attempts = entry
+        with session_scope() as session:
+            try:
+                if not access_token:
+                    raise RegistrationError("No active access token")
+                self.finish(session, product_id, self.register(session, product_id, status, access_token))
+            except Exception as exc:
+                session.rollback()
+                self.fail(session, product_id, attempts, str(exc))
+            session.commit()
+
+    @staticmethod
+    def register(session: Session, product_id: UUID, status: str, access_token: str) -> str:
+        """
+        Register a product in the offers service and load its offers.
+
+        A product already registered by an earlier attempt is not registered again.
+
+        Args:
+            session (Session): The database session to write with.
+            product_id (UUID): ID of the product.
+            status (str): Status of the outbox entry.
+            access_token (str): The access token for the offers service.
+
+        Returns:
+            str: The new status of the outbox entry.
+
+        Raises:
+            RegistrationError: If the product cannot be registered or its offers cannot be loaded.
+        """
+        if status == PENDING:
+            product = session.get(Product, product_id)
+            if product is None:
+                raise RegistrationError("The product no longer exists")
+            product_info = {"id": str(product.id), "name": product.name, "description": product.description}
+            if not register_product_in_offer_service(access_token, product_info):
+                raise RegistrationError("Error while registering the product in the offers service")
+            RegistrationWorker.finish(session, product_id, REGISTERED)
+            session.commit()
+            logger_background.info("Registered product %s in the offers service.", product_id)
+
+        offers_data = get_product_offer_data(access_token, product_id)
+        if offers_data is False:
+            raise RegistrationError("Error while getting the offers of the product")
+        result = offer_sync_writer.sync(session, {product_id: offers_data})
+        if result.failed_products:
+            raise RegistrationError("Error while writing the offers of the product")
+        logger_background.info("Loaded %d offers of the new product %s.", len(offers_data), product_id)
+        return COMPLETED
+
+    @staticmethod
+    def finish(session: Session, product_id: UUID, status: str):
+        session.execute(
+            update(ProductRegistration)
+            .where(ProductRegistration.product_id == product_id)
+            .values(status=status, last_error=None, updated_at=datetime.utcnow())
+        )
+
+    @staticmethod
+    def fail(session: Session, product_id: UUID, attempts: int, error: str):
+        """
+        Record a failed attempt, scheduling a retry or giving up after the last attempt.
+        """
+        values = {
+            "last_error": error,
+            "next_attempt_at": datetime.utcnow() + registration_backoff(attempts),
+            "updated_at": datetime.utcnow(),
+        }
+        if attempts >= Settings.REGISTRATION_MAX_ATTEMPTS:
+            logger_background.error("Giving up the registration of product %s: %s", product_id, error)
+            values["status"] = FAILED
+        else:
+            logger_background.warning(
+                "Registration attempt %d of product %s failed: %s", attempts, product_id, error
+            )
+        session.execute(
+            update(ProductRegistration).where(ProductRegistration.product_id == product_id).values(**values)
+        )
+
+    def run(self):
+        """
+        Process the outbox every ``REGISTRATION_POLL_SECONDS``, or as soon as woken up.
+        """
+        while self.running:
+            try:
+                while self.running and self.process() == self.batch_size:
+                    pass
+            except Exception as exc:
+                logger_background.exception("Error processing the product registrations:")
+            self.wakeup.wait(Settings.REGISTRATION_POLL_SECONDS)
+            self.wakeup.clear()
+
+    def start(self):
+        """
+        Process the outbox in a daemon thread.
+        """
+        self.running = True
+        thread = threading.Thread(target=self.run, daemon=True)
+        thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
+
+
+registration_worker = RegistrationWorker()
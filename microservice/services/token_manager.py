@@ -1,9 +1,10 @@
 import threading
 import time
-import requests
 from microservice.config.settings import Settings
+from microservice.services.http_client import offers_service_client
 
 from microservice.utils.logging_configure import get_logger
+from microservice.utils.metrics import TOKEN_REFRESHES
 
 logger_api = get_logger()
 
@@ -23,17 +24,23 @@ class TokenManager:
             str or False: The access token if successful, False if an error occurs.
         """
         if self.access_token and (time.time() - self.token_timestamp < 300):
-            logger_api.info(
-                f"Using existing token, current token age: {time.time() - self.token_timestamp} seconds, max 300 seconds"
+            logger_api.debug(
+                "Using existing token, current token age: %.1f seconds, max 300 seconds",
+                time.time() - self.token_timestamp,
             )
             return self.access_token
 
         with self.token_lock:
             if not self.access_token or (time.time() - self.token_timestamp >= 300):
-                self.access_token = self.update_access_token()
+                try:
+                    self.access_token = self.update_access_token()
+                except Exception:
+                    TOKEN_REFRESHES.labels("failure").inc()
+                    raise
+                TOKEN_REFRESHES.labels("success").inc()
                 self.token_timestamp = time.time()
 
-                logger_api.info(f"Obtained a new access_token: {self.access_token}")
+                logger_api.info("Obtained a new access token.")
             return self.access_token
 
     @staticmethod
@@ -44,11 +51,9 @@ class TokenManager:
         Returns:
             str or False: The new access token if successful, False if an error occurs.
         """
-        offer_service_url = f"{Settings.BASE_URL}{Settings.AUTH_ENDPOINT}"
-
         headers = {"Bearer": f"{Settings.REFRESH_TOKEN}"}
 
-        response = requests.post(offer_service_url, timeout=10, headers=headers)
+        response = offers_service_client.request("POST", "auth", Settings.AUTH_ENDPOINT, headers=headers)
 
         if response.status_code == 201:
             response_json = response.json()
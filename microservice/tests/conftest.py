@@ -0,0 +1,18 @@
+import pytest
+
+
+class FakeClock:
+    """
+    Clock returning a time set by the test.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
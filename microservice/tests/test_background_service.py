@@ -15,13 +15,12 @@ def test_update_offers_data_without_access_token(background_service):
     background_service.token_timestamp = 0
 
     with patch("microservice.background_service.background_service.token_manager", mock_token_manager):
-        with patch(
-                "microservice.background_service.background_service.get_product_offer_data") as mock_get_product_offer_data:
+        with patch.object(background_service.refresh_engine, "refresh") as mock_refresh:
             background_service.update_offers_data()
 
             assert background_service.access_token is None
             assert background_service.token_timestamp == 0
-            mock_get_product_offer_data.assert_not_called()
+            mock_refresh.assert_not_called()
 
 
 def test_run_periodically(background_service):
@@ -31,9 +30,25 @@ def test_run_periodically(background_service):
     background_service.token_timestamp = 0
 
     with patch("microservice.background_service.background_service.token_manager", mock_token_manager):
-        with patch(
-                "microservice.background_service.background_service.get_product_offer_data") as mock_get_product_offer_data:
+        with patch.object(background_service.refresh_engine, "refresh", return_value={}) as mock_refresh:
             background_service.running = True
             background_service.run_periodically()
 
-            mock_get_product_offer_data.assert_called()
+            mock_refresh.assert_called()
+
+
+def test_products_are_rescheduled_when_the_refresh_fails(background_service):
+    product_id = "5f1d7a5e-6f37-4c2e-9b0a-0a6c1d5e4b11"
+    background_service.access_token = "token"
+    background_service.token_timestamp = 1e12
+    background_service.scheduler.sync_products([product_id])
+    background_service.products_synced_at = 1e12
+    module = "microservice.background_service.background_service"
+
+    with patch(f"{module}.session_scope"), patch(f"{module}.read_tracker"), \
+            patch.object(background_service.refresh_engine, "refresh", side_effect=RuntimeError("DB error")):
+        with pytest.raises(RuntimeError):
+            background_service.update_offers_data()
+
+    assert product_id in background_service.scheduler.due_at
+    assert [entry[1] for entry in background_service.scheduler.queue] == [product_id]
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import uuid
+from unittest.mock import patch
+
+import pytest
+
+from microservice.services.cache import CacheBackend, TTLCache
+
+
+def test_get_counts_hits_and_misses(clock):
+    cache = TTLCache("test", max_entries=10, ttl_seconds=60, clock=clock)
+    cache.set("key", "value")
+
+    assert cache.get("key") == "value"
+    assert cache.get("other") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache("test", max_entries=10, ttl_seconds=60, clock=clock)
+    cache.set("key", "value")
+
+    clock.now = 61
+
+    assert cache.get("key") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache("test", max_entries=2, ttl_seconds=60, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate(clock):
+    cache = TTLCache("test", max_entries=10, ttl_seconds=60, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    cache.invalidate("a", "missing")
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_incomplete_backend_cannot_be_created():
+    class GetOnlyCache(CacheBackend):
+        def get(self, key, default=None):
+            return default
+
+    with pytest.raises(TypeError):
+        GetOnlyCache()
+
+
+def test_async_routes_use_the_cache_off_the_event_loop():
+    from microservice.routes.async_product_routes import get_product
+
+    cached = {"id": uuid.uuid4(), "name": "Cached Product", "description": "Cached Description"}
+    threads = []
+
+    def get(key, default=None):
+        threads.append(threading.get_ident())
+        return cached
+
+    async def call():
+        threads.append(threading.get_ident())
+        return await get_product(cached["id"], session=None)
+
+    with patch("microservice.routes.async_product_routes.product_cache") as product_cache:
+        product_cache.get.side_effect = get
+        assert asyncio.run(call()) == cached
+
+    loop_thread, cache_thread = threads
+    assert cache_thread != loop_thread
@@ -0,0 +1,44 @@
+import json
+import uuid
+from datetime import datetime
+
+from sqlalchemy import literal, select, union_all
+
+from microservice.services.export import encode_csv, encode_ndjson, price_history_export_statement, stream_export
+
+
+def test_encode_ndjson():
+    offer_id = uuid.uuid4()
+    rows = [(offer_id, 100, datetime(2023, 9, 1, 12, 30))]
+
+    lines = encode_ndjson(["id", "price", "timestamp"], rows).decode().splitlines()
+
+    assert [json.loads(line) for line in lines] == [
+        {"id": str(offer_id), "price": 100, "timestamp": "2023-09-01T12:30:00"}
+    ]
+
+
+def test_encode_csv_quotes_values():
+    encoded = encode_csv(["name", "price"], [("a, b", 1), ("c", None)], header=True)
+
+    assert encoded.decode() == 'name,price\n"a, b",1\nc,\n'
+
+
+def test_price_history_export_statement_filters():
+    product_id = uuid.uuid4()
+
+    sql = str(price_history_export_statement(product_id, datetime(2023, 9, 1)).compile())
+
+    assert "offer_price_history.product_id = " in sql
+    assert "offer_price_history.timestamp >= " in sql
+    assert "ORDER BY offer_price_history.timestamp, offer_price_history.id" in sql
+
+
+def test_stream_export_yields_batches():
+    statement = union_all(*(select(literal(number).label("number")) for number in range(5)))
+
+    chunks = list(stream_export(select(statement.subquery()), "csv", batch_size=2))
+
+    assert chunks[0] == b"number\n"
+    assert b"".join(chunks[1:]).decode().splitlines() == ["0", "1", "2", "3", "4"]
+    assert len(chunks) == 4
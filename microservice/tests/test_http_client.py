@@ -0,0 +1,177 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+import requests
+
+from microservice.services.http_client import CircuitBreaker, CircuitOpenError, LatencyHistogram, UpstreamClient
+
+
+def response(status_code, headers=None):
+    mock_response = MagicMock()
+    mock_response.status_code = status_code
+    mock_response.headers = headers or {}
+    return mock_response
+
+
+@pytest.fixture
+def client():
+    client = UpstreamClient(base_url="http://offers", max_retries=2, breaker=CircuitBreaker(3, 30))
+    with patch("microservice.services.http_client.time.sleep") as mock_sleep:
+        client.sleep = mock_sleep
+        yield client
+
+
+def test_retries_server_errors_with_backoff(client):
+    with patch.object(client.session, "request", side_effect=[response(503), response(200)]) as mock_request:
+        result = client.request("GET", "offers", "/offers")
+
+    assert result.status_code == 200
+    assert mock_request.call_count == 2
+    assert mock_request.call_args.kwargs["timeout"] == client.timeout
+    client.sleep.assert_called_once()
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_honours_retry_after(client):
+    with patch.object(client.session, "request", side_effect=[response(429, {"Retry-After": "2"}), response(200)]):
+        client.request("GET", "offers", "/offers")
+
+    client.sleep.assert_called_once_with(2.0)
+
+
+def test_returns_last_response_when_retries_are_exhausted(client):
+    with patch.object(client.session, "request", return_value=response(500)) as mock_request:
+        result = client.request("GET", "offers", "/offers")
+
+    assert result.status_code == 500
+    assert mock_request.call_count == 3
+
+
+def test_circuit_opens_after_consecutive_failures(client):
+    with patch.object(client.session, "request", side_effect=requests.ConnectionError) as mock_request:
+        with pytest.raises(requests.ConnectionError):
+            client.request("GET", "offers", "/offers")
+        with pytest.raises(CircuitOpenError):
+            client.request("GET", "offers", "/offers")
+
+    assert mock_request.call_count == 3
+    assert client.breaker.state == CircuitBreaker.OPEN
+
+
+def test_half_open_circuit_lets_one_trial_call_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+    assert not breaker.allow_request()
+
+    clock.now = 30
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now = 60
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_latencies_are_recorded_per_endpoint(client):
+    with patch.object(client.session, "request", return_value=response(200)):
+        client.request("GET", "offers", "/offers")
+        client.request("POST", "auth", "/auth")
+
+    latency = client.stats()["latency"]
+    assert latency["offers"]["count"] == 1
+    assert latency["auth"]["count"] == 1
+
+
+def test_histogram_buckets():
+    histogram = LatencyHistogram(buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.1, 0.5, 5.0):
+        histogram.observe(seconds)
+
+    assert histogram.snapshot()["buckets"] == {"0.1": 2, "1.0": 1, "+Inf": 1}
+
+
+def test_async_request_retries():
+    statuses = iter([502, 200])
+    transport = httpx.MockTransport(lambda request: httpx.Response(next(statuses)))
+    client = UpstreamClient(base_url="http://offers", max_retries=1, backoff=0)
+
+    async def call():
+        async with httpx.AsyncClient(transport=transport) as http_client:
+            return await client.arequest(http_client, "GET", "offers", "/offers")
+
+    assert asyncio.run(call()).status_code == 200
+
+
+def half_open_client(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+    clock.now = 30
+    return UpstreamClient(base_url="http://offers", max_retries=0, breaker=breaker)
+
+
+def test_rate_limited_trial_call_is_released(clock):
+    client = half_open_client(clock)
+
+    with patch.object(client.session, "request", return_value=response(429)):
+        assert client.request("GET", "offers", "/offers").status_code == 429
+    with patch.object(client.session, "request", return_value=response(200)):
+        client.request("GET", "offers", "/offers")
+
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_unexpected_trial_error_reopens_the_circuit(clock):
+    client = half_open_client(clock)
+
+    with patch.object(client.session, "request", side_effect=requests.exceptions.ChunkedEncodingError):
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            client.request("GET", "offers", "/offers")
+    assert client.breaker.state == CircuitBreaker.OPEN
+
+    clock.now = 9000
+    with patch.object(client.session, "request", return_value=response(200)):
+        client.request("GET", "offers", "/offers")
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_cancelled_async_trial_call_is_released(clock):
+    client = half_open_client(clock)
+
+    def cancel(request):
+        raise asyncio.CancelledError
+
+    async def call(transport):
+        async with httpx.AsyncClient(transport=transport) as http_client:
+            return await client.arequest(http_client, "GET", "offers", "/offers")
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(call(httpx.MockTransport(cancel)))
+    assert asyncio.run(call(httpx.MockTransport(lambda request: httpx.Response(200)))).status_code == 200
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_post_is_not_replayed_after_a_read_timeout(client):
+    with patch.object(client.session, "request", side_effect=requests.ReadTimeout) as mock_request:
+        with pytest.raises(requests.ReadTimeout):
+            client.request("POST", "register_product", "/register")
+
+    assert mock_request.call_count == 1
+
+
+def test_post_is_retried_when_the_connection_fails(client):
+    with patch.object(client.session, "request", side_effect=[requests.ConnectTimeout, response(201)]) as mock_request:
+        assert client.request("POST", "auth", "/auth").status_code == 201
+
+    assert mock_request.call_count == 2
+
+
+def test_post_server_errors_are_not_replayed(client):
+    with patch.object(client.session, "request", return_value=response(503)) as mock_request:
+        assert client.request("POST", "register_product", "/register").status_code == 503
+
+    assert mock_request.call_count == 1
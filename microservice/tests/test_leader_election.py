@@ -0,0 +1,36 @@
+import pytest
+
+from microservice.background_service.leader_election import LeaderElector
+from microservice.database.database_setup import session_scope
+
+
+@pytest.fixture
+def electors():
+    first = LeaderElector(lock_key=900001, worker_id="worker-1")
+    second = LeaderElector(lock_key=900001, worker_id="worker-2")
+    yield first, second
+    first.release()
+    second.release()
+
+
+def test_only_one_worker_is_leader(electors):
+    first, second = electors
+
+    assert first.try_acquire()
+    assert first.try_acquire()
+    assert not second.try_acquire()
+
+    with session_scope() as session:
+        status = second.status(session)
+    assert status["is_leader"] is False
+    assert status["leader"]["worker_id"] == "worker-1"
+
+
+def test_leadership_fails_over_when_released(electors):
+    first, second = electors
+    first.try_acquire()
+
+    first.release()
+
+    assert second.try_acquire()
+    assert not first.try_acquire()
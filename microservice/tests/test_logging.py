@@ -0,0 +1,84 @@
+import json
+import logging
+import queue
+from logging.handlers import QueueListener
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from microservice.utils.logging_configure import (DeferredQueueHandler, JsonFormatter, RequestIdFilter,
+                                                  RequestIdMiddleware, request_id_var)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+def queued_logger(name: str):
+    handler = ListHandler()
+    handler.setFormatter(JsonFormatter())
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(queue_handler)
+    return logger, handler, QueueListener(log_queue, handler)
+
+
+def test_json_formatter_writes_one_object_per_record():
+    record = logging.LogRecord("api", logging.WARNING, __file__, 1, "Got %d offers of %s", (3, "p1"), None)
+    record.request_id = "r1"
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry["level"] == "WARNING"
+    assert entry["logger"] == "api"
+    assert entry["message"] == "Got 3 offers of p1"
+    assert entry["request_id"] == "r1"
+
+
+def test_queued_records_keep_the_request_id_and_exception():
+    logger, handler, listener = queued_logger("test.logging.queue")
+    listener.start()
+    token = request_id_var.set("r2")
+    try:
+        logger.info("Imported %d products.", 5)
+        logger.debug("Not written")
+        try:
+            raise ValueError("bad row")
+        except ValueError:
+            logger.exception("Import failed:")
+    finally:
+        request_id_var.reset(token)
+    logger.info("Outside of a request")
+    listener.stop()
+
+    entries = [json.loads(line) for line in handler.lines]
+    assert [entry["message"] for entry in entries] == ["Imported 5 products.", "Import failed:", "Outside of a request"]
+    assert [entry["request_id"] for entry in entries] == ["r2", "r2", "-"]
+    assert "ValueError: bad row" in entries[1]["exception"]
+
+
+def test_middleware_sets_and_returns_the_request_id():
+    app = FastAPI()
+    app.add_middleware(RequestIdMiddleware)
+
+    @app.get("/request-id")
+    def get_request_id():
+        return {"request_id": request_id_var.get()}
+
+    client = TestClient(app)
+    response = client.get("/request-id", headers={"X-Request-ID": "given-id"})
+    assert response.json() == {"request_id": "given-id"}
+    assert response.headers["X-Request-ID"] == "given-id"
+
+    response = client.get("/request-id")
+    assert response.json()["request_id"] == response.headers["X-Request-ID"]
+    assert len(response.headers["X-Request-ID"]) == 32
@@ -0,0 +1,52 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from microservice.utils.metrics import MetricsMiddleware, instrument_engine, route_template
+
+
+def sample(name: str, labels: dict) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_middleware_labels_requests_with_the_route_template():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics-test/{item_id}")
+    def get_item(item_id: int):
+        return {"id": item_id}
+
+    labels = {"method": "GET", "route": "/metrics-test/{item_id}", "status": "200"}
+    before = sample("http_request_duration_seconds_count", labels)
+
+    client = TestClient(app)
+    client.get("/metrics-test/1")
+    client.get("/metrics-test/2")
+    client.get("/missing")
+
+    assert sample("http_request_duration_seconds_count", labels) == before + 2
+    assert sample("http_request_duration_seconds_count", {"method": "GET", "route": "unmatched", "status": "404"}) >= 1
+
+
+def test_route_template_keeps_repeated_segments():
+    scope = {"endpoint": object(), "path": "/offers/products/7", "path_params": {"product_id": "7"}}
+
+    assert route_template(scope) == "/offers/products/{product_id}"
+
+
+def test_instrumented_engine_records_queries():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    before = sample("db_query_duration_seconds_count", {"operation": "select"})
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        try:
+            connection.execute(text("SELECT * FROM missing_table"))
+        except Exception:
+            pass
+        assert connection.info["query_started"] == []
+
+    assert sample("db_query_duration_seconds_count", {"operation": "select"}) == before + 1
@@ -0,0 +1,15 @@
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+
+from microservice.database.database_setup import engine
+from microservice.database.migrations import include_object, upgrade_database
+from microservice.models import auth_model, models  # noqa: F401
+from microservice.models.base_model import Base
+
+
+def test_migrations_match_the_models():
+    upgrade_database()
+
+    with engine.connect() as connection:
+        context = MigrationContext.configure(connection, opts={"include_object": include_object})
+        assert compare_metadata(context, Base.metadata) == []
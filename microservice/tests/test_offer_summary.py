@@ -0,0 +1,99 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi import Response
+from sqlalchemy import delete
+from sqlalchemy.dialects import postgresql
+
+from microservice.database.database_setup import session_scope
+from microservice.database.migrations import upgrade_database
+from microservice.models.models import Offer, OfferSummary, Product
+from microservice.routes.offer_routes import OfferSummaryResponse
+from microservice.services.offer_summary import offer_summaries_statement, refresh_offer_summaries, summary_cursor_key
+from microservice.utils.pagination import encode_sort_cursor, split_page
+
+
+def compile_sql(statement):
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_summaries_sorted_by_min_price():
+    sql = compile_sql(offer_summaries_statement("min_price", 0, 10))
+
+    assert "ORDER BY offer_summaries.min_price, offer_summaries.product_id" in sql
+    assert "total_stock >" not in sql
+
+
+def test_summaries_sorted_by_total_stock_descending():
+    sql = compile_sql(offer_summaries_statement("-total_stock", 0, 10, in_stock=True))
+
+    assert "ORDER BY offer_summaries.total_stock DESC, offer_summaries.product_id DESC" in sql
+    assert "offer_summaries.total_stock >" in sql
+
+
+@pytest.fixture
+def product_id():
+    upgrade_database()
+    with session_scope() as session:
+        product = Product(name="Summarized Product", description="Summarized Description")
+        session.add(product)
+        session.flush()
+        session.add(Offer(id=uuid.uuid4(), price=None, items_in_stock=None, product_id=product.id))
+        refresh_offer_summaries(session, [product.id])
+        session.commit()
+        product_id = product.id
+    yield product_id
+    with session_scope() as session:
+        session.execute(delete(Product).where(Product.id == product_id))
+        session.commit()
+
+
+def test_summary_of_offers_without_price_or_stock(product_id):
+    with session_scope() as session:
+        row = session.execute(
+            offer_summaries_statement("min_price", 0, 1).where(OfferSummary.product_id == product_id)
+        ).one()
+
+    summary = OfferSummaryResponse.model_validate(row, from_attributes=True)
+    assert (summary.offer_count, summary.min_price, summary.avg_price, summary.total_stock) == (1, None, None, None)
+
+
+@pytest.fixture
+def summary_ids():
+    upgrade_database()
+    stock = [None, 5, 5, 10, None, 0]
+    with session_scope() as session:
+        products = [Product(name="Paged Product", description="Paged Description") for _ in stock]
+        session.add_all(products)
+        session.flush()
+        session.add_all([
+            OfferSummary(product_id=product.id, offer_count=1, total_stock=total_stock, updated_at=datetime.utcnow())
+            for product, total_stock in zip(products, stock)
+        ])
+        session.commit()
+        product_ids = [product.id for product in products]
+    yield product_ids
+    with session_scope() as session:
+        session.execute(delete(Product).where(Product.id.in_(product_ids)))
+        session.commit()
+
+
+@pytest.mark.parametrize("sort", ["total_stock", "-total_stock"])
+def test_summary_pages_follow_the_cursor(summary_ids, sort):
+    def page(limit, cursor=None):
+        statement = offer_summaries_statement(sort, 0, limit, cursor=cursor)
+        with session_scope() as session:
+            return session.execute(statement.where(OfferSummary.product_id.in_(summary_ids))).all()
+
+    expected = [row.product_id for row in page(len(summary_ids))]
+    paged, cursor = [], None
+    while True:
+        rows = split_page(page(2, cursor), 2, Response(), summary_cursor_key(sort), encode_sort_cursor)
+        paged += [row.product_id for row in rows]
+        if len(rows) < 2:
+            break
+        cursor = summary_cursor_key(sort)(rows[-1])
+
+    assert paged == expected
+    assert len(expected) == len(summary_ids)
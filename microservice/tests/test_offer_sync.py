@@ -0,0 +1,143 @@
+from datetime import datetime
+import uuid
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from microservice.database.database_setup import engine, session_scope
+from microservice.database.migrations import upgrade_database
+from microservice.models.models import Offer, Product
+from microservice.services.offer_sync import OfferSyncWriter, diff_offers
+from microservice.services.price_history import ensure_price_history_partitions, price_history_rows
+
+MODULE = "microservice.services.offer_sync"
+
+
+def test_diff_offers():
+    product_id = uuid.uuid4()
+    unchanged_id, changed_id, removed_id, new_id = (uuid.uuid4() for _ in range(4))
+    stored_offers = {
+        unchanged_id: (product_id, 100, 5),
+        changed_id: (product_id, 100, 5),
+        removed_id: (product_id, 100, 5),
+    }
+    offers_by_product = {
+        product_id: [
+            {"id": str(unchanged_id), "price": 100, "items_in_stock": 5},
+            {"id": str(changed_id), "price": 90, "items_in_stock": 5},
+            {"id": str(new_id), "price": 120, "items_in_stock": 1},
+        ]
+    }
+
+    upserts, delete_ids, result = diff_offers(stored_offers, offers_by_product)
+
+    assert {row["id"] for row in upserts} == {changed_id, new_id}
+    assert delete_ids == [removed_id]
+    assert (result.inserted, result.updated, result.deleted, result.unchanged) == (1, 1, 1, 1)
+    assert result.changed_product_ids == {product_id}
+
+
+def test_diff_offers_without_changes():
+    product_id = uuid.uuid4()
+    offer_id = uuid.uuid4()
+
+    upserts, delete_ids, result = diff_offers(
+        {offer_id: (product_id, 100, 5)},
+        {product_id: [{"id": str(offer_id), "price": 100, "items_in_stock": 5}]},
+    )
+
+    assert upserts == []
+    assert delete_ids == []
+    assert result.changed_product_ids == set()
+
+
+def test_price_history_rows_only_for_price_or_stock_changes():
+    product_id, other_product_id = uuid.uuid4(), uuid.uuid4()
+    moved_id, repriced_id, new_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    stored_offers = {
+        moved_id: (other_product_id, 100, 5),
+        repriced_id: (product_id, 100, 5),
+    }
+    upserts = [
+        {"id": moved_id, "price": 100, "items_in_stock": 5, "product_id": product_id},
+        {"id": repriced_id, "price": 80, "items_in_stock": 5, "product_id": product_id},
+        {"id": new_id, "price": 120, "items_in_stock": 1, "product_id": product_id},
+    ]
+
+    rows = price_history_rows(upserts, stored_offers, datetime(2023, 9, 1))
+
+    assert [row["offer_id"] for row in rows] == [repriced_id, new_id]
+
+
+@pytest.fixture
+def product_ids():
+    upgrade_database()
+    with engine.begin() as connection:
+        ensure_price_history_partitions(connection)
+    with session_scope() as session:
+        products = [Product(name="Synced Product", description="Synced Description") for _ in range(3)]
+        session.add_all(products)
+        session.commit()
+        product_ids = [product.id for product in products]
+    yield product_ids
+    with session_scope() as session:
+        session.execute(delete(Product).where(Product.id.in_(product_ids)))
+        session.commit()
+
+
+def offers(count: int = 1) -> list:
+    return [{"id": str(uuid.uuid4()), "price": 100, "items_in_stock": 1} for _ in range(count)]
+
+
+def stored_offer_count(session, product_ids) -> int:
+    return session.scalar(select(func.count()).select_from(Offer).where(Offer.product_id.in_(product_ids)))
+
+
+def test_deleted_products_do_not_fail_their_batch(product_ids):
+    deleted_id = uuid.uuid4()
+    offers_by_product = {product_id: offers() for product_id in product_ids}
+    offers_by_product[deleted_id] = offers()
+
+    with session_scope() as session, patch(f"{MODULE}.offers_cache"):
+        result = OfferSyncWriter(batch_size=10).sync(session, offers_by_product)
+
+    assert result.failed_product_ids == set()
+    assert result.inserted == 3
+    with session_scope() as session:
+        assert stored_offer_count(session, product_ids) == 3
+
+
+def test_failed_batch_is_retried_one_product_at_a_time(product_ids):
+    bad_id = product_ids[0]
+
+    def refresh_summaries(session, changed_product_ids):
+        if bad_id in changed_product_ids:
+            raise RuntimeError("summary failed")
+
+    with session_scope() as session, patch(f"{MODULE}.offers_cache"), \
+            patch(f"{MODULE}.refresh_offer_summaries", side_effect=refresh_summaries):
+        result = OfferSyncWriter(batch_size=10).sync(session, {product_id: offers() for product_id in product_ids})
+
+    assert result.failed_product_ids == {bad_id}
+    assert result.inserted == 2
+    with session_scope() as session:
+        assert stored_offer_count(session, product_ids[:1]) == 0
+        assert stored_offer_count(session, product_ids[1:]) == 2
+
+
+def test_offer_moved_from_a_product_outside_the_batch(product_ids):
+    old_id, new_id = product_ids[:2]
+    moved = offers()
+    with session_scope() as session, patch(f"{MODULE}.offers_cache"):
+        OfferSyncWriter().sync(session, {old_id: moved})
+
+    with session_scope() as session, patch(f"{MODULE}.offers_cache") as cache:
+        result = OfferSyncWriter().sync(session, {new_id: moved})
+
+    assert (result.inserted, result.updated, result.price_changes) == (0, 1, 0)
+    assert result.changed_product_ids == {old_id, new_id}
+    assert set(cache.invalidate.call_args.args) == {old_id, new_id}
+    with session_scope() as session:
+        assert stored_offer_count(session, [old_id]) == 0
+        assert stored_offer_count(session, [new_id]) == 1
@@ -1,3 +1,6 @@
+import uuid
+from unittest.mock import patch
+
 from fastapi.testclient import TestClient
 
 from microservice.main import app
@@ -32,3 +35,13 @@ def test_get_offers_by_product_id():
 
     offers = response.json()
     assert len(offers) >= 0
+
+
+def test_reads_of_unknown_products_are_not_counted():
+    with patch("microservice.routes.offer_routes.read_tracker") as read_tracker, \
+            patch("microservice.routes.offer_routes.offers_cache") as offers_cache:
+        offers_cache.get.return_value = None
+        response = client.get(f"/offers/products/{uuid.uuid4()}")
+
+    assert response.status_code == 404
+    read_tracker.record.assert_not_called()
@@ -0,0 +1,79 @@
+import uuid
+
+import pytest
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.testclient import TestClient
+
+from microservice.routes import offer_routes, product_routes
+
+from microservice.utils.pagination import (
+    NEXT_CURSOR_HEADER, decode_cursor, decode_sort_cursor, encode_cursor, encode_sort_cursor, split_page,
+)
+
+
+def test_cursor_round_trip():
+    key = uuid.uuid4()
+    assert decode_cursor(encode_cursor(key)) == key
+
+
+def test_decode_invalid_cursor():
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor("not-a-cursor")
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.parametrize("value", [None, 0, 120])
+def test_sort_cursor_round_trip(value):
+    key = uuid.uuid4()
+    assert decode_sort_cursor(encode_sort_cursor((value, key))) == (value, key)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor(uuid.uuid4()), "WyJhIiwgIngiXQ"])
+def test_decode_invalid_sort_cursor(cursor):
+    with pytest.raises(HTTPException) as exc_info:
+        decode_sort_cursor(cursor)
+    assert exc_info.value.status_code == 400
+
+
+def test_split_page_sets_next_cursor():
+    rows = [uuid.uuid4() for _ in range(3)]
+    response = Response()
+
+    page = split_page(rows, 2, response, key=lambda row: row)
+
+    assert page == rows[:2]
+    assert decode_cursor(response.headers[NEXT_CURSOR_HEADER]) == rows[1]
+
+
+def test_split_page_last_page():
+    response = Response()
+
+    page = split_page([uuid.uuid4()], 2, response, key=lambda row: row)
+
+    assert len(page) == 1
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_split_page_empty_page():
+    response = Response()
+
+    assert split_page([uuid.uuid4()], 0, response, key=lambda row: row) == []
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+@pytest.mark.parametrize("query", ["limit=0", "limit=-1", "limit=100000", "skip=-1"])
+def test_list_endpoints_reject_invalid_pages(query):
+    app = FastAPI()
+    app.include_router(product_routes.router, prefix="/products")
+    app.include_router(offer_routes.router, prefix="/offers")
+    client = TestClient(app)
+
+    for path in ("/products/", "/offers/", "/offers/summaries/"):
+        assert client.get(f"{path}?{query}").status_code == 422
+
+
+def test_summaries_reject_invalid_cursor():
+    app = FastAPI()
+    app.include_router(offer_routes.router, prefix="/offers")
+
+    assert TestClient(app).get("/offers/summaries/?cursor=not-a-cursor").status_code == 400
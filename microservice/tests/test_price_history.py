@@ -0,0 +1,111 @@
+import uuid
+from datetime import date, datetime
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import delete, select, text
+
+from microservice.database.database_setup import engine, session_scope
+from microservice.database.migrations import ALEMBIC_INI, upgrade_database
+from microservice.models.models import Offer, OfferPriceHistory, Product
+from microservice.services.price_history import _month_start, ensure_price_history_partitions
+from microservice.services.price_trend import price_points_statement, price_trend_statement
+
+
+def partition_exists(connection, start: date) -> bool:
+    return connection.scalar(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": partition_name(start)})
+
+
+def partition_name(start: date) -> str:
+    return f"offer_price_history_y{start:%Y}m{start:%m}"
+
+
+@pytest.fixture
+def product_id():
+    upgrade_database()
+    with session_scope() as session:
+        product = Product(name="History Product", description="History Description")
+        session.add(product)
+        session.commit()
+        product_id = product.id
+    yield product_id
+    with session_scope() as session:
+        session.execute(delete(Product).where(Product.id == product_id))
+        session.commit()
+
+
+def test_partition_clashing_with_default_rows_is_skipped(product_id):
+    today = date.today()
+    next_months = [_month_start(today.year, today.month + offset) for offset in (5, 6)]
+    with session_scope() as session:
+        session.add(OfferPriceHistory(
+            timestamp=next_months[1], offer_id=uuid.uuid4(), price=1, items_in_stock=1, product_id=product_id,
+        ))
+        session.commit()
+
+    try:
+        with engine.begin() as connection:
+            ensure_price_history_partitions(connection, months_ahead=6)
+            assert partition_exists(connection, next_months[0])
+            assert not partition_exists(connection, next_months[1])
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text(f"DROP TABLE IF EXISTS {partition_name(next_months[0])}"))
+
+
+def add_history(product_id, offer_id, timestamp: datetime, price: int):
+    with session_scope() as session:
+        session.add(OfferPriceHistory(
+            timestamp=timestamp, offer_id=offer_id, price=price, items_in_stock=1, product_id=product_id,
+        ))
+        session.commit()
+
+
+def test_trend_carries_forward_the_last_price_before_the_range(product_id):
+    offer_id = uuid.uuid4()
+    add_history(product_id, offer_id, datetime(2024, 1, 1), 90)
+    add_history(product_id, offer_id, datetime(2024, 1, 10), 100)
+    add_history(product_id, offer_id, datetime(2024, 2, 11), 120)
+    start_date, end_date = datetime(2024, 2, 1), datetime(2024, 3, 1)
+
+    with session_scope() as session:
+        summary = session.execute(price_trend_statement([product_id], start_date, end_date)).one()
+        points = session.execute(price_points_statement(product_id, start_date, end_date)).all()
+
+    assert (summary.points, summary.first_price, summary.last_price) == (2, 100, 120)
+    assert summary.slope == pytest.approx(2.0)
+    assert points == [(start_date, 100), (datetime(2024, 2, 11), 120)]
+
+
+def test_stable_price_before_the_range_still_has_a_trend(product_id):
+    add_history(product_id, uuid.uuid4(), datetime(2024, 1, 1), 100)
+
+    with session_scope() as session:
+        summary = session.execute(
+            price_trend_statement([product_id], datetime(2024, 2, 1), datetime(2024, 3, 1))
+        ).one_or_none()
+
+    assert summary is not None
+    assert (summary.first_price, summary.last_price) == (100, 100)
+
+
+def test_backfill_migration_records_the_current_offers(product_id):
+    offer_id = uuid.uuid4()
+    with session_scope() as session:
+        session.add(Offer(id=offer_id, price=100, items_in_stock=2, timestamp=datetime(2024, 1, 1), product_id=product_id))
+        session.commit()
+
+    config = Config(str(ALEMBIC_INI))
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.downgrade(config, "0005")
+        command.upgrade(config, "head")
+        command.downgrade(config, "0005")
+        command.upgrade(config, "head")
+
+    with session_scope() as session:
+        rows = session.execute(
+            select(OfferPriceHistory.price, OfferPriceHistory.items_in_stock).where(OfferPriceHistory.offer_id == offer_id)
+        ).all()
+    assert rows == [(100, 2)]
@@ -0,0 +1,62 @@
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+from microservice.services.price_trend import batch_price_trend_response, price_trend_response, trend_summary
+
+
+def summary_row(**values):
+    row = {"slope": 2.0, "intercept": 100.0, "r_squared": 1.0, "points": 3, "first_price": 100, "last_price": 110}
+    row.update(values)
+    return SimpleNamespace(**row)
+
+
+def test_trend_summary_reports_percent_change():
+    summary = trend_summary(summary_row())
+
+    assert summary["trend"] == 2.0
+    assert summary["percent_change"] == 10.0
+
+
+def test_trend_summary_without_initial_price():
+    assert trend_summary(summary_row(first_price=0))["percent_change"] is None
+
+
+def test_price_trend_response_without_data():
+    assert price_trend_response(None) == {"message": "No price data available for the specified period."}
+
+
+def test_price_trend_response_with_raw_points():
+    points = [(datetime(2024, 1, 1), 100), (datetime(2024, 1, 2), 110)]
+
+    response = price_trend_response(summary_row(), points=points)
+
+    assert response["timestamps"] == [datetime(2024, 1, 1), datetime(2024, 1, 2)]
+    assert response["prices"] == [100, 110]
+    assert "buckets" not in response
+
+
+def test_price_trend_response_with_buckets():
+    bucket = SimpleNamespace(start=datetime(2024, 1, 1), open=100, high=120, low=90, close=110, average=105, count=4)
+
+    response = price_trend_response(summary_row(), buckets=[bucket], bucket="day")
+
+    assert response["bucket"] == "day"
+    assert response["buckets"] == [{
+        "start": datetime(2024, 1, 1), "open": 100, "high": 120, "low": 90, "close": 110, "average": 105.0, "count": 4,
+    }]
+    assert "prices" not in response
+
+
+def test_batch_price_trend_response_reports_errors_per_product():
+    with_data, without_data, missing = uuid4(), uuid4(), uuid4()
+
+    response = batch_price_trend_response(
+        [with_data, without_data, missing], {with_data, without_data}, [summary_row(product_id=with_data)]
+    )
+
+    results = response["results"]
+    assert [result["product_id"] for result in results] == [with_data, without_data, missing]
+    assert results[0]["trend"] == 2.0
+    assert results[1]["error"] == "No price data available for the specified period."
+    assert results[2]["error"] == f"Product with id {missing} does not exist"
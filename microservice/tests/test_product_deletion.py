@@ -0,0 +1,85 @@
+import uuid
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import delete, func, insert, select
+
+from microservice.database.database_setup import engine, session_scope
+from microservice.database.migrations import upgrade_database
+from microservice.models.models import Offer, OfferPriceHistory, OfferSummary, Product, ProductRegistration
+from microservice.services.price_history import ensure_price_history_partitions
+from microservice.services.product_deletion import delete_products
+
+MODULE = "microservice.services.product_deletion"
+
+
+def create_product(session, offers: int) -> uuid.UUID:
+    product = Product(name="Deleted Product", description="Deleted Description")
+    session.add(product)
+    session.flush()
+    if offers:
+        session.execute(insert(Offer), [
+            {"id": uuid.uuid4(), "price": 100, "items_in_stock": 1, "product_id": product.id} for _ in range(offers)
+        ])
+        session.execute(insert(OfferPriceHistory), [
+            {"offer_id": uuid.uuid4(), "price": 100, "items_in_stock": 1, "product_id": product.id}
+            for _ in range(offers)
+        ])
+        session.add(OfferSummary(product_id=product.id, offer_count=offers))
+    session.add(ProductRegistration(product_id=product.id, status="completed"))
+    return product.id
+
+
+@pytest.fixture
+def product_ids():
+    upgrade_database()
+    with engine.begin() as connection:
+        ensure_price_history_partitions(connection)
+    with session_scope() as session:
+        product_ids = [create_product(session, 50), create_product(session, 0)]
+        session.commit()
+    yield product_ids
+    with session_scope() as session:
+        session.execute(delete(Product).where(Product.id.in_(product_ids)))
+        session.commit()
+
+
+def count(session, model, product_ids) -> int:
+    return session.scalar(select(func.count()).select_from(model).where(model.product_id.in_(product_ids)))
+
+
+def test_delete_products_returns_the_deleted_rows(product_ids):
+    with session_scope() as session:
+        deleted = delete_products(session, product_ids)
+        session.commit()
+
+    assert deleted == {
+        "offers": 50, "price_history": 50, "offer_summaries": 1, "registrations": 2, "read_counts": 0, "products": 2,
+    }
+    with session_scope() as session:
+        assert count(session, Offer, product_ids) == 0
+        assert session.scalar(select(func.count()).select_from(Product).where(Product.id.in_(product_ids))) == 0
+
+
+def test_product_delete_cascades_to_its_rows(product_ids):
+    with session_scope() as session:
+        session.execute(delete(Product).where(Product.id == product_ids[0]))
+        session.commit()
+
+    with session_scope() as session:
+        for model in (Offer, OfferPriceHistory, OfferSummary, ProductRegistration):
+            assert count(session, model, product_ids[:1]) == 0
+        assert count(session, ProductRegistration, product_ids[1:]) == 1
+
+
+def test_bulk_delete_endpoint_reports_missing_products(product_ids):
+    from microservice.routes.product_routes import ProductBulkDelete, bulk_delete_products
+
+    missing_id = uuid.uuid4()
+    with session_scope() as session, patch(f"{MODULE}.invalidate_product") as invalidate_product:
+        response = bulk_delete_products(ProductBulkDelete(product_ids=product_ids + [missing_id]), session)
+
+    assert response.deleted["products"] == 2
+    assert response.deleted["offers"] == 50
+    assert response.not_found == [missing_id]
+    assert invalidate_product.call_count == 2
@@ -0,0 +1,115 @@
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import delete
+
+from microservice.database.database_setup import session_scope
+from microservice.database.migrations import upgrade_database
+from microservice.models.models import Product, ProductImportJob, ProductRegistration
+from microservice.services.product_import import (
+    LINE_TOO_LONG, _write_batch, create_import_job, import_job_status, import_products, iter_lines, parse_rows,
+)
+
+
+def test_iter_lines_across_chunks():
+    chunks = [b'{"name": "a",', b' "description": "b"}\n{"na', b'me": "c"}\n', b"last"]
+
+    assert list(iter_lines(chunks)) == [b'{"name": "a", "description": "b"}\n', b'{"name": "c"}\n', b"last"]
+
+
+def test_iter_lines_drops_lines_over_the_limit():
+    chunks = [b"ok\n", b"too lo", b"ng\nab", b"c\n", b"no line break"]
+
+    assert list(iter_lines(chunks, max_line_bytes=5)) == [b"ok\n", None, b"abc\n", None]
+
+
+@pytest.mark.parametrize("import_format, lines", [
+    ("ndjson", [None, b'{"name": "a", "description": "b"}\n']),
+    ("csv", [b"name,description\n", None, b"a,b\n"]),
+])
+def test_too_long_line_rejects_only_its_row(import_format, lines):
+    rows = list(parse_rows(lines, import_format))
+
+    assert rows[0] == (2 if import_format == "csv" else 1, None, LINE_TOO_LONG)
+    assert rows[1][1].name == "a"
+
+
+def test_parse_ndjson_rows():
+    lines = [b'{"name": "a", "description": "b"}\n', b"\n", b'{"name": "c"}\n', b"not json\n"]
+
+    rows = list(parse_rows(lines, "ndjson"))
+
+    assert rows[0][0] == 1
+    assert rows[0][1].name == "a"
+    assert [(line, product, error is not None) for line, product, error in rows[1:]] == [
+        (3, None, True), (4, None, True),
+    ]
+
+
+def test_parse_csv_rows_with_multiline_fields():
+    lines = [b"name,description\n", b'"multi\n', b'line",x\n', b",empty name\n"]
+
+    rows = list(parse_rows(lines, "csv"))
+
+    assert rows[0][1].name == "multi\nline"
+    assert rows[1][1] is None
+    assert "name" in rows[1][2]
+
+
+@pytest.mark.parametrize("import_format, lines", [
+    ("ndjson", [b'{"name": "\xff"}\n', b'{"name": "a", "description": "b"}\n']),
+    ("csv", [b"name,description\n", b'"\xff\n', b'line",x\n', b"a,b\n"]),
+])
+def test_invalid_utf8_rejects_only_its_row(import_format, lines):
+    rows = list(parse_rows(lines, import_format))
+
+    assert rows[0][1] is None
+    assert "invalid UTF-8" in rows[0][2]
+    assert rows[1][1].name == "a"
+
+
+@pytest.fixture
+def job_id():
+    upgrade_database()
+    job_id = create_import_job("ndjson")
+    yield job_id
+    with session_scope() as session:
+        product_ids = [
+            product_id for (product_id,) in
+            session.query(ProductRegistration.product_id).filter(ProductRegistration.import_job_id == job_id)
+        ]
+        session.execute(delete(ProductRegistration).where(ProductRegistration.import_job_id == job_id))
+        session.execute(delete(Product).where(Product.id.in_(product_ids)))
+        session.execute(delete(ProductImportJob).where(ProductImportJob.id == job_id))
+        session.commit()
+
+
+def test_import_products_in_batches(job_id):
+    body = b"".join(
+        b'{"name": "product %d", "description": ""}\n' % number if number != 3 else b'{"name": ""}\n'
+        for number in range(10)
+    )
+
+    with patch("microservice.services.product_import.registration_worker") as worker:
+        import_products(job_id, [body[:50], body[50:]], "ndjson", batch_size=4)
+
+    assert worker.wake.call_count == 3
+    with session_scope() as session:
+        status = import_job_status(session, job_id)
+    assert status["status"] == "completed"
+    assert (status["imported"], status["rejected"]) == (9, 1)
+    assert status["errors"][0]["line"] == 4
+    assert status["registrations"] == {"pending": 9}
+
+
+def test_rejected_rows_are_flushed_in_batches(job_id):
+    body = b'{"name": ""}\n' * 10 + b'{"name": "valid", "description": ""}\n'
+
+    with patch("microservice.services.product_import.registration_worker"), \
+            patch("microservice.services.product_import._write_batch", wraps=_write_batch) as write_batch:
+        import_products(job_id, [body], "ndjson", batch_size=4)
+
+    assert [len(call.args[3]) for call in write_batch.call_args_list] == [4, 4, 2]
+    with session_scope() as session:
+        status = import_job_status(session, job_id)
+    assert (status["imported"], status["rejected"]) == (1, 10)
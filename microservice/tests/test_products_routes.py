@@ -11,11 +11,13 @@ def test_create_product():
         "description": "Test Description"
     }
     response = client.post("/products/", json=data)
-    assert response.status_code == 200
+    assert response.status_code == 202
     product = response.json()
     assert "id" in product
     assert product["name"] == data["name"]
     assert product["description"] == data["description"]
+    assert product["registration_status"] == "pending"
+    assert response.headers["Location"] == f"/products/{product['id']}/registration"
 
 
 def test_get_product():
@@ -0,0 +1,75 @@
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from microservice.utils.query_profiler import QueryProfile, QueryProfilerMiddleware, profile_engine, profile_queries
+
+
+def profiled_engine():
+    engine = create_engine("sqlite://")
+    profile_engine(engine)
+    return engine
+
+
+def test_repeated_statements_are_flagged():
+    engine = profiled_engine()
+
+    with profile_queries(repeat_threshold=3) as profile:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            for value in range(3):
+                connection.execute(text("SELECT :value"), {"value": value})
+
+    summary = profile.summary()
+    assert summary["queries"] == 4
+    assert summary["repeated"] == 1
+    assert profile.repeated()[0]["statement"] == "SELECT ?"
+    assert profile.repeated()[0]["count"] == 3
+
+
+def test_queries_outside_of_a_profile_are_not_recorded():
+    engine = profiled_engine()
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        with profile_queries() as profile:
+            connection.execute(text("SELECT 2"))
+        connection.execute(text("SELECT 3"))
+
+    assert [entry["statement"] for entry in profile.statements()] == ["SELECT 2"]
+
+
+def test_header_summarizes_the_profile():
+    profile = QueryProfile(repeat_threshold=2)
+    profile.record("SELECT  *\n FROM offers", 0.002, 5)
+    profile.record("SELECT * FROM offers", 0.001, -1)
+
+    assert profile.header() == "queries=2; duration_ms=3.0; rows=5; repeated=1"
+
+
+def test_middleware_profiles_requests_sending_the_header():
+    engine = profiled_engine()
+    app = FastAPI()
+    app.add_middleware(QueryProfilerMiddleware)
+
+    @app.get("/profiled")
+    def profiled():
+        with engine.connect() as connection:
+            for value in range(2):
+                connection.execute(text("SELECT :value"), {"value": value})
+        return {}
+
+    client = TestClient(app)
+    with patch("microservice.utils.query_profiler.Settings") as settings, \
+            patch("microservice.utils.query_profiler.log_profile") as log_profile:
+        settings.QUERY_PROFILER_ENABLED = False
+        settings.QUERY_PROFILER_ALLOW_HEADER = True
+
+        assert "X-Query-Profile" not in client.get("/profiled").headers
+        response = client.get("/profiled", headers={"X-Query-Profile": "1"})
+
+    assert response.headers["X-Query-Profile"].startswith("queries=2;")
+    assert response.headers["X-Query-Profile"].endswith("repeated=1")
+    log_profile.assert_called_once()
@@ -0,0 +1,69 @@
+import uuid
+
+import pytest
+
+from microservice.services.cache import CacheInvalidationListener, RedisCache, TTLCache
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def create_worker_cache(server):
+    client = fakeredis.FakeRedis(server=server)
+    return RedisCache("offers", client, ttl_seconds=60, local=TTLCache("offers", 100, 60))
+
+
+def test_values_are_shared_between_workers(server):
+    first_worker, second_worker = create_worker_cache(server), create_worker_cache(server)
+    product_id = uuid.uuid4()
+    offer_id = uuid.uuid4()
+
+    first_worker.set(product_id, [{"id": offer_id, "price": 100}])
+
+    assert second_worker.get(product_id) == [{"id": str(offer_id), "price": 100}]
+    assert second_worker.stats()["shared_hits"] == 1
+
+
+def test_invalidation_is_published_to_other_workers(server):
+    first_worker, second_worker = create_worker_cache(server), create_worker_cache(server)
+    product_id = uuid.uuid4()
+    first_worker.set(product_id, [])
+    second_worker.get(product_id)
+
+    pubsub = second_worker.client.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe("product-aggregator:invalidate")
+    listener = CacheInvalidationListener(second_worker.client, [second_worker])
+
+    first_worker.invalidate(product_id)
+    message = None
+    for _ in range(10):
+        message = message or pubsub.get_message(timeout=0.1)
+    listener.handle(message)
+
+    assert second_worker.local.get(product_id) is None
+    assert second_worker.get(product_id) is None
+
+
+def test_sub_second_ttl_is_kept_in_milliseconds(server):
+    cache = RedisCache("offers", fakeredis.FakeRedis(server=server), ttl_seconds=0.5, local=TTLCache("offers", 100, 0.5))
+
+    cache.set("key", 1)
+
+    assert cache.stats()["errors"] == 0
+    assert 0 < cache.client.pttl(cache._key("key")) <= 500
+
+
+@pytest.mark.parametrize("payload", [b"not json", b"\xff"])
+def test_corrupt_entry_is_a_miss_and_deleted(server, payload):
+    cache = create_worker_cache(server)
+    cache.client.set(cache._key("key"), payload)
+
+    assert cache.get("key", "default") == "default"
+
+    stats = cache.stats()
+    assert (stats["misses"], stats["errors"]) == (1, 1)
+    assert cache.client.exists(cache._key("key")) == 0
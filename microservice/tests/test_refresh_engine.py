@@ -0,0 +1,106 @@
+import asyncio
+import uuid
+
+import httpx
+import pytest
+
+from microservice.background_service.refresh_engine import OfferRefreshEngine
+from microservice.services.http_client import offers_service_client
+
+
+@pytest.fixture(autouse=True)
+def upstream_client(monkeypatch):
+    monkeypatch.setattr(offers_service_client, "backoff", 0)
+    offers_service_client.breaker.record_success()
+    yield offers_service_client
+    offers_service_client.breaker.record_success()
+
+
+@pytest.fixture
+def product_ids():
+    return [uuid.uuid4() for _ in range(10)]
+
+
+def test_refresh_returns_offers_by_product(product_ids):
+    failing_product_id = product_ids[0]
+
+    def handler(request: httpx.Request):
+        if str(failing_product_id) in request.url.path:
+            return httpx.Response(500, text="Internal error")
+        return httpx.Response(200, json=[{"id": str(uuid.uuid4()), "price": 100, "items_in_stock": 5}])
+
+    engine = OfferRefreshEngine(concurrency=4, transport=httpx.MockTransport(handler))
+    offers_by_product = engine.refresh("token", product_ids)
+
+    assert failing_product_id not in offers_by_product
+    assert len(offers_by_product) == len(product_ids) - 1
+    assert engine.last_stats.products == len(product_ids)
+    assert engine.last_stats.failures == 1
+    assert engine.last_stats.products_per_second > 0
+
+
+def test_refresh_respects_concurrency_limit(product_ids):
+    in_flight = 0
+    max_in_flight = 0
+
+    async def handler(request: httpx.Request):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json=[])
+
+    engine = OfferRefreshEngine(concurrency=3, transport=httpx.MockTransport(handler))
+    engine.refresh("token", product_ids)
+
+    assert max_in_flight == 3
+
+
+def test_refresh_sends_etag_and_skips_not_modified(product_ids):
+    product_id = product_ids[0]
+    received_etags = []
+
+    def handler(request: httpx.Request):
+        received_etags.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json=[], headers={"ETag": '"v1"'})
+
+    engine = OfferRefreshEngine(transport=httpx.MockTransport(handler))
+    assert product_id in engine.refresh("token", [product_id])
+    engine.confirm([product_id])
+
+    assert engine.refresh("token", [product_id]) == {}
+    assert engine.last_skipped == {product_id}
+    assert engine.last_stats.skipped == 1
+    assert engine.last_stats.failures == 0
+    assert received_etags == [None, '"v1"']
+
+
+def test_refresh_skips_unchanged_body_without_etag(product_ids):
+    product_id = product_ids[0]
+    prices = [100, 100, 100, 200]
+
+    def handler(request: httpx.Request):
+        return httpx.Response(200, json=[{"id": str(product_id), "price": prices.pop(0), "items_in_stock": 5}])
+
+    engine = OfferRefreshEngine(transport=httpx.MockTransport(handler))
+    assert product_id in engine.refresh("token", [product_id])
+    # Not confirmed as written yet, so the same body is returned again.
+    assert product_id in engine.refresh("token", [product_id])
+    engine.confirm([product_id])
+
+    assert engine.refresh("token", [product_id]) == {}
+    assert engine.last_stats.skipped == 1
+    assert engine.refresh("token", [product_id])[product_id][0]["price"] == 200
+
+
+def test_retain_forgets_deleted_products(product_ids):
+    engine = OfferRefreshEngine(transport=httpx.MockTransport(lambda request: httpx.Response(200, json=[])))
+    engine.refresh("token", product_ids)
+    engine.confirm(product_ids)
+
+    engine.retain(product_ids[:2])
+
+    assert set(engine.validators) == set(product_ids[:2])
@@ -0,0 +1,120 @@
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import delete
+
+from microservice.database.database_setup import session_scope
+from microservice.database.migrations import upgrade_database
+from microservice.models.models import Offer, OfferPriceHistory, OfferSummary, Product, ProductRegistration
+from microservice.services.http_client import offers_service_client
+from microservice.services.registration_outbox import RegistrationWorker, enqueue_registration
+
+MODULE = "microservice.services.registration_outbox"
+
+
+@pytest.fixture
+def product_id():
+    upgrade_database()
+    with session_scope() as session:
+        product = Product(name="Outbox Product", description="Outbox Description")
+        session.add(product)
+        session.flush()
+        enqueue_registration(session, product.id)
+        session.commit()
+        product_id = product.id
+    yield product_id
+    with session_scope() as session:
+        for model in (Offer, OfferPriceHistory, OfferSummary, ProductRegistration):
+            session.execute(delete(model).where(model.product_id == product_id))
+        session.execute(delete(Product).where(Product.id == product_id))
+        session.commit()
+
+
+def registration(product_id):
+    with session_scope() as session:
+        return session.get(ProductRegistration, product_id)
+
+
+@pytest.fixture(autouse=True)
+def token():
+    with patch(f"{MODULE}.token_manager") as token_manager:
+        token_manager.get_access_token.return_value = "token"
+        yield token_manager
+
+
+def test_registration_completes(product_id):
+    offers = [{"id": "0b0f5b4e-3a1e-4d0c-9a8e-6c2a7a3f0b11", "price": 100, "items_in_stock": 3}]
+    with patch(f"{MODULE}.register_product_in_offer_service", return_value=True) as register, \
+            patch(f"{MODULE}.get_product_offer_data", return_value=offers):
+        RegistrationWorker().process()
+
+    register.assert_called_once()
+    entry = registration(product_id)
+    assert entry.status == "completed"
+    assert entry.attempts == 1
+    with session_scope() as session:
+        assert session.query(Offer).filter(Offer.product_id == product_id).count() == 1
+
+
+def test_failed_offers_are_retried_without_registering_again(product_id):
+    with patch(f"{MODULE}.register_product_in_offer_service", return_value=True) as register, \
+            patch(f"{MODULE}.get_product_offer_data", return_value=False):
+        RegistrationWorker().process()
+
+    entry = registration(product_id)
+    assert entry.status == "registered"
+    assert entry.last_error
+    assert entry.next_attempt_at > datetime.utcnow()
+
+    with session_scope() as session:
+        session.execute(
+            ProductRegistration.__table__.update()
+            .where(ProductRegistration.product_id == product_id)
+            .values(next_attempt_at=datetime.utcnow())
+        )
+        session.commit()
+    with patch(f"{MODULE}.register_product_in_offer_service", return_value=True) as register, \
+            patch(f"{MODULE}.get_product_offer_data", return_value=[]):
+        RegistrationWorker().process()
+
+    register.assert_not_called()
+    assert registration(product_id).status == "completed"
+
+
+def test_registration_gives_up_after_max_attempts(product_id):
+    with patch(f"{MODULE}.Settings.REGISTRATION_MAX_ATTEMPTS", 1), \
+            patch(f"{MODULE}.register_product_in_offer_service", return_value=False):
+        RegistrationWorker().process()
+
+    entry = registration(product_id)
+    assert entry.status == "failed"
+    assert entry.attempts == 1
+
+
+def test_claimed_entries_are_skipped_by_other_workers(product_id):
+    with session_scope() as session:
+        claimed = RegistrationWorker().claim(session)
+        assert product_id in {row.product_id for row in claimed}
+        with session_scope() as other_session:
+            assert product_id not in {row.product_id for row in RegistrationWorker().claim(other_session)}
+
+
+@pytest.mark.parametrize("status_code, text", [(409, "Conflict"), (400, '{"msg": "Product already registered"}')])
+def test_already_registered_product_completes(product_id, status_code, text):
+    response = MagicMock(status_code=status_code, text=text)
+    with patch.object(offers_service_client, "request", return_value=response), \
+            patch(f"{MODULE}.get_product_offer_data", return_value=[]):
+        RegistrationWorker().process()
+
+    entry = registration(product_id)
+    assert entry.status == "completed"
+    assert entry.attempts == 1
+
+
+def test_rejected_registration_is_retried(product_id):
+    response = MagicMock(status_code=400, text='{"msg": "Invalid product"}')
+    with patch.object(offers_service_client, "request", return_value=response):
+        RegistrationWorker().process()
+
+    assert registration(product_id).status == "pending"
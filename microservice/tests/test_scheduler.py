@@ -0,0 +1,93 @@
+from uuid import uuid4
+
+import pytest
+
+from microservice.background_service.scheduler import RefreshScheduler, TokenBucket
+
+
+@pytest.fixture
+def scheduler(clock):
+    return RefreshScheduler(min_staleness=10, max_staleness=100, initial_interval=40, clock=clock)
+
+
+def test_new_products_are_due_immediately(scheduler):
+    product_ids = [uuid4(), uuid4()]
+    scheduler.sync_products(product_ids)
+
+    assert scheduler.due_count() == 2
+    assert sorted(scheduler.pop_due(10)) == sorted(product_ids)
+    assert scheduler.pop_due(10) == []
+
+
+def test_pop_due_returns_most_overdue_first(scheduler, clock):
+    first, second = uuid4(), uuid4()
+    scheduler.sync_products([first, second])
+    scheduler.pop_due(10)
+    scheduler.reschedule(second, changed=True)
+    clock.now = 5
+    scheduler.reschedule(first, changed=True)
+
+    clock.now = 100
+    assert scheduler.pop_due(1) == [second]
+    assert scheduler.pop_due(1) == [first]
+
+
+def test_interval_adapts_to_changes_within_bounds(scheduler, clock):
+    product_id = uuid4()
+    scheduler.sync_products([product_id])
+
+    for _ in range(5):
+        scheduler.pop_due(1)
+        scheduler.reschedule(product_id, changed=True)
+        clock.now = scheduler.due_at[product_id]
+    assert scheduler.intervals[product_id] == 10
+
+    for _ in range(10):
+        scheduler.pop_due(1)
+        scheduler.reschedule(product_id, changed=False)
+        clock.now = scheduler.due_at[product_id]
+    assert scheduler.intervals[product_id] == 100
+
+
+def test_reads_bring_the_refresh_forward(scheduler, clock):
+    read, unread = uuid4(), uuid4()
+    scheduler.sync_products([read, unread])
+    scheduler.pop_due(10)
+    scheduler.reschedule(read, changed=False)
+    scheduler.reschedule(unread, changed=False)
+
+    scheduler.record_reads({read: 20, uuid4(): 5})
+
+    assert scheduler.intervals[read] < 60
+    assert scheduler.due_at[read] == scheduler.intervals[read]
+    assert scheduler.due_at[unread] == 60
+
+
+def test_failed_refresh_is_retried_after_min_staleness(scheduler):
+    product_id = uuid4()
+    scheduler.sync_products([product_id])
+    scheduler.pop_due(1)
+    scheduler.reschedule(product_id, changed=False, failed=True)
+
+    assert scheduler.due_at[product_id] == 10
+    assert scheduler.intervals[product_id] == 40
+
+
+def test_deleted_products_are_dropped(scheduler):
+    kept, deleted = uuid4(), uuid4()
+    scheduler.sync_products([kept, deleted])
+    scheduler.sync_products([kept])
+
+    assert len(scheduler) == 1
+    assert scheduler.pop_due(10) == [kept]
+
+
+def test_token_bucket_limits_the_rate(clock):
+    bucket = TokenBucket(rate=2, capacity=5, clock=clock)
+
+    assert bucket.take(10) == 5
+    assert bucket.take(10) == 0
+    clock.now = 1.5
+    assert bucket.take(10) == 3
+    clock.now = 100
+    assert bucket.take(10) == 5
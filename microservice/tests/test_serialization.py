@@ -0,0 +1,31 @@
+import json
+import uuid
+
+from fastapi import Response
+
+from microservice.routes.offer_routes import OfferResponse, offer_rows
+from microservice.utils.serialization import fast_json_response
+
+
+class UUIDSubclass(uuid.UUID):
+    pass
+
+
+def test_offer_rows_match_the_response_model():
+    offer_id, product_id = uuid.uuid4(), UUIDSubclass(str(uuid.uuid4()))
+
+    body = json.loads(fast_json_response(offer_rows([(offer_id, 100, 5, product_id)])).body)
+
+    assert body == [{"id": str(offer_id), "price": 100, "items_in_stock": 5, "product_id": str(product_id)}]
+    assert OfferResponse.model_validate(body[0]).id == offer_id
+
+
+def test_fast_json_response_keeps_headers():
+    response = Response()
+    response.headers["X-Next-Cursor"] = "cursor"
+
+    fast_response = fast_json_response([], response)
+
+    assert fast_response.headers["X-Next-Cursor"] == "cursor"
+    assert fast_response.headers["content-type"] == "application/json"
+    assert fast_response.headers["content-length"] == "2"
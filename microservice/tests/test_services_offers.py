@@ -1,12 +1,16 @@
 import pytest
 from unittest.mock import patch, MagicMock
+from microservice.services.http_client import offers_service_client
 from microservice.services.offers import get_product_offer_data
 
 
 @pytest.fixture
 def mock_requests_get():
-    with patch('requests.get') as mock_get:
+    offers_service_client.breaker.record_success()
+    with patch.object(offers_service_client.session, "request") as mock_get, \
+            patch("microservice.services.http_client.time.sleep"):
         yield mock_get
+    offers_service_client.breaker.record_success()
 
 
 def test_get_product_offer_data_success(mock_requests_get):
@@ -1,12 +1,16 @@
 import pytest
 from unittest.mock import patch, MagicMock
+from microservice.services.http_client import offers_service_client
 from microservice.services.products import register_product_in_offer_service
 
 
 @pytest.fixture
 def mock_requests_post():
-    with patch('requests.post') as mock_post:
+    offers_service_client.breaker.record_success()
+    with patch.object(offers_service_client.session, "request") as mock_post, \
+            patch("microservice.services.http_client.time.sleep"):
         yield mock_post
+    offers_service_client.breaker.record_success()
 
 
 def test_register_product_success(mock_requests_post):
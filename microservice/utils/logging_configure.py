@@ -1,11 +1,30 @@
+import atexit
+import copy
 import logging
+import queue
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.config import dictConfig
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
 
+import orjson
 from pydantic import BaseModel
 
+from microservice.config.settings import Settings
 
-def get_logger(level = logging.DEBUG):
-    api_logger = logging.getLogger("api")
-    api_logger.setLevel(level)
+LOGGER_NAME = "api"
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# ID of the request being handled, propagated to the threads running sync endpoints.
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+def get_logger(level: Optional[int] = None):
+    api_logger = logging.getLogger(LOGGER_NAME)
+    if level is not None:
+        api_logger.setLevel(level)
 
     return api_logger
 
@@ -13,27 +32,149 @@ def get_logger(level = logging.DEBUG):
 class LogConfig(BaseModel):
     """Logging configuration to be set for the server"""
 
-    LOGGER_NAME: str = "api"
-    LOG_FORMAT: str = "%(levelprefix)s | %(asctime)s | %(message)s"
-    LOG_LEVEL: str = "DEBUG"
+    LOGGER_NAME: str = LOGGER_NAME
+    LOG_FORMAT: str = "%(levelprefix)s | %(asctime)s | %(request_id)s | %(message)s"
+    LOG_LEVEL: str = Settings.LOG_LEVEL
 
     # Logging config
     version: int = 1
     disable_existing_loggers: bool = False
+    filters: dict = {
+        "request_id": {"()": "microservice.utils.logging_configure.RequestIdFilter"},
+    }
     formatters: dict = {
         "default": {
             "()": "uvicorn.logging.DefaultFormatter",
             "fmt": LOG_FORMAT,
             "datefmt": "%Y-%m-%d %H:%M:%S",
         },
+        "json": {"()": "microservice.utils.logging_configure.JsonFormatter"},
     }
     handlers: dict = {
         "default": {
-            "formatter": "default",
+            "formatter": "json" if Settings.LOG_FORMAT == "json" else "default",
             "class": "logging.StreamHandler",
             "stream": "ext://sys.stderr",
+            "filters": ["request_id"],
         },
     }
     loggers: dict = {
         "api": {"handlers": ["default"], "level": LOG_LEVEL},
     }
+
+
+class RequestIdFilter(logging.Filter):
+    """
+    Add the ID of the current request to log records, ``-`` outside of requests.
+
+    Records already tagged on the logging thread keep their ID when written by the listener thread.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get() or "-"
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format log records as single-line JSON objects.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+            "thread": record.threadName,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return orjson.dumps(entry).decode("utf-8")
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Queue log records for a QueueListener, leaving their formatting to the listener thread.
+
+    Only the message is merged with its arguments, and the traceback rendered, on the logging
+    thread, since the arguments and the exception may not outlive it.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure_logging() -> Optional[QueueListener]:
+    """
+    Configure the "api" logger from the settings.
+
+    The records are written as JSON lines or text at ``LOG_LEVEL``. With ``LOG_QUEUE`` enabled,
+    the logging threads only put the records on a queue, and a listener thread formats and
+    writes them.
+
+    Returns:
+        QueueListener or None: The started listener in queue mode, stopped at exit.
+    """
+    dictConfig(LogConfig().model_dump())
+    if not Settings.LOG_QUEUE:
+        return None
+
+    api_logger = get_logger()
+    handlers = list(api_logger.handlers)
+    for handler in handlers:
+        api_logger.removeHandler(handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+    api_logger.addHandler(queue_handler)
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware assigning an ID to every request for log correlation.
+
+    The ID is taken from the ``X-Request-ID`` request header or generated, set for the
+    logs of the request and returned in the ``X-Request-ID`` response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        header = REQUEST_ID_HEADER.lower().encode("latin-1")
+        request_id = next(
+            (value.decode("latin-1") for name, value in scope["headers"] if name == header), None
+        ) or uuid.uuid4().hex
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(header, request_id.encode("latin-1"))]
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
@@ -0,0 +1,128 @@
+import os
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# With PROMETHEUS_MULTIPROC_DIR set, every worker process writes its samples to files in that
+# directory and /metrics aggregates them, whichever worker serves the scrape.
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+QUERY_OPERATIONS = {"select", "insert", "update", "delete", "with"}
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Duration of HTTP requests.", ["method", "route", "status"],
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Duration of database queries.", ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+UPSTREAM_REQUEST_DURATION = Histogram(
+    "offers_service_request_duration_seconds", "Duration of calls to the offers service.", ["endpoint", "status"],
+)
+REFRESH_CYCLE_DURATION = Histogram(
+    "offer_refresh_cycle_duration_seconds", "Duration of offer refresh cycles.",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0),
+)
+REFRESHED_PRODUCTS = Counter(
+    "offer_refresh_products", "Products handled by the offer refresh.", ["outcome"],
+)
+TOKEN_REFRESHES = Counter(
+    "offers_service_token_refreshes", "Access token refreshes of the offers service.", ["outcome"],
+)
+
+
+def render_metrics() -> tuple:
+    """
+    Render the metrics in the Prometheus text format.
+
+    Returns:
+        tuple[bytes, str]: The metrics and their content type.
+    """
+    registry = REGISTRY
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the duration of every HTTP request.
+
+    Requests are labelled with their route template rather than their path, so that
+    path parameters do not multiply the time series.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_DURATION.labels(scope["method"], route_template(scope), str(status)).observe(
+                time.perf_counter() - started
+            )
+
+
+def route_template(scope) -> str:
+    """
+    Get the route template of a handled request, e.g. ``/products/{product_id}``.
+
+    The path parameter values of the request path are replaced with their names.
+
+    Args:
+        scope (dict): The ASGI scope of the request, after routing.
+
+    Returns:
+        str: The route template, or ``unmatched`` when no route handled the request.
+    """
+    if "endpoint" not in scope:
+        return "unmatched"
+    parameters = {str(value): name for name, value in scope.get("path_params", {}).items()}
+    return "/".join(
+        f"{{{parameters[segment]}}}" if segment in parameters else segment for segment in scope["path"].split("/")
+    )
+
+
+def _query_operation(statement: str) -> str:
+    operation = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else ""
+    return operation if operation in QUERY_OPERATIONS else "other"
+
+
+def instrument_engine(engine: Engine):
+    """
+    Record the duration of every query executed by an engine.
+
+    Args:
+        engine (Engine): The engine, or the ``sync_engine`` of an async engine.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        connection.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        started = connection.info["query_started"].pop()
+        DB_QUERY_DURATION.labels(_query_operation(statement)).observe(time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        if context.connection is not None and context.connection.info.get("query_started"):
+            context.connection.info["query_started"].pop()
@@ -0,0 +1,124 @@
+import base64
+import json
+from typing import Optional
+from uuid import UUID
+
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(key: UUID) -> str:
+    """
+    Encode the key of the last returned row as an opaque cursor.
+
+    Args:
+        key (UUID): The key of the last row of a page.
+
+    Returns:
+        str: The cursor for the next page.
+    """
+    return base64.urlsafe_b64encode(key.bytes).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> UUID:
+    """
+    Decode a cursor returned by encode_cursor.
+
+    Args:
+        cursor (str): The cursor received from the client.
+
+    Returns:
+        UUID: The key after which the next page starts.
+
+    Raises:
+        HTTPException: If the cursor is malformed.
+    """
+    try:
+        return UUID(bytes=base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_sort_cursor(key: tuple) -> str:
+    """
+    Encode the sort value and key of the last returned row as an opaque cursor.
+
+    Args:
+        key (tuple[int or None, UUID]): The sort column value and key of the last row of a page.
+
+    Returns:
+        str: The cursor for the next page.
+    """
+    value, row_key = key
+    return base64.urlsafe_b64encode(json.dumps([value, str(row_key)]).encode()).decode("ascii").rstrip("=")
+
+
+def decode_sort_cursor(cursor: str) -> tuple:
+    """
+    Decode a cursor returned by encode_sort_cursor.
+
+    Args:
+        cursor (str): The cursor received from the client.
+
+    Returns:
+        tuple[int or None, UUID]: The sort value and key after which the next page starts.
+
+    Raises:
+        HTTPException: If the cursor is malformed.
+    """
+    try:
+        value, key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+            raise ValueError(value)
+        return value, UUID(key)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_page(statement, key, cursor: Optional[str], skip: int, limit: int):
+    """
+    Restrict a query to one page ordered by a unique, indexed key.
+
+    The cursor takes precedence over ``skip``, which is kept for compatibility.
+    One extra row is selected to tell whether there is a next page.
+
+    Args:
+        statement (Select): The query to paginate.
+        key (Column): The unique column the pages are ordered by.
+        cursor (str, optional): The cursor returned with the previous page.
+        skip (int): Number of rows to skip when no cursor is given.
+        limit (int): Maximum number of rows of the page.
+
+    Returns:
+        Select: The paginated query.
+    """
+    statement = statement.order_by(key)
+    if cursor:
+        statement = statement.where(key > decode_cursor(cursor))
+    elif skip:
+        statement = statement.offset(skip)
+    return statement.limit(limit + 1)
+
+
+def split_page(rows: list, limit: int, response: Response, key=lambda row: row.id, encode=encode_cursor) -> list:
+    """
+    Cut the extra row selected by keyset_page and expose the next cursor.
+
+    The cursor is sent in the ``X-Next-Cursor`` response header when there is a next page.
+
+    Args:
+        rows (list): Rows selected by a query built with keyset_page.
+        limit (int): Maximum number of rows of the page.
+        response (Response): The response to set the header on.
+        key (callable): Function returning the key of a row.
+        encode (callable): Function encoding the key as a cursor.
+
+    Returns:
+        list: The rows of the page.
+    """
+    if len(rows) > limit:
+        rows = rows[:limit]
+        if rows:
+            response.headers[NEXT_CURSOR_HEADER] = encode(key(rows[-1]))
+    return rows
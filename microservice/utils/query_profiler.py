@@ -0,0 +1,204 @@
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from microservice.config.settings import Settings
+from microservice.utils.logging_configure import get_logger
+
+logger_api = get_logger()
+
+PROFILE_HEADER = "X-Query-Profile"
+
+# Profile of the request being handled, shared with the threads running sync endpoints.
+current_profile: ContextVar[Optional["QueryProfile"]] = ContextVar("query_profile", default=None)
+
+
+class QueryProfile:
+    """
+    SQL statements executed while handling one request.
+
+    Statements that are executed at least ``repeat_threshold`` times with the same SQL text,
+    typically with different parameters, are reported as N+1 candidates.
+    """
+
+    def __init__(self, repeat_threshold: int = Settings.QUERY_PROFILER_REPEAT_THRESHOLD):
+        """
+        Initialize the QueryProfile instance.
+
+        Args:
+            repeat_threshold (int): Number of executions of the same statement flagged as N+1.
+        """
+        self.repeat_threshold = repeat_threshold
+        self.queries = []
+
+    def record(self, statement: str, duration: float, rows: int, executemany: bool = False):
+        """
+        Record an executed statement.
+
+        Args:
+            statement (str): The SQL text.
+            duration (float): Execution time in seconds.
+            rows (int): Rows returned or affected, -1 if the driver does not report them.
+            executemany (bool): Whether the statement was executed for several parameter sets.
+        """
+        self.queries.append((" ".join(statement.split()), duration, rows, executemany))
+
+    def statements(self) -> list:
+        """
+        Group the recorded queries by SQL text.
+
+        Returns:
+            list[dict]: Executions, total duration and rows of every statement, slowest first.
+        """
+        grouped = {}
+        for statement, duration, rows, executemany in self.queries:
+            entry = grouped.setdefault(statement, {"statement": statement, "count": 0, "duration_ms": 0.0, "rows": 0})
+            entry["count"] += 1
+            entry["duration_ms"] += duration * 1000
+            entry["rows"] += max(rows, 0)
+        for entry in grouped.values():
+            entry["duration_ms"] = round(entry["duration_ms"], 3)
+        return sorted(grouped.values(), key=lambda entry: entry["duration_ms"], reverse=True)
+
+    def repeated(self) -> list:
+        """
+        Get the N+1 candidates.
+
+        Returns:
+            list[dict]: The statements executed at least ``repeat_threshold`` times.
+        """
+        return [entry for entry in self.statements() if entry["count"] >= self.repeat_threshold]
+
+    def summary(self) -> dict:
+        """
+        Summarize the profile.
+
+        Returns:
+            dict: Number of queries, total duration in milliseconds, rows and N+1 candidates.
+        """
+        return {
+            "queries": len(self.queries),
+            "duration_ms": round(sum(duration for _, duration, _, _ in self.queries) * 1000, 3),
+            "rows": sum(max(rows, 0) for _, _, rows, _ in self.queries),
+            "repeated": len(self.repeated()),
+        }
+
+    def header(self) -> str:
+        """
+        Format the summary as the ``X-Query-Profile`` response header value.
+
+        Returns:
+            str: E.g. ``queries=3; duration_ms=1.52; rows=12; repeated=1``.
+        """
+        return "; ".join(f"{name}={value}" for name, value in self.summary().items())
+
+
+@contextmanager
+def profile_queries(repeat_threshold: int = Settings.QUERY_PROFILER_REPEAT_THRESHOLD):
+    """
+    Record the queries executed in the current context on profiled engines.
+
+    Args:
+        repeat_threshold (int): Number of executions of the same statement flagged as N+1.
+
+    Yields:
+        QueryProfile: The profile being recorded.
+    """
+    profile = QueryProfile(repeat_threshold)
+    token = current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        current_profile.reset(token)
+
+
+def profile_engine(engine: Engine):
+    """
+    Record the queries of an engine in the profile of the current request, if any.
+
+    Args:
+        engine (Engine): The engine, or the ``sync_engine`` of an async engine.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        if current_profile.get() is not None:
+            connection.info.setdefault("profile_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        profile = current_profile.get()
+        if profile is not None and connection.info.get("profile_started"):
+            started = connection.info["profile_started"].pop()
+            profile.record(statement, time.perf_counter() - started, cursor.rowcount, executemany)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        if context.connection is not None and context.connection.info.get("profile_started"):
+            context.connection.info["profile_started"].pop()
+
+
+def log_profile(method: str, path: str, profile: QueryProfile):
+    """
+    Log the summary of a request profile, its statements and its N+1 candidates.
+
+    Args:
+        method (str): HTTP method of the request.
+        path (str): Path of the request.
+        profile (QueryProfile): The recorded profile.
+    """
+    summary = profile.summary()
+    logger_api.info(
+        "Query profile of %s %s: %d queries, %.3f ms, %d rows. Statements: %s",
+        method, path, summary["queries"], summary["duration_ms"], summary["rows"], profile.statements(),
+    )
+    for entry in profile.repeated():
+        logger_api.warning(
+            "Possible N+1 query in %s %s: executed %d times (%.3f ms): %s",
+            method, path, entry["count"], entry["duration_ms"], entry["statement"],
+        )
+
+
+class QueryProfilerMiddleware:
+    """
+    ASGI middleware profiling the database queries of requests.
+
+    Every request is profiled with ``QUERY_PROFILER_ENABLED``; with ``QUERY_PROFILER_ALLOW_HEADER``
+    only the requests sending an ``X-Query-Profile`` header are. The summary is returned in the
+    ``X-Query-Profile`` response header, and the statements are logged once the response is sent.
+    Queries run while a streamed response is being sent are logged but not in the header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled(scope):
+            await self.app(scope, receive, send)
+            return
+
+        header = PROFILE_HEADER.lower().encode("latin-1")
+
+        with profile_queries() as profile:
+            async def send_with_profile(message):
+                if message["type"] == "http.response.start":
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (header, profile.header().encode("latin-1"))
+                    ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_profile)
+            finally:
+                log_profile(scope["method"], scope["path"], profile)
+
+    @staticmethod
+    def enabled(scope) -> bool:
+        if Settings.QUERY_PROFILER_ENABLED:
+            return True
+        header = PROFILE_HEADER.lower().encode("latin-1")
+        return Settings.QUERY_PROFILER_ALLOW_HEADER and any(name == header for name, _ in scope["headers"])